@@ -3,6 +3,8 @@ import sys
 from pathlib import Path
 
 from flask import Flask, jsonify, send_from_directory
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -11,7 +13,32 @@ PROJECT_ROOT = BASE_DIR.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from backend.database import init_extensions, get_database_uri, db
+from backend import (  # noqa: F401 - registers listeners
+    change_tracking,
+    dashboard,
+    fee_accounting,
+    ticket_feed,
+    ticket_uploads,
+)
+from backend.attachment_processing import attachment_processor
+from backend.database import init_extensions, get_database_uri, engine_options, replica_binds
+from backend.login_security import password_verifier
+from backend.migrations import migrate_database
+from backend.retention import retention
+from backend.snapshot_writer import snapshot_writer
+from backend.ticket_queue import ticket_queue
+
+
+def trust_proxies(app) -> None:
+    """
+    Behind `TRUSTED_PROXY_COUNT` reverse proxies, take the client address and
+    scheme from their `X-Forwarded-*` headers, so per-IP login throttling sees
+    clients rather than the proxy. Left off by default: without a proxy in
+    front, those headers are whatever the client sent.
+    """
+    count = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+    if count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count, x_host=count)
 
 
 def create_app():
@@ -22,7 +49,14 @@ def create_app():
     app = Flask(__name__)
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
     app.config["SQLALCHEMY_DATABASE_URI"] = get_database_uri(base_dir)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    # Optional read replicas for the chatbot; see `backend.database.read_session`.
+    app.config["SQLALCHEMY_BINDS"] = replica_binds()
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Werkzeug rejects larger request bodies before they are parsed.
+    app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_CONTENT_LENGTH", 64 * 1024 * 1024))
+
+    trust_proxies(app)
 
     CORS(
         app,
@@ -30,7 +64,14 @@ def create_app():
         supports_credentials=True,
     )
 
+    password_verifier.init_app(app)
     init_extensions(app)
+    change_tracking.install()
+    snapshot_writer.init_app(app)
+    dashboard.init_app(app)
+    ticket_uploads.init_app(app)
+    attachment_processor.init_app(app)
+    retention.init_app(app)
 
     from routes.auth import auth_bp
     from routes.admin import admin_bp
@@ -65,12 +106,25 @@ def create_app():
             return send_from_directory(frontend_dir, path)
         return jsonify({"error": "Not found"}), 404
 
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(err):
+        message = err.description
+        if message == RequestEntityTooLarge.description:
+            limit = app.config["MAX_CONTENT_LENGTH"] / (1024 * 1024)
+            message = f"Request body exceeds the {round(limit, 1):g} MB limit."
+        return jsonify({"error": message}), 413
+
     @app.route("/api/health", methods=["GET"])
     def health_check():
         return jsonify({"status": "ok"}), 200
 
-    with app.app_context():
-        db.create_all()
+    # Deployments with several workers run `scripts/migrate_db.py` once instead.
+    if os.getenv("AUTO_MIGRATE", "1").strip().lower() not in ("0", "false", "no", "off"):
+        with app.app_context():
+            migrate_database()
+
+    # The drainer writes into tables created above.
+    ticket_queue.init_app(app)
 
     return app
 
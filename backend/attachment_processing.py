@@ -0,0 +1,198 @@
+import atexit
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from flask import Response, send_from_directory
+from sqlalchemy import update
+
+from backend import change_tracking
+from backend.database import db
+from backend.models import ArchivedHelpTickets, Attachment, HelpTickets
+from backend.pdf_preview import available
+from backend.ticket_uploads import ATTACHMENT_MAX_AGE, STORAGE_PATH, UPLOADS_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+SNIPPET_CHARS = 300
+# Wall clock limit for one file; the child also caps its CPU time and memory
+# (`PDF_MEMORY_MB`, default 512).
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def thumbnail_path_for(storage_path: str) -> str:
+    return storage_path[: -len(".pdf")] + ".png"
+
+
+def snippet(text: Optional[str]) -> Optional[str]:
+    collapsed = " ".join((text or "").split())
+    return collapsed[:SNIPPET_CHARS] or None
+
+
+def extract_preview(storage_path: str) -> Dict[str, Any]:
+    """
+    Read the page count and text of the stored PDF and, with PyMuPDF, render
+    its first page to a PNG next to it, in a `backend.pdf_preview` child
+    process limited to `PDF_TIMEOUT_SECONDS`. Raises RuntimeError when the
+    file cannot be read or the child is killed.
+    """
+    thumbnail = thumbnail_path_for(storage_path)
+    command = [
+        sys.executable,
+        "-m",
+        "backend.pdf_preview",
+        str(UPLOADS_DIR / storage_path),
+        str(UPLOADS_DIR / thumbnail),
+    ]
+    try:
+        result = subprocess.run(
+            command, cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=PDF_TIMEOUT_SECONDS
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Timed out after {PDF_TIMEOUT_SECONDS:g} seconds.")
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"PDF reader exited with status {result.returncode}.")
+    preview = json.loads(result.stdout)
+    return {
+        "page_count": preview["page_count"],
+        "text": preview["text"],
+        "thumbnail_path": thumbnail if preview["thumbnail"] else None,
+    }
+
+
+def process_attachment(storage_path: str, force: bool = False) -> Optional[Attachment]:
+    """
+    Extract the preview of the attachment at `storage_path` (once per
+    content, unless `force`) and copy it onto every ticket that references it.
+
+    Tickets are updated through the ORM so the change reaches the live feed
+    and `?since=` clients like any other edit. Extraction errors are recorded
+    on the attachment rather than raised. Returns None for paths that have no
+    attachment row (legacy uploads or a rolled-back ticket).
+    """
+    attachment = Attachment.query.filter_by(storage_path=storage_path).first()
+    if attachment is None:
+        return None
+
+    if force or attachment.processed_at is None:
+        try:
+            preview = extract_preview(storage_path)
+        except Exception as exc:
+            logger.warning("Could not process attachment %s: %s", storage_path, exc)
+            preview = {"page_count": None, "text": None, "thumbnail_path": None}
+            attachment.processing_error = str(exc)[:255] or exc.__class__.__name__
+        else:
+            attachment.processing_error = None
+        attachment.page_count = preview["page_count"]
+        attachment.text = preview["text"]
+        attachment.thumbnail_path = preview["thumbnail_path"]
+        attachment.processed_at = datetime.utcnow()
+
+    values = {
+        "pdf_page_count": attachment.page_count,
+        "pdf_thumbnail": attachment.thumbnail_path,
+        "pdf_snippet": snippet(attachment.text),
+    }
+    for ticket in HelpTickets.query.filter_by(pdf_filename=storage_path):
+        for key, value in values.items():
+            setattr(ticket, key, value)
+    archived = ArchivedHelpTickets.__table__
+    if db.session.execute(
+        update(archived).where(archived.c.pdf_filename == storage_path).values(**values)
+    ).rowcount:
+        change_tracking.touch(db.session, archived.name)
+    db.session.commit()
+    return attachment
+
+
+def process_pending(force: bool = False, limit: Optional[int] = None) -> int:
+    """Process attachments synchronously (unprocessed ones unless `force`). Returns the count."""
+    query = Attachment.query.with_entities(Attachment.storage_path).order_by(Attachment.id)
+    if not force:
+        query = query.filter(Attachment.processed_at.is_(None))
+    if limit:
+        query = query.limit(limit)
+    paths = [row.storage_path for row in query]
+    for path in paths:
+        process_attachment(path, force=force)
+    return len(paths)
+
+
+def send_thumbnail(thumbnail_path: str) -> Response:
+    """Serve a rendered first-page thumbnail; raises NotFound when it is missing."""
+    match = STORAGE_PATH.match(thumbnail_path[: -len(".png")] + ".pdf")
+    response = send_from_directory(
+        UPLOADS_DIR,
+        thumbnail_path,
+        mimetype="image/png",
+        etag=match.group(1) if match else True,
+        max_age=ATTACHMENT_MAX_AGE if match else None,
+    )
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
+class AttachmentProcessor:
+    """
+    Run `process_attachment` on a small thread pool so ticket creation only
+    pays for storing the upload. Jobs are submitted after the ticket commits;
+    anything lost to a restart is picked up by
+    `scripts/process_attachments.py`.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = workers
+        self._app = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        self.workers = int(os.getenv("ATTACHMENT_WORKERS", self.workers))
+        app.extensions["attachment_processor"] = self
+        if self.workers > 0 and not available():
+            logger.warning("Install PyMuPDF or pypdf to extract previews from ticket PDFs.")
+        atexit.register(self.shutdown)
+
+    @property
+    def enabled(self) -> bool:
+        return self._app is not None and self.workers > 0 and available()
+
+    def submit(self, storage_path: Optional[str]) -> bool:
+        if not storage_path or not STORAGE_PATH.match(storage_path) or not self.enabled:
+            return False
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="attachment-processing"
+                )
+            self._executor.submit(self._run, storage_path)
+        return True
+
+    def _run(self, storage_path: str) -> None:
+        with self._app.app_context():
+            try:
+                process_attachment(storage_path)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Attachment processing failed for %s", storage_path)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+attachment_processor = AttachmentProcessor()
@@ -0,0 +1,63 @@
+import logging
+from typing import Callable, List, Set
+
+from sqlalchemy import event
+
+from backend.database import db
+
+logger = logging.getLogger(__name__)
+
+CommitListener = Callable[[Set[str]], None]
+
+_commit_listeners: List[CommitListener] = []
+_installed = False
+
+
+def on_commit(callback: CommitListener) -> CommitListener:
+    """
+    Register `callback(tables)` to run after every commit that wrote to at
+    least one table. It runs inside the commit hook, so it must not use the
+    session; queue work or drop caches instead.
+    """
+    if callback not in _commit_listeners:
+        _commit_listeners.append(callback)
+    return callback
+
+
+def touch(session, *tables: str) -> None:
+    """Record tables written with Core statements, which `after_flush` cannot see."""
+    session.info.setdefault("touched_tables", set()).update(tables)
+
+
+def install() -> None:
+    """Track the tables each `db.session` transaction touches."""
+    global _installed
+    if _installed:
+        return
+    event.listen(db.session, "after_flush", _collect_touched_tables)
+    event.listen(db.session, "after_commit", _dispatch)
+    event.listen(db.session, "after_rollback", _clear_touched_tables)
+    _installed = True
+
+
+def _collect_touched_tables(session, flush_context) -> None:
+    touched = session.info.setdefault("touched_tables", set())
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table:
+            touched.add(table)
+
+
+def _dispatch(session) -> None:
+    touched = session.info.pop("touched_tables", None)
+    if not touched:
+        return
+    for callback in list(_commit_listeners):
+        try:
+            callback(touched)
+        except Exception as exc:  # pragma: no cover - listeners must not break commits
+            logger.exception("Commit listener %r failed: %s", callback, exc)
+
+
+def _clear_touched_tables(session) -> None:
+    session.info.pop("touched_tables", None)
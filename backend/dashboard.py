@@ -0,0 +1,163 @@
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import and_, case, func, or_
+
+from backend import change_tracking
+from backend.cache import TTLCache
+from backend.database import db
+from backend.models import Events, FeeCollectionSummary, HelpTickets, StudentFeeBalance, StudentFeesPayment
+
+# Commits touching these tables drop the cached dashboard.
+DASHBOARD_TABLES = {
+    StudentFeesPayment.__tablename__,
+    HelpTickets.__tablename__,
+    Events.__tablename__,
+}
+RESOLVED_STATUS_KEY = "resolved"
+PENDING_STATUS_KEYS = ("open", "in progress")
+# (label, minimum age in days, maximum age in days) for unresolved tickets.
+TICKET_AGE_BUCKETS = [
+    ("under_1_day", None, 1),
+    ("1_to_7_days", 1, 7),
+    ("7_to_30_days", 7, 30),
+    ("over_30_days", 30, None),
+]
+UPCOMING_EVENTS_LIMIT = 4
+PENDING_TICKETS_LIMIT = 10
+
+dashboard_cache = TTLCache(ttl=30.0, max_entries=8)
+
+
+def init_app(app) -> None:
+    dashboard_cache.ttl = float(os.getenv("DASHBOARD_CACHE_SECONDS", dashboard_cache.ttl))
+    change_tracking.on_commit(_invalidate)
+
+
+def _invalidate(tables: Set[str]) -> None:
+    if tables & DASHBOARD_TABLES:
+        dashboard_cache.clear()
+
+
+def get_dashboard(today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Summary cards for the admin dashboard, computed with GROUP BY queries and
+    cached for `DASHBOARD_CACHE_SECONDS`. Writes to fees, tickets or events
+    invalidate the cache on commit.
+    """
+    today = today or date.today()
+    return dashboard_cache.get_or_set(today.isoformat(), lambda: build_dashboard(today))
+
+
+def build_dashboard(today: date) -> Dict[str, Any]:
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "fees": _fee_summary(),
+        "tickets": _ticket_summary(datetime.utcnow()),
+        "events": _event_summary(today),
+    }
+
+
+def _fee_summary() -> Dict[str, Any]:
+    """
+    Fee totals read from `fee_collection_summary` and `student_fee_balances`,
+    whose size depends on the number of groups and students rather than on
+    payment history.
+    """
+    summary = FeeCollectionSummary
+    payments = func.coalesce(func.sum(summary.payment_count), 0)
+    collected = func.coalesce(func.sum(summary.paid_amount), 0)
+    outstanding = func.coalesce(func.sum(summary.remaining_amount), 0)
+
+    count, paid, remaining = db.session.query(payments, collected, outstanding).one()
+    students = db.session.query(func.count(StudentFeeBalance.id)).scalar()
+
+    def breakdown(column, label=None) -> List[Dict[str, Any]]:
+        label = label if label is not None else column
+        rows = (
+            db.session.query(func.max(label), payments, collected, outstanding)
+            .group_by(column)
+            .order_by(column)
+            .all()
+        )
+        return [
+            {
+                "value": value,
+                "payments": int(row_payments),
+                "collected": float(row_paid),
+                "outstanding": float(row_remaining),
+            }
+            for value, row_payments, row_paid, row_remaining in rows
+        ]
+
+    return {
+        "payments": int(count),
+        "students": students,
+        "collected": float(paid),
+        "outstanding": float(remaining),
+        "by_category": breakdown(summary.category_key, summary.category),
+        "by_semester": breakdown(summary.semester),
+        "by_admission_year": breakdown(summary.admission_year),
+    }
+
+
+def _ticket_summary(now: datetime) -> Dict[str, Any]:
+    by_status = {
+        status or "Unknown": count
+        for status, count in db.session.query(HelpTickets.status, func.count(HelpTickets.id))
+        .group_by(HelpTickets.status)
+        .order_by(HelpTickets.status)
+        .all()
+    }
+    resolved = sum(
+        count for status, count in by_status.items() if (status or "").strip().lower() == RESOLVED_STATUS_KEY
+    )
+
+    age_columns = []
+    for label, min_days, max_days in TICKET_AGE_BUCKETS:
+        conditions = []
+        if max_days is not None:
+            conditions.append(HelpTickets.created_at > now - timedelta(days=max_days))
+        if min_days is not None:
+            conditions.append(HelpTickets.created_at <= now - timedelta(days=min_days))
+        age_columns.append(func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0).label(label))
+    ages = (
+        db.session.query(*age_columns)
+        .filter(or_(HelpTickets.status_key.is_(None), HelpTickets.status_key != RESOLVED_STATUS_KEY))
+        .one()
+    )
+
+    pending = (
+        HelpTickets.query.filter(HelpTickets.status_key.in_(PENDING_STATUS_KEYS))
+        .order_by(HelpTickets.created_at.desc(), HelpTickets.id.desc())
+        .limit(PENDING_TICKETS_LIMIT)
+        .all()
+    )
+
+    return {
+        "total": sum(by_status.values()),
+        "open": sum(by_status.values()) - resolved,
+        "resolved": resolved,
+        "by_status": by_status,
+        "open_by_age": {label: int(value) for label, value in ages._mapping.items()},
+        "pending": [ticket.to_dict(["id", "student_name", "query", "status", "created_at"]) for ticket in pending],
+    }
+
+
+def _event_summary(today: date) -> Dict[str, Any]:
+    upcoming, happening_today = db.session.query(
+        func.coalesce(func.sum(case((Events.event_date > today, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Events.event_date == today, 1), else_=0)), 0),
+    ).one()
+    next_events = (
+        Events.query.filter(Events.event_date > today)
+        .order_by(Events.event_date, Events.id)
+        .limit(UPCOMING_EVENTS_LIMIT)
+        .all()
+    )
+    return {
+        "upcoming": int(upcoming),
+        "today": int(happening_today),
+        "next": [event.to_dict(["id", "event_name", "event_type", "event_date"]) for event in next_events],
+    }
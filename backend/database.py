@@ -1,19 +1,81 @@
 import os
+import random
+import time
+from typing import Any, Dict
+
+from flask import g, session
 from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager
+from flask_login import LoginManager, UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.cache import TTLCache
 
 db = SQLAlchemy()
 login_manager = LoginManager()
 
+REPLICA_BIND_PREFIX = "replica_"
+# After an admin write, that browser's chatbot reads go to the primary for
+# this long so they see the change before the replicas catch up.
+DEFAULT_REPLICA_STICKY_SECONDS = 10.0
+
+# Applied to every new SQLite connection unless `SQLITE_TUNED=0`. WAL lets
+# chatbot reads proceed while an admin write is in progress; NORMAL is
+# durable across application crashes in WAL mode (a power loss may drop the
+# last transactions); a negative cache_size is in KiB.
+DEFAULT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+# Admin identities by id, so authenticated requests skip the `admins` lookup.
+# Commits touching `admins` clear it; other workers may serve a changed or
+# deleted admin for up to `ADMIN_CACHE_SECONDS`.
+admin_cache = TTLCache(ttl=30.0, max_entries=256)
+
+
+class AdminIdentity(UserMixin):
+    """Detached, read-only copy of the `Admin` fields a request needs."""
+
+    def __init__(self, id: int, username: str):
+        self.id = id
+        self.username = username
+
+
+def forget_admin(admin_id) -> None:
+    admin_cache.pop(int(admin_id), None)
+
+
+def _invalidate_admins(tables) -> None:
+    if "admins" in tables:
+        admin_cache.clear()
+
 
 def init_extensions(app):
     """
     Bind Flask extensions to the given application instance.
     """
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            tune_sqlite_engine(engine)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
     login_manager.session_protection = "strong"
+    admin_cache.ttl = float(os.getenv("ADMIN_CACHE_SECONDS", admin_cache.ttl))
+
+    from backend import change_tracking
+
+    change_tracking.on_commit(_invalidate_admins)
+
+    @app.teardown_appcontext
+    def close_replica_session(exc):
+        replica_session = g.pop("replica_session", None)
+        if replica_session is not None:
+            replica_session.close()
 
     @login_manager.user_loader
     def load_user(admin_id):
@@ -21,11 +83,145 @@ def init_extensions(app):
 
         if admin_id is None:
             return None
-        return Admin.query.get(int(admin_id))
+        admin_id = int(admin_id)
+        identity = admin_cache.get(admin_id)
+        if identity is None:
+            admin = db.session.get(Admin, admin_id)
+            if admin is None:
+                return None
+            identity = AdminIdentity(admin.id, admin.username)
+            admin_cache.set(admin_id, identity)
+        return identity
 
     return app
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def engine_options(uri: str) -> Dict[str, Any]:
+    """
+    Connection pool settings for `uri` from the environment:
+    `DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT` (seconds),
+    `DB_POOL_RECYCLE` (seconds, default 1800, below MySQL's idle timeouts)
+    and `DB_POOL_PRE_PING` (default on, so connections dropped while idle are
+    replaced instead of failing the request). SQLite has its own profile;
+    see `sqlite_pragmas`.
+    """
+    if uri.startswith("sqlite"):
+        return _sqlite_engine_options(uri)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", True),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    _pool_size_options(options)
+    return options
+
+
+def _pool_size_options(options: Dict[str, Any]) -> None:
+    for env, key in (
+        ("DB_POOL_SIZE", "pool_size"),
+        ("DB_MAX_OVERFLOW", "max_overflow"),
+        ("DB_POOL_TIMEOUT", "pool_timeout"),
+    ):
+        if os.getenv(env):
+            options[key] = int(os.environ[env])
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    PRAGMAs for new SQLite connections: `DEFAULT_SQLITE_PRAGMAS` overridden by
+    `SQLITE_JOURNAL_MODE`, `SQLITE_SYNCHRONOUS`, `SQLITE_BUSY_TIMEOUT_MS`,
+    `SQLITE_CACHE_SIZE_KB` and `SQLITE_MMAP_SIZE_MB`. Empty with `SQLITE_TUNED=0`.
+    """
+    if not _env_flag("SQLITE_TUNED", True):
+        return {}
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    if os.getenv("SQLITE_JOURNAL_MODE"):
+        pragmas["journal_mode"] = os.environ["SQLITE_JOURNAL_MODE"].strip().upper()
+    if os.getenv("SQLITE_SYNCHRONOUS"):
+        pragmas["synchronous"] = os.environ["SQLITE_SYNCHRONOUS"].strip().upper()
+    if os.getenv("SQLITE_BUSY_TIMEOUT_MS"):
+        pragmas["busy_timeout"] = int(os.environ["SQLITE_BUSY_TIMEOUT_MS"])
+    if os.getenv("SQLITE_CACHE_SIZE_KB"):
+        pragmas["cache_size"] = -int(os.environ["SQLITE_CACHE_SIZE_KB"])
+    if os.getenv("SQLITE_MMAP_SIZE_MB"):
+        pragmas["mmap_size"] = int(os.environ["SQLITE_MMAP_SIZE_MB"]) * 1024 * 1024
+    return pragmas
+
+
+def _sqlite_engine_options(uri: str) -> Dict[str, Any]:
+    """
+    Pool settings for a SQLite `uri`. File databases get a `QueuePool`
+    (SQLAlchemy's default) shared by the request threads, so connections
+    must not be pinned to the thread that opened them; the driver timeout
+    matches `busy_timeout`. In-memory databases keep Flask-SQLAlchemy's
+    single shared connection.
+    """
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return {}
+    options: Dict[str, Any] = {
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": pragmas.get("busy_timeout", 5000) / 1000,
+        }
+    }
+    if ":memory:" not in uri and uri.rstrip("/") != "sqlite:":
+        _pool_size_options(options)
+    return options
+
+
+def tune_sqlite_engine(engine) -> None:
+    """Apply `sqlite_pragmas()` to every connection `engine` opens (no-op for other databases)."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def replica_binds() -> Dict[str, Dict[str, Any]]:
+    """`SQLALCHEMY_BINDS` entries for the comma-separated `DATABASE_REPLICA_URLS`."""
+    urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    return {f"{REPLICA_BIND_PREFIX}{index}": {"url": url, **engine_options(url)} for index, url in enumerate(urls)}
+
+
+def stick_to_primary() -> None:
+    """Send this browser's reads to the primary for the sticky window (read-your-writes)."""
+    seconds = float(os.getenv("DB_REPLICA_STICKY_SECONDS", DEFAULT_REPLICA_STICKY_SECONDS))
+    session["read_primary_until"] = time.time() + seconds
+
+
+def read_session():
+    """
+    The session for read-only chatbot queries: a request-scoped session on a
+    randomly chosen replica, or `db.session` (the primary) when no replicas
+    are configured or this browser wrote through the admin API moments ago.
+    Never write through it.
+    """
+    if "replica_session" in g:
+        return g.replica_session
+    keys = [key for key in db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+    if not keys or session.get("read_primary_until", 0) > time.time():
+        return db.session
+    g.replica_session = Session(bind=db.engines[random.choice(keys)], autoflush=False)
+    return g.replica_session
+
+
 def get_database_uri(base_dir: str) -> str:
     """
     Resolve the SQLAlchemy database URI for MySQL or SQLite.
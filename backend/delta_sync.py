@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+
+from backend.database import db
+from backend.models import SyncTrackedMixin, Tombstone
+from backend.pagination import MAX_PAGE_SIZE
+
+# Rows are stamped when they are flushed but only become visible on commit, so
+# a delta also re-sends rows stamped this long before the client's last sync.
+# It must exceed the longest transaction that writes tracked rows; the
+# slowest are bulk import and archive batches, which take seconds.
+SYNC_OVERLAP = timedelta(seconds=float(os.getenv("SYNC_OVERLAP_SECONDS", "60")))
+# Tombstones older than this are pruned; older sync tokens get a full reload.
+TOMBSTONE_RETENTION = timedelta(days=30)
+# A delta larger than this is answered with a reset instead.
+MAX_DELTA_ROWS = MAX_PAGE_SIZE
+
+
+def sync_token(model=None) -> str:
+    """
+    The token a client sends back as `since` to fetch later changes: the
+    newest `updated_at` (or tombstone) of `model` visible to this request,
+    so it is on the same clock as the stamps it is compared with rather than
+    this server's. Read it before the rows it goes out with.
+    """
+    latest = None
+    if model is not None and issubclass(model, SyncTrackedMixin):
+        latest = db.session.query(
+            func.max(model.updated_at),
+            db.session.query(func.max(Tombstone.deleted_at))
+            .filter(Tombstone.table_name == model.__tablename__)
+            .scalar_subquery(),
+        ).one()
+        latest = max((value for value in latest if value is not None), default=None)
+    return (latest or datetime.utcnow()).isoformat()
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("since must be a sync token returned by a previous list request.")
+
+
+def delta_payload(query, model, since: datetime, token: str, serialize=None) -> Dict[str, Any]:
+    """
+    Rows of `query` changed since `since` plus the ids the client should drop:
+    deleted rows (from tombstones) and changed rows that no longer match the
+    query's filters. `reset` tells the client to refetch the whole list.
+    """
+    if since < datetime.utcnow() - TOMBSTONE_RETENTION:
+        return {"reset": True, "synced_at": token}
+
+    horizon = since - SYNC_OVERLAP
+    items = (
+        query.filter(model.updated_at >= horizon)
+        .order_by(model.updated_at, model.id)
+        .limit(MAX_DELTA_ROWS + 1)
+        .all()
+    )
+    if len(items) > MAX_DELTA_ROWS:
+        return {"reset": True, "synced_at": token}
+
+    changed = db.session.query(model.id).filter(model.updated_at >= horizon).limit(MAX_DELTA_ROWS + 1).all()
+    if len(changed) > MAX_DELTA_ROWS:
+        return {"reset": True, "synced_at": token}
+
+    kept = {row.id for row in items}
+    removed = {row.id for row in changed}
+    removed.update(
+        row.row_id
+        for row in db.session.query(Tombstone.row_id).filter(
+            Tombstone.table_name == model.__tablename__, Tombstone.deleted_at >= horizon
+        )
+    )
+    serialize = serialize or (lambda row: row.to_dict())
+    return {
+        "items": [serialize(row) for row in items],
+        "deleted": sorted(removed - kept),
+        "synced_at": token,
+    }
+
+
+def prune_tombstones() -> int:
+    deleted = Tombstone.query.filter(
+        Tombstone.deleted_at < datetime.utcnow() - TOMBSTONE_RETENTION
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
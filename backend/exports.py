@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from sqlalchemy import select
+
+from backend.database import db
+from backend.models import FeesStructure, HelpTickets, StudentFeesPayment, normalize_key
+from backend.pagination import parse_date_range
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+# Rows fetched per server-side batch and written per response chunk.
+EXPORT_BATCH_SIZE = 1000
+
+
+def _split(value) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class ExportSpec:
+    """
+    A streamable table: which model to read, how to order it, which column
+    the `date_from`/`date_to` range applies to, and the extra filters accepted.
+    """
+
+    def __init__(self, model, order: Sequence[Any], date_column, filters: Dict[str, Callable[[str], Any]]):
+        self.model = model
+        self.order = order
+        self.date_column = date_column
+        self.filters = filters
+
+    @property
+    def columns(self):
+        skip = set(getattr(self.model, "normalized_columns", {}).values())
+        return [column for column in self.model.__table__.columns if column.key not in skip]
+
+    def statement(self, args):
+        clauses = parse_date_range(args, self.date_column)
+        for name, build in self.filters.items():
+            if args.get(name):
+                clauses.append(build(args[name]))
+        return select(*self.columns).where(*clauses).order_by(*self.order)
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "fees": ExportSpec(
+        FeesStructure,
+        [FeesStructure.category, FeesStructure.id],
+        FeesStructure.updated_at,
+        {"category": lambda value: FeesStructure.category_key == normalize_key(value)},
+    ),
+    "payments": ExportSpec(
+        StudentFeesPayment,
+        [StudentFeesPayment.payment_date, StudentFeesPayment.id],
+        StudentFeesPayment.payment_date,
+        {
+            "category": lambda value: StudentFeesPayment.category_key == normalize_key(value),
+            "student_id": lambda value: StudentFeesPayment.student_id == value.strip(),
+            "semester": lambda value: StudentFeesPayment.semester == value.strip(),
+            "admission_year": lambda value: StudentFeesPayment.admission_year == value.strip(),
+        },
+    ),
+    "tickets": ExportSpec(
+        HelpTickets,
+        [HelpTickets.created_at, HelpTickets.id],
+        HelpTickets.created_at,
+        {
+            "status": lambda value: HelpTickets.status_key.in_([normalize_key(item) for item in _split(value)]),
+            "topic": lambda value: HelpTickets.topic_key == normalize_key(value),
+        },
+    ),
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_export(name: str, fmt: str, args) -> Iterator[str]:
+    """
+    Build the export query for `name` (validating `args` immediately) and
+    return a generator of response chunks.
+
+    Rows are read as plain tuples with `yield_per`, which makes the driver
+    use a server-side cursor where it has one, so memory stays bounded by
+    `EXPORT_BATCH_SIZE` rather than by the table size.
+    """
+    spec = EXPORTS.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown export: {name}. Choose one of: {', '.join(EXPORTS)}.")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}.")
+    statement = spec.statement(args).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    headers = [column.name for column in spec.columns]
+
+    def generate() -> Iterator[str]:
+        result = db.session.execute(statement)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(headers)
+        try:
+            for rows in result.partitions():
+                for row in rows:
+                    if writer:
+                        writer.writerow([_plain(value) for value in row])
+                    else:
+                        buffer.write(json.dumps(dict(zip(headers, map(_plain, row)))))
+                        buffer.write("\n")
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            result.close()
+
+    return generate()
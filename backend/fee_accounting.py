@@ -0,0 +1,332 @@
+import logging
+from collections import defaultdict
+from itertools import groupby
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import db
+from backend.models import FeeCollectionSummary, StudentFeeBalance, StudentFeesPayment, normalize_key
+
+logger = logging.getLogger(__name__)
+
+GROUP_COLUMNS = ("category_key", "admission_year", "semester")
+AMOUNT_COLUMNS = ("total_fees", "paid_amount", "remaining_amount")
+TRACKED_ATTRIBUTES = ("category",) + GROUP_COLUMNS + AMOUNT_COLUMNS
+BALANCE_BATCH_SIZE = 1000
+
+# (category_key, admission_year, semester) -> {"category", "payment_count", amounts...}
+SummaryDeltas = Dict[Tuple[str, str, str], Dict[str, float]]
+
+
+def payment_values(record, previous: bool = False) -> Dict[str, object]:
+    """
+    The summary-relevant values of a payment row. With `previous=True` the
+    values as they were before the pending (unflushed) changes are returned.
+    """
+    state = inspect(record)
+    values = {}
+    for name in TRACKED_ATTRIBUTES:
+        value = getattr(record, name)
+        if previous:
+            history = state.attrs[name].history
+            if history.deleted:
+                value = history.deleted[0]
+        values[name] = value
+    if not values["category_key"]:
+        values["category_key"] = normalize_key(values["category"])
+    return values
+
+
+def group_columns():
+    """
+    SQL for a payment's summary group, matching `payment_values`: rows whose
+    `category_key` is not filled in yet are grouped by their normalized category.
+    """
+    payments = StudentFeesPayment.__table__
+    return (
+        func.coalesce(payments.c.category_key, func.lower(func.trim(payments.c.category))).label("category_key"),
+        payments.c.admission_year,
+        payments.c.semester,
+    )
+
+
+def add_delta(deltas: SummaryDeltas, values: Dict[str, object], sign: int) -> None:
+    key = tuple(str(values[column]) for column in GROUP_COLUMNS)
+    entry = deltas.setdefault(key, defaultdict(float))
+    entry["category"] = values["category"]
+    entry["payment_count"] += sign
+    for column in AMOUNT_COLUMNS:
+        entry[column] += sign * float(values[column] or 0)
+
+
+def apply_deltas(connection, deltas: SummaryDeltas) -> None:
+    """
+    Add `deltas` to the summary rows with relative `UPDATE ... SET x = x + :d`
+    statements on `connection`, so they commit or roll back together with the
+    payment rows that produced them.
+    """
+    table = FeeCollectionSummary.__table__
+    for key, delta in deltas.items():
+        if not delta["payment_count"] and not any(delta[column] for column in AMOUNT_COLUMNS):
+            continue
+        match = [table.c[column] == value for column, value in zip(GROUP_COLUMNS, key)]
+        increments = {
+            "payment_count": table.c.payment_count + int(delta["payment_count"]),
+            **{column: table.c[column] + delta[column] for column in AMOUNT_COLUMNS},
+        }
+        if connection.execute(update(table).where(*match).values(**increments)).rowcount:
+            if delta["payment_count"] < 0:
+                connection.execute(delete(table).where(*match, table.c.payment_count <= 0))
+            continue
+        if delta["payment_count"] <= 0:
+            # Removing payments from a group the summary does not have: it has
+            # drifted from the payments, and a negative row would only hide that.
+            logger.warning(
+                "Fee summary has no group %s to subtract %d payment(s) from; "
+                "run scripts/rebuild_fee_summary.py.",
+                "/".join(key),
+                -int(delta["payment_count"]),
+            )
+            continue
+
+        row = dict(zip(GROUP_COLUMNS, key))
+        row.update(
+            category=delta["category"],
+            payment_count=int(delta["payment_count"]),
+            **{column: delta[column] for column in AMOUNT_COLUMNS},
+        )
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(table).values(**row))
+        except IntegrityError:
+            # Another transaction created the group first; add to its row instead.
+            connection.execute(update(table).where(*match).values(**increments))
+
+
+def rebuild_fee_summary() -> int:
+    """
+    Recompute the summary from `student_fees_payments` in one transaction.
+    Returns the number of summary rows written.
+    """
+    payments = StudentFeesPayment.__table__
+    summary = FeeCollectionSummary.__table__
+    group = group_columns()
+    grouped = select(
+        func.max(payments.c.category),
+        *group,
+        func.count(payments.c.id),
+        func.coalesce(func.sum(payments.c.total_fees), 0),
+        func.coalesce(func.sum(payments.c.paid_amount), 0),
+        func.coalesce(func.sum(payments.c.remaining_amount), 0),
+    ).group_by(*group)
+    db.session.execute(delete(summary))
+    result = db.session.execute(
+        insert(summary).from_select(
+            [
+                "category",
+                "category_key",
+                "admission_year",
+                "semester",
+                "payment_count",
+                "total_fees",
+                "paid_amount",
+                "remaining_amount",
+            ],
+            grouped,
+        )
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def _balance_rows():
+    payments = StudentFeesPayment.__table__
+    return select(
+        payments.c.student_id,
+        payments.c.student_name,
+        payments.c.semester,
+        payments.c.total_fees,
+        payments.c.paid_amount,
+        payments.c.payment_date,
+    ).order_by(payments.c.student_id, payments.c.payment_date, payments.c.id)
+
+
+def compute_balance(student_id: str, rows: Iterable[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Fold a student's payments (oldest first) into a balance row. Each
+    semester is due once, at the highest `total_fees` recorded for it, so
+    several installments for the same semester are not double counted.
+    """
+    due_by_semester: Dict[str, float] = {}
+    values: Dict[str, Any] = {"student_id": student_id, "payment_count": 0, "total_paid": 0.0}
+    last_payment = None
+    for row in rows:
+        due_by_semester[row.semester] = max(due_by_semester.get(row.semester, 0.0), float(row.total_fees or 0))
+        values["total_paid"] += float(row.paid_amount or 0)
+        values["payment_count"] += 1
+        values["student_name"] = row.student_name
+        if row.payment_date and (last_payment is None or row.payment_date > last_payment):
+            last_payment = row.payment_date
+    if not values["payment_count"]:
+        return None
+    values["total_due"] = sum(due_by_semester.values())
+    values["balance"] = values["total_due"] - values["total_paid"]
+    values["last_payment_date"] = last_payment
+    return values
+
+
+def refresh_student_balance(connection, student_id: str) -> None:
+    """Recompute one student's balance row from their payments on `connection`."""
+    payments = StudentFeesPayment.__table__
+    balances = StudentFeeBalance.__table__
+    rows = connection.execute(_balance_rows().where(payments.c.student_id == student_id)).all()
+    values = compute_balance(student_id, rows)
+    match = balances.c.student_id == student_id
+    if values is None:
+        connection.execute(delete(balances).where(match))
+        return
+    if connection.execute(update(balances).where(match).values(**values)).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(balances).values(**values))
+    except IntegrityError:
+        connection.execute(update(balances).where(match).values(**values))
+
+
+def refresh_student_balances(connection, student_ids: Iterable[str]) -> None:
+    """
+    Recompute the balance rows of many students with one grouped read per
+    `BALANCE_BATCH_SIZE` students (used by bulk writes that bypass the ORM).
+    """
+    payments = StudentFeesPayment.__table__
+    balances = StudentFeeBalance.__table__
+    student_ids = sorted(set(student_ids))
+    for start in range(0, len(student_ids), BALANCE_BATCH_SIZE):
+        chunk = student_ids[start : start + BALANCE_BATCH_SIZE]
+        rows = connection.execute(_balance_rows().where(payments.c.student_id.in_(chunk)))
+        values = [
+            compute_balance(student_id, group)
+            for student_id, group in groupby(rows, key=lambda row: row.student_id)
+        ]
+        connection.execute(delete(balances).where(balances.c.student_id.in_(chunk)))
+        if values:
+            connection.execute(insert(balances), values)
+
+
+def rebuild_student_balances() -> int:
+    """Recompute every student's balance row in one pass over the payments."""
+    balances = StudentFeeBalance.__table__
+    db.session.execute(delete(balances))
+    count = 0
+    batch = []
+    rows = db.session.execute(_balance_rows().execution_options(yield_per=BALANCE_BATCH_SIZE))
+    for student_id, student_rows in groupby(rows, key=lambda row: row.student_id):
+        batch.append(compute_balance(student_id, student_rows))
+        if len(batch) >= BALANCE_BATCH_SIZE:
+            count += _insert_balances(batch)
+            batch = []
+    count += _insert_balances(batch)
+    db.session.commit()
+    return count
+
+
+def _insert_balances(batch) -> int:
+    if batch:
+        db.session.execute(insert(StudentFeeBalance.__table__), batch)
+    return len(batch)
+
+
+def ensure_fee_accounting() -> None:
+    """Build the summary and balance tables once for databases that predate them."""
+    has_payments = db.session.execute(select(StudentFeesPayment.id).limit(1)).first()
+    if not has_payments:
+        return
+    if not db.session.execute(select(FeeCollectionSummary.id).limit(1)).first():
+        logger.info("Building fee collection summary (%s groups)", rebuild_fee_summary())
+    if not db.session.execute(select(StudentFeeBalance.id).limit(1)).first():
+        logger.info("Building student fee balances (%s students)", rebuild_student_balances())
+
+
+def student_ledger(student_id: str) -> Dict[str, Any]:
+    """
+    All payments of one student, oldest first, with the running amount paid
+    and the balance left for the payment's semester after each installment.
+    """
+    records = (
+        StudentFeesPayment.query.filter(StudentFeesPayment.student_id == student_id)
+        .order_by(StudentFeesPayment.payment_date, StudentFeesPayment.id)
+        .all()
+    )
+    due_by_semester: Dict[str, float] = {}
+    for record in records:
+        due_by_semester[record.semester] = max(
+            due_by_semester.get(record.semester, 0.0), float(record.total_fees or 0)
+        )
+
+    paid_by_semester: Dict[str, float] = defaultdict(float)
+    count_by_semester: Dict[str, int] = defaultdict(int)
+    entries = []
+    for record in records:
+        paid_by_semester[record.semester] += float(record.paid_amount or 0)
+        count_by_semester[record.semester] += 1
+        entry = record.to_dict()
+        entry["semester_paid"] = paid_by_semester[record.semester]
+        entry["balance_after"] = due_by_semester[record.semester] - paid_by_semester[record.semester]
+        entries.append(entry)
+
+    balance = StudentFeeBalance.query.filter_by(student_id=student_id).first()
+    return {
+        "student_id": student_id,
+        "balance": balance.to_dict() if balance else None,
+        "semesters": [
+            {
+                "semester": semester,
+                "payments": count_by_semester[semester],
+                "due": due,
+                "paid": paid_by_semester[semester],
+                "balance": due - paid_by_semester[semester],
+            }
+            for semester, due in due_by_semester.items()
+        ],
+        "entries": entries,
+    }
+
+
+def _previous(record, name: str):
+    history = inspect(record).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(record, name)
+
+
+# Load the previous value on assignment so `after_update` can subtract it even
+# when the row was expired before being modified.
+for _name in TRACKED_ATTRIBUTES + ("student_id",):
+    event.listen(getattr(StudentFeesPayment, _name), "set", lambda *args: None, active_history=True)
+
+
+@event.listens_for(StudentFeesPayment, "after_insert")
+def _payment_inserted(mapper, connection, target):
+    deltas: SummaryDeltas = {}
+    add_delta(deltas, payment_values(target), 1)
+    apply_deltas(connection, deltas)
+    refresh_student_balance(connection, target.student_id)
+
+
+@event.listens_for(StudentFeesPayment, "after_update")
+def _payment_updated(mapper, connection, target):
+    deltas: SummaryDeltas = {}
+    add_delta(deltas, payment_values(target, previous=True), -1)
+    add_delta(deltas, payment_values(target), 1)
+    apply_deltas(connection, deltas)
+    for student_id in {_previous(target, "student_id"), target.student_id}:
+        refresh_student_balance(connection, student_id)
+
+
+@event.listens_for(StudentFeesPayment, "after_delete")
+def _payment_deleted(mapper, connection, target):
+    deltas: SummaryDeltas = {}
+    add_delta(deltas, payment_values(target, previous=True), -1)
+    apply_deltas(connection, deltas)
+    refresh_student_balance(connection, _previous(target, "student_id"))
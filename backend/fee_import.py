@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from backend import change_tracking
+from backend.database import db
+from backend.fee_accounting import SummaryDeltas, add_delta, apply_deltas, refresh_student_balances
+from backend.models import FeeCollectionSummary, StudentFeeBalance, StudentFeesPayment, normalize_key
+
+STUDENT_FEE_REQUIRED = [
+    "student_name",
+    "student_id",
+    "admission_year",
+    "category",
+    "total_fees",
+    "paid_amount",
+    "receipt_number",
+    "semester",
+]
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def validate_student_fee(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a student fee payload and return the column values to insert.
+    Raises ValueError with a message suitable for the client.
+    """
+    if not all(data.get(field) for field in STUDENT_FEE_REQUIRED):
+        raise ValueError("Missing required student fee fields.")
+
+    amounts = {}
+    for field in ("total_fees", "paid_amount", "remaining_amount"):
+        value = data.get(field)
+        if value in (None, ""):
+            continue
+        try:
+            amounts[field] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number.")
+    if "remaining_amount" not in amounts:
+        amounts["remaining_amount"] = amounts["total_fees"] - amounts["paid_amount"]
+
+    payment_date = data.get("payment_date")
+    if isinstance(payment_date, str):
+        try:
+            payment_date = datetime.fromisoformat(payment_date) if payment_date else None
+        except ValueError:
+            raise ValueError("payment_date must be an ISO 8601 date or datetime.")
+    elif payment_date is not None and not isinstance(payment_date, datetime):
+        raise ValueError("payment_date must be an ISO 8601 date or datetime.")
+
+    category = str(data["category"]).strip()
+    return {
+        "student_name": str(data["student_name"]).strip(),
+        "student_id": str(data["student_id"]).strip(),
+        "admission_year": str(data["admission_year"]).strip(),
+        "category": category,
+        "category_key": normalize_key(category),
+        "payment_date": payment_date or datetime.utcnow(),
+        "receipt_number": str(data["receipt_number"]).strip(),
+        "semester": str(data["semester"]).strip(),
+        **amounts,
+    }
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return None
+
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield `(line number, row dict)` from a binary CSV/NDJSON stream without
+    reading it into memory. Unparseable lines yield the exception instead.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(IMPORT_FORMATS)}.")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, ValueError(f"Invalid JSON: {exc}")
+            continue
+        yield line_number, row if isinstance(row, dict) else ValueError("Each line must be a JSON object.")
+
+
+def import_student_fees(
+    rows: Iterable[Tuple[int, Any]], *, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Validate and insert student fee rows in batches of `batch_size`.
+
+    Each batch is one transaction: an executemany INSERT, the fee summary
+    deltas aggregated over the batch, and one balance refresh for the
+    students it touched. Invalid rows are reported and skipped.
+    """
+    report: Dict[str, Any] = {"processed": 0, "imported": 0, "failed": 0, "batches": 0, "errors": []}
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    for line_number, row in rows:
+        report["processed"] += 1
+        if isinstance(row, Exception):
+            _fail(report, line_number, str(row))
+            continue
+        try:
+            batch.append((line_number, validate_student_fee(row)))
+        except ValueError as exc:
+            _fail(report, line_number, str(exc))
+            continue
+        if len(batch) >= batch_size:
+            _write_batch(batch, report, dry_run)
+            batch = []
+    if batch:
+        _write_batch(batch, report, dry_run)
+
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    report["dry_run"] = dry_run
+    return report
+
+
+def _fail(report: Dict[str, Any], line_number: int, message: str) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line_number, "error": message})
+
+
+def _insert(rows: List[Dict[str, Any]]) -> None:
+    deltas: SummaryDeltas = {}
+    for values in rows:
+        add_delta(deltas, values, 1)
+    db.session.execute(insert(StudentFeesPayment.__table__), rows)
+    connection = db.session.connection()
+    apply_deltas(connection, deltas)
+    refresh_student_balances(connection, (values["student_id"] for values in rows))
+
+
+def _write_batch(batch: List[Tuple[int, Dict[str, Any]]], report: Dict[str, Any], dry_run: bool) -> None:
+    """
+    Insert a validated batch in one transaction. If the database rejects it
+    (rather than being unreachable or locked), each row is retried in its own
+    savepoint so the report names the rows that failed and the rest are kept.
+    """
+    report["batches"] += 1
+    if dry_run:
+        report["imported"] += len(batch)
+        return
+
+    try:
+        _insert([values for _, values in batch])
+        written = [line_number for line_number, _ in batch]
+    except OperationalError as exc:
+        db.session.rollback()
+        for line_number, _ in batch:
+            _fail(report, line_number, f"Database unavailable: {exc.orig}")
+        return
+    except SQLAlchemyError:
+        db.session.rollback()
+        written = []
+        for line_number, values in batch:
+            try:
+                with db.session.begin_nested():
+                    _insert([values])
+                written.append(line_number)
+            except SQLAlchemyError as exc:
+                _fail(report, line_number, str(getattr(exc, "orig", exc)))
+
+    if written:
+        change_tracking.touch(
+            db.session,
+            StudentFeesPayment.__tablename__,
+            FeeCollectionSummary.__tablename__,
+            StudentFeeBalance.__tablename__,
+        )
+    try:
+        db.session.commit()
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        for line_number in written:
+            _fail(report, line_number, f"Batch could not be committed: {getattr(exc, 'orig', exc)}")
+        return
+    report["imported"] += len(written)
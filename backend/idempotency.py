@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, g, jsonify, make_response, request
+from flask_login import current_user
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import db
+from backend.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# How long a key and its stored response are honoured.
+IDEMPOTENCY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+# A reservation whose request never finished (worker killed) is released after
+# this. Requests running longer (bulk imports) renew theirs every third of it.
+RESERVATION_TIMEOUT = timedelta(seconds=60)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _scope() -> str:
+    user = current_user.get_id() if current_user.is_authenticated else "anonymous"
+    return f"{request.method} {request.path} {user}"[:255]
+
+
+def _fingerprint() -> str:
+    """
+    Hash the request so a key reused for a different request is rejected.
+    Uploaded files are hashed by content (they are already spooled by the
+    form parser); streamed raw bodies (bulk imports) are identified by length
+    and type only, so they are not read ahead of the view.
+    """
+    digest = hashlib.sha256(f"{request.method} {request.full_path}".encode())
+    if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"\0{name}={value}".encode())
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"\0{name}@{upload.filename}:".encode())
+            upload.stream.seek(0)
+            for chunk in iter(lambda: upload.stream.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            upload.stream.seek(0)
+    elif request.is_json:
+        digest.update(request.get_data(cache=True))
+    else:
+        digest.update(f"\0{request.mimetype}:{request.content_length}".encode())
+    return digest.hexdigest()
+
+
+def _error(message: str, code: int):
+    return jsonify({"error": message}), code
+
+
+def _reserve(scope: str, key: str, fingerprint: str):
+    """
+    Claim `key` for this request in its own committed transaction. Returns
+    None when the caller should run the view, otherwise the response to send.
+    """
+    table = IdempotencyKey.__table__
+    match = (table.c.scope == scope) & (table.c.key == key)
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        row = conn.execute(select(table).where(match)).first()
+        if row is not None and (
+            row.expires_at < now or (row.status_code is None and row.created_at < now - RESERVATION_TIMEOUT)
+        ):
+            conn.execute(delete(table).where(table.c.id == row.id))
+            row = None
+        if row is None:
+            try:
+                with conn.begin_nested():
+                    conn.execute(
+                        insert(table).values(
+                            scope=scope,
+                            key=key,
+                            request_hash=fingerprint,
+                            created_at=now,
+                            expires_at=now + IDEMPOTENCY_TTL,
+                        )
+                    )
+                return None
+            except IntegrityError:
+                # A concurrent request with the same key got there first.
+                row = conn.execute(select(table).where(match)).first()
+
+    if row.request_hash != fingerprint:
+        return _error(f"{IDEMPOTENCY_HEADER} was already used for a different request.", 422)
+    if row.status_code is None:
+        response = make_response(_error(f"A request with this {IDEMPOTENCY_HEADER} is still in progress.", 409))
+        response.headers["Retry-After"] = "1"
+        return response
+    response = Response(row.response_body, status=row.status_code, mimetype="application/json")
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+class _Renewal:
+    """Keep a reservation fresh while its request runs, so a retry does not take it over."""
+
+    def __init__(self, scope: str, key: str):
+        table = IdempotencyKey.__table__
+        self._engine = db.engine
+        self._statement = (
+            update(table)
+            .where(table.c.scope == scope, table.c.key == key, table.c.status_code.is_(None))
+        )
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="idempotency-renewal", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(RESERVATION_TIMEOUT.total_seconds() / 3):
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(self._statement.values(created_at=datetime.utcnow()))
+            except Exception as exc:  # pragma: no cover - the next renewal retries
+                logger.warning("Could not renew idempotency reservation: %s", exc)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _finish(scope: str, key: str, response=None) -> None:
+    table = IdempotencyKey.__table__
+    match = (table.c.scope == scope) & (table.c.key == key)
+    with db.engine.begin() as conn:
+        if response is None:
+            conn.execute(delete(table).where(match))
+        else:
+            conn.execute(
+                update(table)
+                .where(match)
+                .values(status_code=response.status_code, response_body=response.get_data(as_text=True))
+            )
+
+
+def idempotent(view):
+    """
+    Honour an `Idempotency-Key` header on a write endpoint.
+
+    The first request with a key runs the view; a successful (< 400) JSON
+    response is stored for `IDEMPOTENCY_TTL` and replayed, with an
+    `Idempotent-Replayed: true` header, to later requests with the same key
+    from the same user to the same endpoint. Failed requests release the key
+    so the client can correct and resend. Requests without the header, and
+    views run inside `POST /batch`, are not affected.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+        if not key or g.get("in_batch"):
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.", 400)
+
+        scope = _scope()
+        replay = _reserve(scope, key, _fingerprint())
+        if replay is not None:
+            return replay
+        renewal = _Renewal(scope, key)
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            renewal.stop()
+            _finish(scope, key)
+            raise
+        renewal.stop()
+        if response.status_code < 400 and response.is_json and not response.is_streamed:
+            _finish(scope, key, response)
+        else:
+            _finish(scope, key)
+        return response
+
+    return wrapper
+
+
+def prune_idempotency_keys() -> int:
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return deleted
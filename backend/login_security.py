@@ -0,0 +1,167 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, Tuple
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_WORKERS = 2
+# Password checks allowed to wait for a worker; further logins get a 503.
+QUEUE_PER_WORKER = 4
+HASH_TIMEOUT_SECONDS = 10.0
+
+# Failures allowed before backoff starts, the first delay and its ceiling.
+FREE_ATTEMPTS = 3
+BASE_DELAY_SECONDS = 1.0
+MAX_DELAY_SECONDS = 15 * 60.0
+# Counters untouched for this long are forgotten.
+FAILURE_WINDOW_SECONDS = 60 * 60.0
+
+
+class LoginBusy(RuntimeError):
+    """Raised when the password-hash pool is saturated or too slow."""
+
+
+class PasswordVerifier:
+    """
+    Run `check_password_hash` on a small bounded worker pool.
+
+    Hashing is deliberately expensive, so it is kept off the request workers:
+    a process pool where `fork` is available and a thread pool elsewhere. The
+    pool is created on the first check in each process, so an app imported
+    before the server forks (`gunicorn --preload`) never inherits a pool whose
+    workers belong to its parent. At most `workers * QUEUE_PER_WORKER` checks
+    may be queued; beyond that `verify` raises `LoginBusy` instead of tying up
+    more request threads. Unknown usernames are checked against a dummy hash
+    so they take as long as a wrong password.
+    """
+
+    def __init__(self, workers: int = DEFAULT_HASH_WORKERS):
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._dummy_hash: Optional[str] = None
+        self._registered = False
+
+    def init_app(self, app) -> None:
+        app.extensions["password_verifier"] = self
+        self._dummy()
+        self.workers = int(os.getenv("LOGIN_HASH_WORKERS", self.workers))
+        if self.workers > 0 and not self._registered:
+            self._registered = True
+            atexit.register(self.shutdown)
+
+    def _pool(self) -> Tuple[Executor, threading.BoundedSemaphore]:
+        """The pool for this process, created (or re-created after a fork) on demand."""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # A pool inherited across fork is not ours to shut down; drop it.
+                self._slots = threading.BoundedSemaphore(self.workers * QUEUE_PER_WORKER)
+                self._executor = self._create_executor()
+                self._pid = os.getpid()
+            return self._executor, self._slots
+
+    def _create_executor(self) -> Executor:
+        if "fork" in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("fork"))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def _dummy(self) -> str:
+        if self._dummy_hash is None:
+            self._dummy_hash = generate_password_hash(secrets.token_hex(16))
+        return self._dummy_hash
+
+    def verify(self, password_hash: Optional[str], password: str) -> bool:
+        """
+        Check `password` against `password_hash`; a None hash (no such user)
+        is checked against the dummy hash and always fails.
+        """
+        known = password_hash is not None
+        password_hash = password_hash if known else self._dummy()
+        if self.workers <= 0:
+            return check_password_hash(password_hash, password) and known
+
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            raise LoginBusy("Too many sign-ins in progress. Try again shortly.")
+        try:
+            future = executor.submit(check_password_hash, password_hash, password)
+            return future.result(timeout=HASH_TIMEOUT_SECONDS) and known
+        except FutureTimeout:
+            raise LoginBusy("Sign-in is taking too long. Try again shortly.")
+        except BrokenProcessPool:
+            logger.warning("Password hash pool died; restarting it.")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise LoginBusy("Sign-in is temporarily unavailable. Try again shortly.")
+        finally:
+            slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            owned = self._pid == os.getpid()
+        if executor is not None and owned:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LoginThrottle:
+    """
+    Count failed logins per username and per client IP in process memory.
+    After `FREE_ATTEMPTS` failures each further one locks that key for
+    `BASE_DELAY_SECONDS * 2 ** n`, up to `MAX_DELAY_SECONDS`. Locked keys are
+    refused before any password is hashed.
+    """
+
+    def __init__(self):
+        self._failures: Dict[Tuple[str, str], Tuple[int, float, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def keys(username: str, remote_addr: Optional[str]) -> Tuple[Tuple[str, str], ...]:
+        return (("user", username.lower()), ("ip", remote_addr or "unknown"))
+
+    def retry_after(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Seconds until every key may try again (0 when none is locked)."""
+        now = time.monotonic()
+        with self._lock:
+            locked_until = max((self._failures.get(key, (0, 0.0, 0.0))[1] for key in keys), default=0.0)
+        return max(0, int(locked_until - now + 0.999))
+
+    def record_failure(self, keys: Iterable[Tuple[str, str]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            for key in keys:
+                count, _, _ = self._failures.get(key, (0, 0.0, 0.0))
+                count += 1
+                delay = 0.0
+                if count > FREE_ATTEMPTS:
+                    delay = min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** (count - FREE_ATTEMPTS - 1))
+                self._failures[key] = (count, now + delay, now)
+
+    def reset(self, keys: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
+
+    def _prune(self, now: float) -> None:
+        stale = [key for key, (_, _, last) in self._failures.items() if now - last > FAILURE_WINDOW_SECONDS]
+        for key in stale:
+            del self._failures[key]
+
+
+password_verifier = PasswordVerifier()
+login_throttle = LoginThrottle()
@@ -0,0 +1,193 @@
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from backend.database import db
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Held while the schema is upgraded, so workers starting together (or the
+# migrate script and a worker) do not run the same DDL at once.
+MIGRATION_LOCK_NAME = "college_chatbot_schema_upgrade"
+MIGRATION_LOCK_KEY = 0x636F6C6C656765  # PostgreSQL advisory lock id
+MIGRATION_LOCK_TIMEOUT = 600
+
+
+@contextmanager
+def migration_lock():
+    """
+    A database-wide lock: `GET_LOCK` on MySQL, an advisory lock on
+    PostgreSQL and a lock file next to the database file on SQLite.
+    """
+    engine = db.engine
+    dialect = engine.dialect.name
+    if dialect in ("mysql", "postgresql"):
+        with engine.connect() as conn:
+            if dialect == "mysql":
+                acquired = conn.execute(
+                    text("SELECT GET_LOCK(:name, :timeout)"),
+                    {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT},
+                ).scalar()
+                if acquired != 1:
+                    raise RuntimeError("Timed out waiting for another process to upgrade the schema.")
+                release = text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME}
+            else:
+                conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                release = text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            # The lock belongs to the session; do not sit idle in a transaction.
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(*release)
+                conn.commit()
+        return
+
+    database = engine.url.database
+    if dialect != "sqlite" or fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.migrate.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate_database():
+    """
+    Create missing tables and upgrade existing ones under `migration_lock`.
+    Run by `scripts/migrate_db.py`, and at startup unless `AUTO_MIGRATE=0`.
+    """
+    with migration_lock():
+        try:
+            db.create_all()
+        except DBAPIError:
+            # Another process without the lock created a table first; checkfirst skips it now.
+            db.session.rollback()
+            db.create_all()
+        upgrade_schema()
+
+
+def _apply_ddl(run, exists, description: str) -> None:
+    """Run one DDL statement in its own transaction, tolerating an object that now exists."""
+    try:
+        with db.engine.begin() as conn:
+            run(conn)
+        logger.info("%s", description)
+    except DBAPIError:
+        if not exists():
+            raise
+        logger.info("%s: already done by another process", description)
+
+
+def upgrade_schema():
+    """
+    Bring tables created by older releases up to date with the models.
+
+    `db.create_all()` only creates missing tables, so columns and indexes that
+    were added to existing models later are created here. New columns are
+    added as nullable; backfills for derived columns run afterwards. Each
+    statement runs on its own, and one that fails because the object already
+    exists is skipped.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+
+    def has_column(table_name, column_name):
+        return column_name in {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+    def has_index(table_name, index_name):
+        return index_name in {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            ddl = (
+                f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                f"{column.type.compile(dialect=engine.dialect)}"
+            )
+            if column.server_default is not None:
+                default = column.server_default.arg
+                default = getattr(default, "text", None) or default.compile(dialect=engine.dialect)
+                ddl += f" DEFAULT {default}"
+            _apply_ddl(
+                lambda conn, ddl=ddl: conn.execute(text(ddl)),
+                lambda table=table, column=column: has_column(table.name, column.name),
+                f"Added column {table.name}.{column.name}",
+            )
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                _apply_ddl(
+                    index.create,
+                    lambda table=table, index=index: has_index(table.name, index.name),
+                    f"Created index {index.name}",
+                )
+
+    backfill_normalized_keys()
+    backfill_updated_at()
+
+    from backend.fee_accounting import ensure_fee_accounting
+
+    ensure_fee_accounting()
+
+    from backend.search import install_search_indexes
+
+    install_search_indexes()
+
+
+def backfill_normalized_keys():
+    """
+    Populate `<column>_key` lookup columns for rows written before they existed.
+    """
+    from backend.models import NormalizedKeyMixin
+
+    for mapper in db.Model.registry.mappers:
+        model = mapper.class_
+        if not issubclass(model, NormalizedKeyMixin):
+            continue
+        for source, target in model.normalized_columns.items():
+            source_column = getattr(model, source)
+            target_column = getattr(model, target)
+            db.session.query(model).filter(
+                target_column.is_(None), source_column.isnot(None)
+            ).update(
+                {target_column: db.func.lower(db.func.trim(source_column))},
+                synchronize_session=False,
+            )
+    db.session.commit()
+
+
+def backfill_updated_at():
+    """
+    Stamp rows that predate the `updated_at` column so `?since=` deltas see them.
+    """
+    from datetime import datetime
+
+    from backend.models import SyncTrackedMixin
+
+    now = datetime.utcnow()
+    for mapper in db.Model.registry.mappers:
+        model = mapper.class_
+        if issubclass(model, SyncTrackedMixin):
+            db.session.query(model).filter(model.updated_at.is_(None)).update(
+                {model.updated_at: now}, synchronize_session=False
+            )
+    db.session.commit()
@@ -1,22 +1,31 @@
 from datetime import datetime, date
 from flask_login import UserMixin
-from sqlalchemy import func
+from sqlalchemy import event, func
 
 from backend.database import db
 
 
+def normalize_key(value):
+    """Lookup form of a free-text label: trimmed and lowercased."""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+
 class SerializerMixin:
     """Provide a generic `to_dict` method for SQLAlchemy models."""
 
     serialize_rules = ()
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         data = {}
         excluded = set(getattr(self, "serialize_rules", ()))
+        excluded.update(getattr(self, "normalized_columns", {}).values())
+        wanted = set(fields) if fields else None
 
         for column in self.__table__.columns:
             key = column.key
-            if key in excluded:
+            if key in excluded or (wanted is not None and key not in wanted):
                 continue
 
             value = getattr(self, key)
@@ -26,6 +35,58 @@ class SerializerMixin:
         return data
 
 
+class NormalizedKeyMixin:
+    """
+    Maintain indexed `<column>_key` copies of free-text columns so that
+    case-insensitive filters become exact matches instead of `ilike` scans.
+    """
+
+    normalized_columns = {}
+
+    def sync_normalized_keys(self):
+        for source, target in self.normalized_columns.items():
+            value = getattr(self, source)
+            default = self.__mapper__.columns[source].default
+            # Column defaults are applied after before_insert, so mirror them here.
+            if value is None and default is not None and default.is_scalar:
+                value = default.arg
+            setattr(self, target, normalize_key(value))
+
+
+@event.listens_for(NormalizedKeyMixin, "before_insert", propagate=True)
+@event.listens_for(NormalizedKeyMixin, "before_update", propagate=True)
+def _sync_normalized_keys(mapper, connection, target):
+    target.sync_normalized_keys()
+
+
+class SyncTrackedMixin:
+    """
+    Stamp rows with an indexed `updated_at` and leave a `Tombstone` behind
+    when they are deleted, so list endpoints can serve `?since=` deltas.
+    """
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class Tombstone(db.Model):
+    __tablename__ = "tombstones"
+    __table_args__ = (db.Index("ix_tombstones_table_deleted", "table_name", "deleted_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+@event.listens_for(SyncTrackedMixin, "after_delete", propagate=True)
+def _record_tombstone(mapper, connection, target):
+    connection.execute(
+        Tombstone.__table__.insert().values(
+            table_name=mapper.local_table.name, row_id=target.id, deleted_at=datetime.utcnow()
+        )
+    )
+
+
 class Admin(UserMixin, SerializerMixin, db.Model):
     __tablename__ = "admins"
 
@@ -37,11 +98,12 @@ class Admin(UserMixin, SerializerMixin, db.Model):
     serialize_rules = ("password_hash",)
 
 
-class FeesStructure(SerializerMixin, db.Model):
+class FeesStructure(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "fees_structures"
 
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50), nullable=False)
+    category_key = db.Column(db.String(50), index=True)
     prospectus_fees = db.Column(db.Float, default=0.0)
     tuition_fees = db.Column(db.Float, default=0.0)
     development_fees = db.Column(db.Float, default=0.0)
@@ -50,29 +112,36 @@ class FeesStructure(SerializerMixin, db.Model):
     library_lab_fees = db.Column(db.Float, default=0.0)
     student_insurance = db.Column(db.Float, default=0.0)
     total_fees = db.Column(db.Float, default=0.0)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    normalized_columns = {"category": "category_key"}
 
-class AdmissionDocuments(SerializerMixin, db.Model):
+
+class AdmissionDocuments(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "admission_documents"
+    __table_args__ = (
+        db.Index("ix_admission_documents_type_order", "admission_type_key", "display_order"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     admission_type = db.Column(db.String(50), nullable=False)
+    admission_type_key = db.Column(db.String(50))
     document_name = db.Column(db.String(200), nullable=False)
     is_required = db.Column(db.Boolean, default=True)
     display_order = db.Column(db.Integer, default=0)
 
+    normalized_columns = {"admission_type": "admission_type_key"}
+
 
-class LibraryBooks(SerializerMixin, db.Model):
+class LibraryBooks(SyncTrackedMixin, SerializerMixin, db.Model):
     __tablename__ = "library_books"
 
     id = db.Column(db.Integer, primary_key=True)
-    category = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(100), nullable=False, index=True)
     book_count = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
 
 
-class LibraryTimings(SerializerMixin, db.Model):
+class LibraryTimings(SyncTrackedMixin, SerializerMixin, db.Model):
     __tablename__ = "library_timings"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -84,7 +153,7 @@ class LibraryTimings(SerializerMixin, db.Model):
     lunch_break_end = db.Column(db.String(10), nullable=False)
 
 
-class HostelInfo(SerializerMixin, db.Model):
+class HostelInfo(SyncTrackedMixin, SerializerMixin, db.Model):
     __tablename__ = "hostel_information"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -94,32 +163,40 @@ class HostelInfo(SerializerMixin, db.Model):
     mess_fees_per_month = db.Column(db.Float, default=0.0)
 
 
-class Scholarships(SerializerMixin, db.Model):
+class Scholarships(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "scholarships"
 
     id = db.Column(db.Integer, primary_key=True)
-    scholarship_name = db.Column(db.String(200), nullable=False)
+    scholarship_name = db.Column(db.String(200), nullable=False, index=True)
     category = db.Column(db.String(100), nullable=False)
+    category_key = db.Column(db.String(100), index=True)
     amount = db.Column(db.String(100), nullable=False)
     eligibility = db.Column(db.Text, nullable=False)
     documents_required = db.Column(db.Text, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
 
+    normalized_columns = {"category": "category_key"}
+
 
-class Faculty(SerializerMixin, db.Model):
+class Faculty(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "faculty"
+    __table_args__ = (db.Index("ix_faculty_department_name", "department", "name", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     department = db.Column(db.String(100), nullable=False)
+    department_key = db.Column(db.String(100), index=True)
     designation = db.Column(db.String(100), nullable=False)
+    designation_key = db.Column(db.String(100), index=True)
     subjects_taught = db.Column(db.Text, default="")
     contact = db.Column(db.String(20), default="")
     email = db.Column(db.String(100), default="")
     photo_url = db.Column(db.String(500), default="")
 
+    normalized_columns = {"department": "department_key", "designation": "designation_key"}
+
 
-class PrincipalInfo(SerializerMixin, db.Model):
+class PrincipalInfo(SyncTrackedMixin, SerializerMixin, db.Model):
     __tablename__ = "principal_info"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -132,18 +209,22 @@ class PrincipalInfo(SerializerMixin, db.Model):
     photo_url = db.Column(db.String(500), default="")
 
 
-class Events(SerializerMixin, db.Model):
+class Events(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "events"
+    __table_args__ = (db.Index("ix_events_event_date_id", "event_date", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     event_name = db.Column(db.String(200), nullable=False)
     event_type = db.Column(db.String(50), nullable=False)
+    event_type_key = db.Column(db.String(50), index=True)
     event_date = db.Column(db.Date, nullable=False)
     description = db.Column(db.Text, default="")
     is_active = db.Column(db.Boolean, default=True)
 
+    normalized_columns = {"event_type": "event_type_key"}
 
-class CollegeTimings(SerializerMixin, db.Model):
+
+class CollegeTimings(SyncTrackedMixin, SerializerMixin, db.Model):
     __tablename__ = "college_timings"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -153,39 +234,219 @@ class CollegeTimings(SerializerMixin, db.Model):
     saturday_closing = db.Column(db.String(10), nullable=False)
 
 
-class StudentFeesPayment(SerializerMixin, db.Model):
+class StudentFeesPayment(SyncTrackedMixin, NormalizedKeyMixin, SerializerMixin, db.Model):
     __tablename__ = "student_fees_payments"
+    __table_args__ = (
+        db.Index("ix_student_fees_payments_payment_date_id", "payment_date", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(200), nullable=False)
-    student_id = db.Column(db.String(50), nullable=False)
-    admission_year = db.Column(db.String(10), nullable=False)
+    student_id = db.Column(db.String(50), nullable=False, index=True)
+    admission_year = db.Column(db.String(10), nullable=False, index=True)
     category = db.Column(db.String(50), nullable=False)
+    category_key = db.Column(db.String(50), index=True)
     total_fees = db.Column(db.Float, default=0.0)
     paid_amount = db.Column(db.Float, default=0.0)
     remaining_amount = db.Column(db.Float, default=0.0)
     payment_date = db.Column(db.DateTime, default=datetime.utcnow)
     receipt_number = db.Column(db.String(100), nullable=False)
+    semester = db.Column(db.String(20), nullable=False, index=True)
+
+    normalized_columns = {"category": "category_key"}
+
+
+class FeeCollectionSummary(SerializerMixin, db.Model):
+    """
+    Running totals of `student_fees_payments` per category, admission year and
+    semester, maintained by `backend.fee_accounting`.
+    """
+
+    __tablename__ = "fee_collection_summary"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "category_key", "admission_year", "semester", name="uq_fee_collection_summary_group"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    category_key = db.Column(db.String(50), nullable=False)
+    admission_year = db.Column(db.String(10), nullable=False)
     semester = db.Column(db.String(20), nullable=False)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    total_fees = db.Column(db.Float, nullable=False, default=0.0)
+    paid_amount = db.Column(db.Float, nullable=False, default=0.0)
+    remaining_amount = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class StudentFeeBalance(SerializerMixin, db.Model):
+    """
+    Materialized per-student fee position, recomputed from the student's
+    payments by `backend.fee_accounting` whenever one of them is written.
+    """
+
+    __tablename__ = "student_fee_balances"
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.String(50), nullable=False, unique=True)
+    student_name = db.Column(db.String(200), nullable=False)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    total_due = db.Column(db.Float, nullable=False, default=0.0)
+    total_paid = db.Column(db.Float, nullable=False, default=0.0)
+    balance = db.Column(db.Float, nullable=False, default=0.0)
+    last_payment_date = db.Column(db.DateTime)
+
+
+class TicketSerializerMixin(SerializerMixin):
+    """Serialize tickets with the stored `query` column exposed as `query`."""
+
+    def to_dict(self, fields=None):
+        if fields:
+            fields = ["query_text" if field == "query" else field for field in fields]
+        data = super().to_dict(fields)
+        if fields and "query_text" not in fields:
+            return data
+        # Handle both possible key names (attribute name "query_text" or column name "query")
+        # Directly get the value from the attribute to ensure we always have it
+        query_value = getattr(self, "query_text", None) or data.pop("query_text", None) or data.pop("query", None) or ""
+        data["query"] = query_value
+        return data
 
 
-class HelpTickets(SerializerMixin, db.Model):
+class HelpTickets(SyncTrackedMixin, NormalizedKeyMixin, TicketSerializerMixin, db.Model):
     __tablename__ = "help_tickets"
+    __table_args__ = (
+        db.Index("ix_help_tickets_created_at_id", "created_at", "id"),
+        db.Index("ux_help_tickets_intake_ref", "intake_ref", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(200), nullable=False)
     contact = db.Column(db.String(100), nullable=False)
     topic = db.Column(db.String(100))
+    topic_key = db.Column(db.String(100), index=True)
     query_text = db.Column("query", db.Text, nullable=False)
     pdf_filename = db.Column(db.String(255))
+    pdf_original_name = db.Column(db.String(255))
+    # Preview copied from the attachment by `backend.attachment_processing`.
+    pdf_page_count = db.Column(db.Integer)
+    pdf_thumbnail = db.Column(db.String(255))
+    pdf_snippet = db.Column(db.String(300))
     status = db.Column(db.String(50), default="Open")
+    status_key = db.Column(db.String(50), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=func.now())
     resolved_at = db.Column(db.DateTime)
+    # Reference handed out by the write-behind queue (`backend.ticket_queue`).
+    intake_ref = db.Column(db.String(32))
 
-    def to_dict(self):
-        data = super().to_dict()
-        # Handle both possible key names (attribute name "query_text" or column name "query")
-        # Directly get the value from the attribute to ensure we always have it
-        query_value = getattr(self, "query_text", None) or data.pop("query_text", None) or data.pop("query", None) or ""
-        data["query"] = query_value
+    normalized_columns = {"topic": "topic_key", "status": "status_key"}
+
+
+class ArchivedHelpTickets(NormalizedKeyMixin, TicketSerializerMixin, db.Model):
+    """
+    Resolved tickets moved out of `help_tickets` by `backend.ticket_archive`.
+    The archive has its own ids; `original_id` is the ticket's id in
+    `help_tickets`, which is not unique here because the live table may hand
+    out an id again once its highest rows are archived (SQLite, and MySQL
+    before 8.0 after a restart).
+    """
+
+    __tablename__ = "archived_help_tickets"
+    __table_args__ = (db.Index("ix_archived_help_tickets_resolved_at_id", "resolved_at", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, index=True)
+    student_name = db.Column(db.String(200), nullable=False)
+    contact = db.Column(db.String(100), nullable=False)
+    topic = db.Column(db.String(100))
+    topic_key = db.Column(db.String(100), index=True)
+    query_text = db.Column("query", db.Text, nullable=False)
+    pdf_filename = db.Column(db.String(255))
+    pdf_original_name = db.Column(db.String(255))
+    # Preview copied from the attachment by `backend.attachment_processing`.
+    pdf_page_count = db.Column(db.Integer)
+    pdf_thumbnail = db.Column(db.String(255))
+    pdf_snippet = db.Column(db.String(300))
+    status = db.Column(db.String(50))
+    status_key = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime)
+    resolved_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    intake_ref = db.Column(db.String(32))
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    normalized_columns = {"topic": "topic_key", "status": "status_key"}
+
+
+class Attachment(SerializerMixin, db.Model):
+    """
+    One stored file per distinct content, at `storage_path` under the uploads
+    directory. `ref_count` is the number of live and archived tickets whose
+    `pdf_filename` points at it; see `backend.ticket_uploads`. The page count,
+    text and thumbnail are filled in after upload by
+    `backend.attachment_processing`.
+    """
+
+    __tablename__ = "attachments"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    storage_path = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer, nullable=False, default=0)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    page_count = db.Column(db.Integer)
+    text = db.Column(db.Text)
+    thumbnail_path = db.Column(db.String(255))
+    processed_at = db.Column(db.DateTime, index=True)
+    processing_error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    serialize_rules = ("text",)
+
+    def to_dict(self, fields=None):
+        data = super().to_dict(fields)
+        data["snippet"] = " ".join((self.text or "").split())[:300]
+        data["ticket_ids"] = [
+            row.id for row in HelpTickets.query.with_entities(HelpTickets.id).filter_by(pdf_filename=self.storage_path)
+        ]
         return data
+
+
+class IdempotencyKey(db.Model):
+    """
+    A client-supplied `Idempotency-Key` and the response it produced, kept
+    until `expires_at` so retries are answered without re-running the
+    request; see `backend.idempotency`. `status_code` is NULL while the
+    first request is still running, and `created_at` is refreshed while it
+    runs so the reservation does not time out.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (db.Index("ux_idempotency_keys_scope_key", "scope", "key", unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(255), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class TicketEvent(db.Model):
+    """
+    Append-only journal of help ticket changes, written in the same
+    transaction as the ticket by `backend.ticket_feed` and streamed to the
+    admin panel.
+    """
+
+    __tablename__ = "ticket_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.Integer, nullable=False, index=True)
+    event_type = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
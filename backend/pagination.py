@@ -0,0 +1,186 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, and_, false, or_
+from sqlalchemy.orm import load_only
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# (model attribute, descending) pairs; the last entry must be unique (normally the id).
+OrderSpec = Sequence[Tuple[Any, bool]]
+
+
+def parse_limit(value: Optional[str]) -> int:
+    """
+    Clamp the `limit` query parameter to a sane page size.
+    """
+    if value in (None, ""):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_fields(
+    value: Optional[str], model, aliases: Optional[Dict[str, str]] = None
+) -> Optional[List[str]]:
+    """
+    Translate a `?fields=a,b` projection into model attribute keys.
+
+    Returns None when no projection was requested. The primary key is always
+    included so the client can act on the returned rows.
+    """
+    if not value:
+        return None
+    aliases = aliases or {}
+    columns = {attr.key for attr in model.__mapper__.column_attrs}
+    fields = ["id"]
+    for raw in value.split(","):
+        name = aliases.get(raw.strip(), raw.strip())
+        if not name:
+            continue
+        if name not in columns:
+            raise ValueError(f"Unknown field: {raw.strip()}")
+        if name not in fields:
+            fields.append(name)
+    return fields
+
+
+def parse_date_range(args, column, prefix: str = "date"):
+    """
+    Build filter clauses for inclusive `<prefix>_from` / `<prefix>_to` (YYYY-MM-DD) arguments.
+    """
+    clauses = []
+    start = args.get(f"{prefix}_from")
+    end = args.get(f"{prefix}_to")
+    is_datetime = isinstance(column.type, DateTime)
+    try:
+        if start:
+            clauses.append(column >= _coerce_date(start, is_datetime))
+        if end:
+            end_value = _coerce_date(end, is_datetime)
+            if is_datetime:
+                clauses.append(column < end_value + timedelta(days=1))
+            else:
+                clauses.append(column <= end_value)
+    except ValueError:
+        raise ValueError(f"{prefix}_from and {prefix}_to must use YYYY-MM-DD.")
+    return clauses
+
+
+def _coerce_date(value: str, as_datetime: bool):
+    parsed = datetime.strptime(value, "%Y-%m-%d")
+    return parsed if as_datetime else parsed.date()
+
+
+def encode_cursor(values: Iterable[Any]) -> str:
+    serialized = [
+        value.isoformat() if isinstance(value, (datetime, date)) else value for value in values
+    ]
+    raw = json.dumps(serialized, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: OrderSpec) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(order):
+        raise ValueError("Invalid cursor.")
+
+    decoded = []
+    for (column, _), value in zip(order, values):
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+
+def _nulls_sort_low(query) -> bool:
+    """Whether the database orders NULL before every value (SQLite, MySQL) or after it (PostgreSQL)."""
+    return query.session.get_bind().dialect.name != "postgresql"
+
+
+def _after_cursor(order: OrderSpec, values: Sequence[Any], nulls_low: bool = True):
+    """
+    Row-value comparison `(a, b, id) > (va, vb, vid)` expanded into OR/AND terms,
+    which works on every backend and with mixed sort directions.
+
+    Comparisons with NULL are never true, so nullable sort columns get
+    explicit `IS NULL` branches matching where the database's own ORDER BY
+    puts NULLs (`nulls_low`), which keeps the sort index usable.
+    """
+
+    def equal(column, value):
+        return column.is_(None) if value is None else column == value
+
+    terms = []
+    for index, (column, descending) in enumerate(order):
+        value = values[index]
+        nullable = getattr(getattr(column, "expression", column), "nullable", True)
+        # NULLs come after all values when scanning in this direction.
+        nulls_last = descending if nulls_low else not descending
+        if value is None:
+            step = false() if nulls_last else column.isnot(None)
+        else:
+            step = column < value if descending else column > value
+            if nullable and nulls_last:
+                step = or_(step, column.is_(None))
+        equal_prefix = [equal(order[i][0], values[i]) for i in range(index)]
+        terms.append(and_(*equal_prefix, step))
+    return or_(*terms)
+
+
+def keyset_page(
+    query,
+    order: OrderSpec,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    with_total: bool = False,
+    serialize=None,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of `query` ordered by `order`, continuing after `cursor`.
+
+    The total row count is only computed on request (normally for the first
+    page) because it is the one part of the response that scales with the table.
+    """
+    payload: Dict[str, Any] = {}
+    if with_total:
+        payload["total"] = query.order_by(None).count()
+
+    if cursor:
+        query = query.filter(_after_cursor(order, decode_cursor(cursor, order), _nulls_sort_low(query)))
+
+    if fields:
+        order_keys = [column.key for column, _ in order]
+        model = order[-1][0].class_
+        loaded = list(dict.fromkeys(fields + order_keys))
+        query = query.options(load_only(*[getattr(model, key) for key in loaded]))
+
+    rows = (
+        query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    serialize = serialize or (lambda row: row.to_dict(fields))
+    payload["items"] = [serialize(row) for row in rows]
+    payload["next_cursor"] = (
+        encode_cursor(getattr(rows[-1], column.key) for column, _ in order) if has_more else None
+    )
+    return payload
@@ -0,0 +1,98 @@
+"""
+Read a PDF's page count and text and render its first page to a PNG.
+
+Uploaded PDFs are untrusted, so `backend.attachment_processing` runs this in
+a child process (`python -m backend.pdf_preview <pdf> <png>`) under a wall
+clock timeout, and the child caps its own memory and CPU time before opening
+the file. Only the standard library and the PDF libraries are imported here.
+The result is printed as one JSON object.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Text is read from at most this many pages and kept up to this many characters.
+MAX_PAGES = 50
+MAX_TEXT_CHARS = 200_000
+THUMBNAIL_WIDTH = 240
+
+
+def available() -> bool:
+    """Whether PyMuPDF (text and thumbnails) or pypdf (text only) is installed."""
+    return any(importlib.util.find_spec(name) is not None for name in ("fitz", "pypdf"))
+
+
+def extract(source: Path, thumbnail: Optional[Path]) -> Dict[str, Any]:
+    """
+    Page count and text of `source`; with PyMuPDF the first page is also
+    rendered to `thumbnail`. Raises whatever the PDF library raises.
+    """
+    parts = []
+    length = 0
+    rendered = False
+    try:  # PyMuPDF
+        import fitz
+    except ImportError:
+        fitz = None
+
+    if fitz is not None:
+        with fitz.open(source) as document:
+            page_count = document.page_count
+            for index, page in enumerate(document):
+                if index >= MAX_PAGES or length >= MAX_TEXT_CHARS:
+                    break
+                parts.append(page.get_text())
+                length += len(parts[-1])
+            if page_count and thumbnail is not None:
+                _render(fitz, document.load_page(0), thumbnail)
+                rendered = True
+    else:
+        from pypdf import PdfReader
+
+        reader = PdfReader(source)
+        page_count = len(reader.pages)
+        for index, page in enumerate(reader.pages):
+            if index >= MAX_PAGES or length >= MAX_TEXT_CHARS:
+                break
+            parts.append(page.extract_text() or "")
+            length += len(parts[-1])
+
+    text = "\n".join(part.strip() for part in parts if part.strip())[:MAX_TEXT_CHARS]
+    return {"page_count": page_count, "text": text or None, "thumbnail": rendered}
+
+
+def _render(fitz, page, target: Path) -> None:
+    zoom = THUMBNAIL_WIDTH / page.rect.width if page.rect.width else 1
+    pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    temp = target.with_name(f".{target.name}.part")
+    temp.write_bytes(pixmap.tobytes("png"))
+    os.replace(temp, target)
+
+
+def _limit_resources() -> None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not POSIX
+        return
+    memory = int(os.getenv("PDF_MEMORY_MB", "512")) * 1024 * 1024
+    cpu = int(float(os.getenv("PDF_TIMEOUT_SECONDS", "30")))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+
+def main(argv) -> int:
+    if len(argv) not in (2, 3):
+        print("usage: python -m backend.pdf_preview <pdf> [<png>]", file=sys.stderr)
+        return 2
+    _limit_resources()
+    result = extract(Path(argv[1]), Path(argv[2]) if len(argv) == 3 else None)
+    json.dump(result, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
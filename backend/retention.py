@@ -0,0 +1,81 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from backend.delta_sync import prune_tombstones
+from backend.idempotency import prune_idempotency_keys
+from backend.ticket_feed import prune_ticket_events
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 60
+
+
+class RetentionJob:
+    """
+    Periodically delete rows that only ever accumulate: tombstones older than
+    `TOMBSTONE_RETENTION`, ticket events older than `EVENT_RETENTION` and
+    expired idempotency keys.
+
+    Every `RETENTION_INTERVAL_MINUTES` (default 60; `0` turns it off) a
+    background thread runs the three deletes, independently of schema
+    upgrades, so deployments with `AUTO_MIGRATE=0` are cleaned up too. The
+    thread is started by the first request in each process rather than at
+    import, so workers forked from a preloaded app each get their own. Several
+    workers pruning the same tables is harmless: the deletes only remove
+    rows that are already expired.
+    """
+
+    def __init__(self):
+        self.interval_seconds = DEFAULT_INTERVAL_MINUTES * 60.0
+        self._app = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def init_app(self, app) -> None:
+        self.interval_seconds = float(os.getenv("RETENTION_INTERVAL_MINUTES", DEFAULT_INTERVAL_MINUTES)) * 60
+        self._app = app
+        app.extensions["retention"] = self
+        if self.interval_seconds > 0:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="retention", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                with self._app.app_context():
+                    self.run()
+            except Exception as exc:  # pragma: no cover - retried on the next interval
+                self.last_error = str(exc)
+                logger.exception("Retention job failed: %s", exc)
+            time.sleep(self.interval_seconds)
+
+    def run(self) -> Dict[str, int]:
+        """Prune every table once and return the number of rows deleted from each."""
+        deleted = {
+            "tombstones": prune_tombstones(),
+            "ticket_events": prune_ticket_events(),
+            "idempotency_keys": prune_idempotency_keys(),
+        }
+        self.last_run_at = datetime.utcnow()
+        self.last_error = None
+        if any(deleted.values()):
+            logger.info("Retention pruned %s", deleted)
+        return deleted
+
+
+retention = RetentionJob()
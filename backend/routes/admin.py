@@ -1,11 +1,36 @@
 import os
 from datetime import datetime
 
-from flask import Blueprint, jsonify, request, send_from_directory
+from flask import Blueprint, Response, g, jsonify, request, stream_with_context
 from flask_login import login_required
 from sqlalchemy.exc import SQLAlchemyError
-
-from backend.database import db
+from werkzeug.exceptions import HTTPException, NotFound
+
+from backend.attachment_processing import send_thumbnail
+from backend.dashboard import get_dashboard
+from backend.database import db, stick_to_primary
+from backend.delta_sync import delta_payload, parse_since, sync_token
+from backend.exports import EXPORT_FORMATS, stream_export
+from backend.fee_accounting import student_ledger
+from backend.fee_import import (
+    DEFAULT_BATCH_SIZE,
+    detect_format,
+    import_student_fees,
+    read_rows,
+    validate_student_fee,
+)
+from backend.idempotency import idempotent
+from backend.pagination import keyset_page, parse_date_range, parse_fields, parse_limit
+from backend.search import search
+from backend.ticket_feed import (
+    acquire_stream_slot,
+    latest_event_id,
+    parse_event_id,
+    release_stream_slot,
+    stream as stream_ticket_events,
+)
+from backend.ticket_queue import ticket_queue
+from backend.ticket_uploads import send_attachment
 from backend.models import (
     FeesStructure,
     AdmissionDocuments,
@@ -18,15 +43,21 @@ from backend.models import (
     Events,
     CollegeTimings,
     StudentFeesPayment,
+    StudentFeeBalance,
     HelpTickets,
+    ArchivedHelpTickets,
+    SyncTrackedMixin,
+    normalize_key,
 )
 
-from seed_data import write_seed_snapshot  # noqa: E402
+from backend.snapshot_writer import snapshot_writer
 
 admin_bp = Blueprint("admin_routes", __name__, url_prefix="/api/admin")
 
 
 def _json_body():
+    if "batch_payload" in g:
+        return g.batch_payload
     data = request.get_json(silent=True)
     if data is None:
         raise ValueError("Expected JSON body.")
@@ -35,8 +66,12 @@ def _json_body():
 
 def _commit():
     try:
-        db.session.commit()
-        _sync_seed_snapshot()
+        if g.get("in_batch"):
+            # Batched operations only flush; `batch()` commits them together.
+            db.session.flush()
+        else:
+            # Touched snapshot tables are exported in the background after commit.
+            db.session.commit()
         return None
     except SQLAlchemyError as exc:
         db.session.rollback()
@@ -79,16 +114,103 @@ def _error_response(message, code=400):
     return jsonify({"error": message}), code
 
 
+def _sync_response(payload, token):
+    response = jsonify(payload)
+    response.headers["X-Sync-Token"] = token
+    return response, 200
+
+
+def _list_response(query, model, *order):
+    """
+    Serve the whole of `query`, or with `?since=<sync token>` only the rows
+    changed and deleted since then. Either way the `X-Sync-Token` header
+    carries the token for the next delta.
+    """
+    token = sync_token(model)
+    since = parse_since(request.args.get("since"))
+    if since is not None:
+        return _sync_response(delta_payload(query, model, since, token), token)
+    return _sync_response([row.to_dict() for row in query.order_by(*order).all()], token)
+
+
+def _page_response(query, order, model, field_aliases=None):
+    """
+    Serve one keyset page of `query` using the standard list arguments:
+    `limit`, `cursor` and `fields`. The total is only computed for the first
+    page. With `since` the response is a delta instead, as for `_list_response`.
+    """
+    token = sync_token(model)
+    fields = parse_fields(request.args.get("fields"), model, field_aliases)
+    since = parse_since(request.args.get("since"))
+    if since is not None:
+        if not issubclass(model, SyncTrackedMixin):
+            raise ValueError("since is not supported for this list.")
+        payload = delta_payload(query, model, since, token, lambda row: row.to_dict(fields))
+        return _sync_response(payload, token)
+
+    cursor = request.args.get("cursor") or None
+    payload = keyset_page(
+        query,
+        order,
+        limit=parse_limit(request.args.get("limit")),
+        cursor=cursor,
+        fields=fields,
+        with_total=cursor is None,
+    )
+    return _sync_response(payload, token)
+
+
+def _split_values(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@admin_bp.after_request
+def read_own_writes(response):
+    if request.method != "GET" and response.status_code < 400:
+        stick_to_primary()
+    return response
+
+
 @admin_bp.errorhandler(ValueError)
 def handle_value_error(err):
     return _error_response(str(err), 400)
 
 
-def _sync_seed_snapshot():
-    try:
-        write_seed_snapshot()
-    except Exception as exc:  # pragma: no cover - sync failures shouldn't block API
-        print(f"[seed-sync] Failed to update snapshot: {exc}")
+@admin_bp.route("/dashboard", methods=["GET"])
+@login_required
+def dashboard():
+    return jsonify(get_dashboard()), 200
+
+
+@admin_bp.route("/search", methods=["GET"])
+@login_required
+def search_records():
+    results = search(
+        request.args.get("q"),
+        _split_values(request.args.get("type")),
+        limit=parse_limit(request.args.get("limit")),
+        cursor=request.args.get("cursor") or None,
+    )
+    return jsonify(results), 200
+
+
+@admin_bp.route("/export/<name>", methods=["GET"])
+@login_required
+def export_records(name):
+    fmt = (request.args.get("format") or "csv").lower()
+    chunks = stream_export(name, fmt, request.args)
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@admin_bp.route("/snapshot/status", methods=["GET"])
+@login_required
+def snapshot_status():
+    return jsonify(snapshot_writer.status()), 200
 
 
 # Fees Management -----------------------------------------------------------------
@@ -98,13 +220,13 @@ def list_fees():
     category = request.args.get("category")
     query = FeesStructure.query
     if category:
-        query = query.filter(FeesStructure.category.ilike(category))
-    fees = [fee.to_dict() for fee in query.order_by(FeesStructure.category).all()]
-    return jsonify(fees), 200
+        query = query.filter(FeesStructure.category_key == normalize_key(category))
+    return _list_response(query, FeesStructure, FeesStructure.category)
 
 
 @admin_bp.route("/fees", methods=["POST"])
 @login_required
+@idempotent
 def create_fee():
     data = _json_body()
     required_fields = ["category"]
@@ -179,18 +301,15 @@ def list_documents():
     doc_type = request.args.get("type")
     query = AdmissionDocuments.query
     if doc_type:
-        query = query.filter(AdmissionDocuments.admission_type.ilike(doc_type))
-    docs = (
-        query.order_by(
-            AdmissionDocuments.admission_type, AdmissionDocuments.display_order
-        )
-        .all()
+        query = query.filter(AdmissionDocuments.admission_type_key == normalize_key(doc_type))
+    return _list_response(
+        query, AdmissionDocuments, AdmissionDocuments.admission_type, AdmissionDocuments.display_order
     )
-    return jsonify([doc.to_dict() for doc in docs]), 200
 
 
 @admin_bp.route("/documents", methods=["POST"])
 @login_required
+@idempotent
 def create_document():
     data = _json_body()
     required = ["admission_type", "document_name"]
@@ -239,12 +358,12 @@ def delete_document(doc_id):
 @admin_bp.route("/library/books", methods=["GET"])
 @login_required
 def list_library_books():
-    books = LibraryBooks.query.order_by(LibraryBooks.category).all()
-    return jsonify([book.to_dict() for book in books]), 200
+    return _list_response(LibraryBooks.query, LibraryBooks, LibraryBooks.category)
 
 
 @admin_bp.route("/library/books", methods=["POST"])
 @login_required
+@idempotent
 def create_library_book():
     data = _json_body()
     if not data.get("category"):
@@ -324,8 +443,7 @@ def update_library_timings():
 @admin_bp.route("/hostel", methods=["GET"])
 @login_required
 def list_hostel_info():
-    items = HostelInfo.query.order_by(HostelInfo.facility_name).all()
-    return jsonify([item.to_dict() for item in items]), 200
+    return _list_response(HostelInfo.query, HostelInfo, HostelInfo.facility_name)
 
 
 @admin_bp.route("/hostel/<int:facility_id>", methods=["PUT"])
@@ -354,13 +472,13 @@ def list_scholarships():
     category = request.args.get("category")
     query = Scholarships.query
     if category:
-        query = query.filter(Scholarships.category.ilike(category))
-    records = query.order_by(Scholarships.scholarship_name).all()
-    return jsonify([record.to_dict() for record in records]), 200
+        query = query.filter(Scholarships.category_key == normalize_key(category))
+    return _list_response(query, Scholarships, Scholarships.scholarship_name)
 
 
 @admin_bp.route("/scholarships", methods=["POST"])
 @login_required
+@idempotent
 def create_scholarship():
     data = _json_body()
     required = ["scholarship_name", "category", "amount", "eligibility"]
@@ -419,15 +537,19 @@ def delete_scholarship(scholarship_id):
 @login_required
 def list_faculty():
     department = request.args.get("department")
+    designation = request.args.get("designation")
     query = Faculty.query
     if department:
-        query = query.filter(Faculty.department.ilike(department))
-    faculty = query.order_by(Faculty.department, Faculty.name).all()
-    return jsonify([member.to_dict() for member in faculty]), 200
+        query = query.filter(Faculty.department_key == normalize_key(department))
+    if designation:
+        query = query.filter(Faculty.designation_key == normalize_key(designation))
+    order = [(Faculty.department, False), (Faculty.name, False), (Faculty.id, False)]
+    return _page_response(query, order, Faculty)
 
 
 @admin_bp.route("/faculty", methods=["POST"])
 @login_required
+@idempotent
 def create_faculty():
     data = _json_body()
     required = ["name", "department", "designation"]
@@ -523,15 +645,20 @@ def update_principal():
 @login_required
 def list_events():
     event_type = request.args.get("type")
+    active = request.args.get("active")
     query = Events.query
     if event_type:
-        query = query.filter(Events.event_type.ilike(event_type))
-    events = query.order_by(Events.event_date).all()
-    return jsonify([event.to_dict() for event in events]), 200
+        query = query.filter(Events.event_type_key == normalize_key(event_type))
+    if active:
+        query = query.filter(Events.is_active.is_(active.lower() in {"true", "1", "yes"}))
+    query = query.filter(*parse_date_range(request.args, Events.event_date))
+    order = [(Events.event_date, False), (Events.id, False)]
+    return _page_response(query, order, Events)
 
 
 @admin_bp.route("/events", methods=["POST"])
 @login_required
+@idempotent
 def create_event():
     data = _json_body()
     required = ["event_name", "event_type", "event_date"]
@@ -615,43 +742,22 @@ def update_timings():
 @admin_bp.route("/student-fees", methods=["GET"])
 @login_required
 def list_student_fees():
-    records = StudentFeesPayment.query.order_by(StudentFeesPayment.payment_date.desc()).all()
-    return jsonify([record.to_dict() for record in records]), 200
+    query = StudentFeesPayment.query
+    if request.args.get("category"):
+        query = query.filter(StudentFeesPayment.category_key == normalize_key(request.args["category"]))
+    for field in ["student_id", "semester", "admission_year"]:
+        if request.args.get(field):
+            query = query.filter(getattr(StudentFeesPayment, field) == request.args[field].strip())
+    query = query.filter(*parse_date_range(request.args, StudentFeesPayment.payment_date))
+    order = [(StudentFeesPayment.payment_date, True), (StudentFeesPayment.id, True)]
+    return _page_response(query, order, StudentFeesPayment)
 
 
 @admin_bp.route("/student-fees", methods=["POST"])
 @login_required
+@idempotent
 def create_student_fee():
-    data = _json_body()
-    required = [
-        "student_name",
-        "student_id",
-        "admission_year",
-        "category",
-        "total_fees",
-        "paid_amount",
-        "receipt_number",
-        "semester",
-    ]
-    if not all(data.get(field) for field in required):
-        return _error_response("Missing required student fee fields.")
-
-    remaining = data.get("remaining_amount")
-    if remaining is None:
-        remaining = float(data["total_fees"]) - float(data["paid_amount"])
-
-    record = StudentFeesPayment(
-        student_name=data["student_name"],
-        student_id=data["student_id"],
-        admission_year=data["admission_year"],
-        category=data["category"],
-        total_fees=data["total_fees"],
-        paid_amount=data["paid_amount"],
-        remaining_amount=remaining,
-        payment_date=_parse_datetime(data.get("payment_date")) or datetime.utcnow(),
-        receipt_number=data["receipt_number"],
-        semester=data["semester"],
-    )
+    record = StudentFeesPayment(**validate_student_fee(_json_body()))
     db.session.add(record)
     error = _commit()
     if error:
@@ -659,6 +765,34 @@ def create_student_fee():
     return jsonify(record.to_dict()), 201
 
 
+@admin_bp.route("/student-fees/import", methods=["POST"])
+@login_required
+@idempotent
+def import_student_fee_file():
+    """
+    Bulk-import payments from a CSV or NDJSON upload (multipart `file` field
+    or the raw request body). `format` overrides detection from the file
+    name / content type; `dry_run=1` only validates.
+    """
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    fmt = request.args.get("format") or detect_format(
+        upload.filename if upload else None, upload.mimetype if upload else request.mimetype
+    )
+    if not fmt:
+        return _error_response("Could not detect the file format; pass format=csv or format=ndjson.")
+    try:
+        batch_size = int(request.args.get("batch_size") or DEFAULT_BATCH_SIZE)
+    except ValueError:
+        return _error_response("batch_size must be an integer.")
+    report = import_student_fees(
+        read_rows(stream, fmt),
+        batch_size=max(1, min(batch_size, 5000)),
+        dry_run=request.args.get("dry_run", "").lower() in {"1", "true", "yes"},
+    )
+    return jsonify(report), 200
+
+
 @admin_bp.route("/student-fees/<int:record_id>", methods=["PUT"])
 @login_required
 def update_student_fee(record_id):
@@ -710,16 +844,68 @@ def search_student_fee():
     return jsonify(record.to_dict()), 200
 
 
+@admin_bp.route("/student-fees/ledger", methods=["GET"])
+@login_required
+def student_fee_ledger():
+    student_id = (request.args.get("student_id") or "").strip()
+    if not student_id:
+        return _error_response("student_id query parameter is required.")
+    return jsonify(student_ledger(student_id)), 200
+
+
+@admin_bp.route("/student-fees/balance", methods=["GET"])
+@login_required
+def student_fee_balance():
+    student_id = (request.args.get("student_id") or "").strip()
+    if not student_id:
+        return _error_response("student_id query parameter is required.")
+    balance = StudentFeeBalance.query.filter_by(student_id=student_id).first()
+    if not balance:
+        return jsonify({}), 200
+    return jsonify(balance.to_dict()), 200
+
+
 # Help Tickets --------------------------------------------------------------------
 @admin_bp.route("/tickets", methods=["GET"])
 @login_required
 def list_tickets():
-    status = request.args.get("status")
+    statuses = _split_values(request.args.get("status"))
+    topic = request.args.get("topic")
     query = HelpTickets.query
-    if status:
-        query = query.filter(HelpTickets.status.ilike(status))
-    tickets = query.order_by(HelpTickets.created_at.desc()).all()
-    return jsonify([ticket.to_dict() for ticket in tickets]), 200
+    if statuses:
+        query = query.filter(HelpTickets.status_key.in_([normalize_key(status) for status in statuses]))
+    if topic:
+        query = query.filter(HelpTickets.topic_key == normalize_key(topic))
+    query = query.filter(*parse_date_range(request.args, HelpTickets.created_at))
+    order = [(HelpTickets.created_at, True), (HelpTickets.id, True)]
+    return _page_response(query, order, HelpTickets, {"query": "query_text"})
+
+
+@admin_bp.route("/tickets/queue", methods=["GET"])
+@login_required
+def ticket_queue_status():
+    return jsonify(ticket_queue.status()), 200
+
+
+@admin_bp.route("/tickets/stream", methods=["GET"])
+@login_required
+def ticket_stream():
+    last_event_id = parse_event_id(
+        request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    )
+    resumed = last_event_id is not None
+    after_id = last_event_id if resumed else latest_event_id()
+    if not acquire_stream_slot():
+        response = jsonify({"error": "Too many live ticket feeds are open. Reload to refresh tickets."})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+    response = Response(
+        stream_with_context(stream_ticket_events(after_id, resumed)), mimetype="text/event-stream"
+    )
+    response.call_on_close(release_stream_slot)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @admin_bp.route("/tickets/<int:ticket_id>/status", methods=["PUT"])
@@ -742,15 +928,176 @@ def update_ticket_status(ticket_id):
 @admin_bp.route("/tickets/<int:ticket_id>/pdf", methods=["GET"])
 @login_required
 def download_ticket_pdf(ticket_id):
-    ticket = HelpTickets.query.get_or_404(ticket_id)
+    return _send_ticket_pdf(HelpTickets.query.get_or_404(ticket_id))
+
+
+def _send_ticket_pdf(ticket):
     if not ticket.pdf_filename:
-        return _error_response("No PDF file attached to this ticket."), 404
-    
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    uploads_dir = os.path.join(base_dir, "uploads")
-    file_path = os.path.join(uploads_dir, ticket.pdf_filename)
-    
-    if not os.path.exists(file_path):
-        return _error_response("PDF file not found."), 404
-    
-    return send_from_directory(uploads_dir, ticket.pdf_filename, as_attachment=True)
+        return _error_response("No PDF file attached to this ticket.", 404)
+    try:
+        return send_attachment(
+            ticket.pdf_filename, ticket.pdf_original_name or os.path.basename(ticket.pdf_filename)
+        )
+    except NotFound:
+        return _error_response("PDF file not found.", 404)
+
+
+@admin_bp.route("/tickets/<int:ticket_id>/thumbnail", methods=["GET"])
+@login_required
+def ticket_thumbnail(ticket_id):
+    return _send_ticket_thumbnail(HelpTickets.query.get_or_404(ticket_id))
+
+
+def _send_ticket_thumbnail(ticket):
+    if not ticket.pdf_thumbnail:
+        return _error_response("No thumbnail for this ticket.", 404)
+    try:
+        return send_thumbnail(ticket.pdf_thumbnail)
+    except NotFound:
+        return _error_response("Thumbnail file not found.", 404)
+
+
+# Archived Tickets ----------------------------------------------------------------
+@admin_bp.route("/tickets/archive", methods=["GET"])
+@login_required
+def list_archived_tickets():
+    q = request.args.get("q")
+    if q:
+        results = search(
+            q,
+            ["archived_tickets"],
+            limit=parse_limit(request.args.get("limit")),
+            cursor=request.args.get("cursor") or None,
+        )
+        return jsonify(results), 200
+
+    query = ArchivedHelpTickets.query
+    topic = request.args.get("topic")
+    if topic:
+        query = query.filter(ArchivedHelpTickets.topic_key == normalize_key(topic))
+    original_id = request.args.get("original_id")
+    if original_id:
+        if not original_id.isdigit():
+            return _error_response("original_id must be an integer.")
+        query = query.filter(ArchivedHelpTickets.original_id == int(original_id))
+    query = query.filter(*parse_date_range(request.args, ArchivedHelpTickets.resolved_at))
+    order = [(ArchivedHelpTickets.archived_at, True), (ArchivedHelpTickets.id, True)]
+    return _page_response(query, order, ArchivedHelpTickets, {"query": "query_text"})
+
+
+@admin_bp.route("/tickets/archive/<int:ticket_id>", methods=["GET"])
+@login_required
+def get_archived_ticket(ticket_id):
+    return jsonify(ArchivedHelpTickets.query.get_or_404(ticket_id).to_dict()), 200
+
+
+@admin_bp.route("/tickets/archive/<int:ticket_id>/pdf", methods=["GET"])
+@login_required
+def download_archived_ticket_pdf(ticket_id):
+    return _send_ticket_pdf(ArchivedHelpTickets.query.get_or_404(ticket_id))
+
+
+@admin_bp.route("/tickets/archive/<int:ticket_id>/thumbnail", methods=["GET"])
+@login_required
+def archived_ticket_thumbnail(ticket_id):
+    return _send_ticket_thumbnail(ArchivedHelpTickets.query.get_or_404(ticket_id))
+
+
+# Batch ---------------------------------------------------------------------------
+MAX_BATCH_OPERATIONS = 500
+
+# resource -> action -> view. Views for collection resources take the row id;
+# singleton resources (timings, principal) are updated without one.
+BATCH_RESOURCES = {
+    "fees": {"create": create_fee, "update": update_fee, "delete": delete_fee},
+    "documents": {"create": create_document, "update": update_document, "delete": delete_document},
+    "library_books": {
+        "create": create_library_book,
+        "update": update_library_book,
+        "delete": delete_library_book,
+    },
+    "library_timings": {"update": update_library_timings},
+    "hostel": {"update": update_hostel_info},
+    "scholarships": {
+        "create": create_scholarship,
+        "update": update_scholarship,
+        "delete": delete_scholarship,
+    },
+    "faculty": {"create": create_faculty, "update": update_faculty, "delete": delete_faculty},
+    "principal": {"update": update_principal},
+    "events": {"create": create_event, "update": update_event, "delete": delete_event},
+    "timings": {"update": update_timings},
+    "student_fees": {
+        "create": create_student_fee,
+        "update": update_student_fee,
+        "delete": delete_student_fee,
+    },
+    "ticket_status": {"update": update_ticket_status},
+}
+SINGLETON_RESOURCES = {"library_timings", "principal", "timings"}
+
+
+def _run_batch_operation(operation):
+    if not isinstance(operation, dict):
+        raise ValueError("Each operation must be an object.")
+    resource = operation.get("resource")
+    action = operation.get("action")
+    view = BATCH_RESOURCES.get(resource, {}).get(action)
+    if view is None:
+        raise ValueError(f"Unsupported operation: {action} {resource}.")
+
+    args = []
+    if action != "create" and resource not in SINGLETON_RESOURCES:
+        try:
+            args.append(int(operation["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{action} {resource} requires an integer id.")
+    g.batch_payload = operation.get("data") or {}
+    try:
+        response, status = view(*args)
+    except HTTPException as exc:
+        if exc.code == 404 and args:
+            return 404, {"error": f"{resource} {args[0]} not found."}
+        return exc.code, {"error": exc.description}
+    except ValueError as exc:
+        return 400, {"error": str(exc)}
+    finally:
+        g.pop("batch_payload", None)
+    return status, response.get_json()
+
+
+@admin_bp.route("/batch", methods=["POST"])
+@login_required
+@idempotent
+def batch():
+    """
+    Apply `operations` ([{resource, action, id?, data?}, ...]) in one
+    transaction using the same views as the single-row endpoints. Either
+    every operation is committed or, on the first failure, none are.
+    """
+    operations = _json_body().get("operations")
+    if not isinstance(operations, list) or not operations:
+        return _error_response("operations must be a non-empty list.")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return _error_response(f"A batch is limited to {MAX_BATCH_OPERATIONS} operations.")
+
+    results = []
+    g.in_batch = True
+    try:
+        for index, operation in enumerate(operations):
+            try:
+                status, body = _run_batch_operation(operation)
+            except ValueError as exc:
+                status, body = 400, {"error": str(exc)}
+            results.append({"index": index, "status": status, "data": body})
+            if status >= 400:
+                db.session.rollback()
+                payload = {"committed": False, "failed_index": index, "error": body.get("error"), "results": results}
+                return jsonify(payload), status
+    finally:
+        g.pop("in_batch", None)
+
+    error = _commit()
+    if error:
+        return jsonify({"committed": False, "error": error, "results": results}), 500
+    return jsonify({"committed": True, "results": results}), 200
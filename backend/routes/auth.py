@@ -4,9 +4,8 @@ from flask_login import (
     logout_user,
     current_user,
 )
-from werkzeug.security import check_password_hash
-
-from backend.database import db
+from backend.database import db, forget_admin
+from backend.login_security import LoginBusy, login_throttle, password_verifier
 from backend.models import Admin
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/admin")
@@ -26,10 +25,26 @@ def admin_login():
     if not username or not password:
         return jsonify({"error": "Username and password are required."}), 400
 
+    keys = login_throttle.keys(username, request.remote_addr)
+    retry_after = login_throttle.retry_after(keys)
+    if retry_after:
+        response = jsonify({"error": f"Too many failed attempts. Try again in {retry_after} seconds."})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
+
     admin = Admin.query.filter_by(username=username).first()
-    if not admin or not check_password_hash(admin.password_hash, password):
+    try:
+        # Unknown usernames are hashed too, so response time does not reveal them.
+        valid = password_verifier.verify(admin.password_hash if admin else None, password)
+    except LoginBusy as exc:
+        response = jsonify({"error": str(exc)})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    if not valid:
+        login_throttle.record_failure(keys)
         return jsonify({"error": "Invalid username or password."}), 401
 
+    login_throttle.reset(keys)
     login_user(admin, remember=True)
     return (
         jsonify(
@@ -45,6 +60,7 @@ def admin_login():
 @auth_bp.route("/logout", methods=["POST"])
 def admin_logout():
     if current_user.is_authenticated:
+        forget_admin(current_user.get_id())
         logout_user()
     return jsonify({"message": "Logged out successfully."}), 200
 
@@ -2,15 +2,16 @@ import logging
 import os
 import time
 import uuid
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from werkzeug.utils import secure_filename
-
 from flask import Blueprint, jsonify, request
 
-from backend.database import db
-from backend.models import AdmissionDocuments, FeesStructure, Scholarships, HelpTickets
+from backend.attachment_processing import attachment_processor
+from backend.database import db, read_session
+from backend.idempotency import idempotent
+from backend.models import AdmissionDocuments, FeesStructure, Scholarships, HelpTickets, normalize_key
+from backend.ticket_queue import ticket_queue
+from backend.ticket_uploads import store_ticket_pdf
 
 from seed_data import get_chatbot_snapshot  # noqa: E402
 
@@ -429,6 +430,7 @@ def chatbot_message():
 
 
 @chatbot_bp.route("/help-ticket", methods=["POST"])
+@idempotent
 def create_help_ticket():
     # Handle both JSON and form-data requests
     if request.is_json:
@@ -452,40 +454,35 @@ def create_help_ticket():
             400,
         )
 
-    # Create ticket first to get ID
-    ticket = HelpTickets(
-        student_name=name,
-        contact=contact,
-        query_text=query_text,
-        topic=topic if topic else None
-    )
-    db.session.add(ticket)
-    db.session.flush()  # Get the ticket ID without committing
-
-    # Handle PDF file upload
-    pdf_filename = None
+    # Store the PDF before touching the database so no transaction is held
+    # open while the upload is copied.
+    stored = None
     if pdf_file and pdf_file.filename:
-        # Validate file type
-        if not pdf_file.filename.lower().endswith('.pdf'):
-            db.session.rollback()
-            return jsonify({"error": "Only PDF files are allowed."}), 400
-        
-        # Create uploads directory if it doesn't exist
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        uploads_dir = os.path.join(base_dir, "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
-        
-        # Generate secure filename
-        timestamp = int(datetime.now().timestamp())
-        safe_filename = secure_filename(pdf_file.filename)
-        pdf_filename = f"ticket_{ticket.id}_{timestamp}_{safe_filename}"
-        file_path = os.path.join(uploads_dir, pdf_filename)
-        
-        # Save file
-        pdf_file.save(file_path)
-        ticket.pdf_filename = pdf_filename
+        try:
+            stored = store_ticket_pdf(pdf_file)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+    values = {
+        "student_name": name,
+        "contact": contact,
+        "query_text": query_text,
+        "topic": topic if topic else None,
+        "pdf_filename": stored.storage_path if stored else None,
+        "pdf_original_name": stored.original_name if stored else None,
+    }
+    if ticket_queue.enabled:
+        # Acknowledge once journaled; the drainer writes it to the database.
+        intake_ref = ticket_queue.enqueue(values)
+        return jsonify({"message": "Help ticket received.", "queued": True, "reference": intake_ref}), 202
 
+    ticket = HelpTickets(**values)
+    db.session.add(ticket)
+    # A file left unreferenced by a failed commit is removed by
+    # `scripts/migrate_attachments.py --prune`.
     db.session.commit()
+    # Page count, text and thumbnail are extracted off the request path.
+    attachment_processor.submit(ticket.pdf_filename)
     return jsonify({"message": "Help ticket created.", "ticket": ticket.to_dict()}), 201
 
 
@@ -507,9 +504,9 @@ def get_admission_documents():
     admin_type = type_mapping.get(admission_type, admission_type)
     
     # Query documents
-    query = AdmissionDocuments.query
+    query = read_session().query(AdmissionDocuments)
     if admin_type:
-        query = query.filter(AdmissionDocuments.admission_type.ilike(admin_type))
+        query = query.filter(AdmissionDocuments.admission_type_key == normalize_key(admin_type))
     
     documents = query.order_by(
         AdmissionDocuments.display_order
@@ -559,9 +556,9 @@ def get_admission_documents():
 def get_fees_information():
     """Return fee structure details, optionally filtered by category"""
     category = (request.args.get("category") or "").strip()
-    query = FeesStructure.query
+    query = read_session().query(FeesStructure)
     if category:
-        query = query.filter(FeesStructure.category.ilike(category))
+        query = query.filter(FeesStructure.category_key == normalize_key(category))
     fees = query.order_by(FeesStructure.category).all()
     fees_dict = [fee.to_dict() for fee in fees]  # Convert to dicts first
 
@@ -579,9 +576,9 @@ def get_fees_information():
 def get_scholarship_information():
     """Return scholarship details, optionally filtered by category"""
     category = (request.args.get("category") or "").strip()
-    query = Scholarships.query.filter(Scholarships.is_active.is_(True))
+    query = read_session().query(Scholarships).filter(Scholarships.is_active.is_(True))
     if category:
-        query = query.filter(Scholarships.category.ilike(category))
+        query = query.filter(Scholarships.category_key == normalize_key(category))
     scholarships = query.order_by(Scholarships.scholarship_name).all()
     scholarships_dict = [item.to_dict() for item in scholarships]
 
@@ -0,0 +1,274 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, and_, inspect, literal_column, or_, text
+from sqlalchemy.exc import OperationalError
+
+from backend.database import db
+from backend.models import ArchivedHelpTickets, Attachment, HelpTickets, StudentFeesPayment
+from backend.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 8
+# Search pages are ranked, so the cursor carries an offset rather than row keys.
+OFFSET_CURSOR = [(literal_column("offset", Integer), False)]
+
+
+class SearchSource:
+    """
+    A searchable table: the model and the text attributes that are indexed.
+    Sources that are not `default` are only searched when asked for by name.
+    """
+
+    def __init__(self, name: str, model, attributes: Sequence[str], default: bool = True):
+        self.name = name
+        self.model = model
+        self.attributes = tuple(attributes)
+        self.default = default
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def columns(self) -> List[str]:
+        return [getattr(self.model, attr).property.columns[0].name for attr in self.attributes]
+
+
+SEARCH_SOURCES = {
+    "payments": SearchSource(
+        "payments", StudentFeesPayment, ("student_name", "student_id", "receipt_number")
+    ),
+    "tickets": SearchSource("tickets", HelpTickets, ("student_name", "topic", "query_text")),
+    "archived_tickets": SearchSource(
+        "archived_tickets", ArchivedHelpTickets, ("student_name", "topic", "query_text"), default=False
+    ),
+    # Text extracted from ticket PDFs by `backend.attachment_processing`.
+    "attachments": SearchSource("attachments", Attachment, ("text",)),
+}
+
+# Which implementation `install_search_indexes()` set up for the bound database:
+# "fts5", "mysql", "postgresql" or "like" (unindexed fallback).
+_backend: Optional[str] = None
+# InnoDB does not index words shorter than this (`innodb_ft_min_token_size`),
+# and a required term it cannot match makes a boolean query return nothing.
+_mysql_min_token_size = 3
+
+
+def parse_terms(value: Optional[str]) -> List[str]:
+    terms = re.findall(r"\w+", (value or "").lower())[:MAX_TERMS]
+    if not terms:
+        raise ValueError("q must contain at least one word.")
+    return terms
+
+
+def install_search_indexes() -> str:
+    """
+    Create the full-text index for each source on the configured database.
+
+    SQLite gets FTS5 external-content tables kept in sync by triggers; MySQL
+    gets FULLTEXT indexes and Postgres GIN `tsvector` expression indexes, which
+    the database maintains itself. Anything else (or SQLite without FTS5)
+    falls back to unindexed `LIKE` matching.
+    """
+    global _backend, _mysql_min_token_size
+    engine = db.engine
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            for source in SEARCH_SOURCES.values():
+                _install_fts5(engine, source)
+            _backend = "fts5"
+        elif dialect == "mysql":
+            for source in SEARCH_SOURCES.values():
+                _install_mysql(engine, source)
+            with engine.connect() as conn:
+                _mysql_min_token_size = int(conn.execute(text("SELECT @@innodb_ft_min_token_size")).scalar())
+            _backend = "mysql"
+        elif dialect == "postgresql":
+            for source in SEARCH_SOURCES.values():
+                _install_postgres(engine, source)
+            _backend = "postgresql"
+        else:
+            _backend = "like"
+    except OperationalError as exc:
+        logger.warning("Full-text search unavailable, falling back to LIKE: %s", exc)
+        _backend = "like"
+    return _backend
+
+
+def _fts_table(source: SearchSource) -> str:
+    return f"{source.table}_fts"
+
+
+def _install_fts5(engine, source: SearchSource) -> None:
+    fts = _fts_table(source)
+    columns = ", ".join(f'"{column}"' for column in source.columns)
+    new_values = ", ".join(f'new."{column}"' for column in source.columns)
+    old_values = ", ".join(f'old."{column}"' for column in source.columns)
+    triggers = {
+        f"{fts}_ai": f"""
+            CREATE TRIGGER {fts}_ai AFTER INSERT ON {source.table} BEGIN
+                INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+            END""",
+        f"{fts}_ad": f"""
+            CREATE TRIGGER {fts}_ad AFTER DELETE ON {source.table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END""",
+        f"{fts}_au": f"""
+            CREATE TRIGGER {fts}_au AFTER UPDATE ON {source.table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+            END""",
+    }
+    with engine.begin() as conn:
+        existing = {
+            row[0]
+            for row in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE name = :fts OR tbl_name = :table"),
+                {"fts": fts, "table": source.table},
+            )
+        }
+        missing = [name for name in triggers if name not in existing]
+        if fts in existing and not missing:
+            return
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{columns}, content='{source.table}', content_rowid='id', tokenize='unicode61')"
+            )
+        )
+        for name in missing:
+            conn.execute(text(triggers[name]))
+        # Index rows written before the table or its triggers existed.
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        logger.info("Built FTS5 index %s", fts)
+
+
+def _install_mysql(engine, source: SearchSource) -> None:
+    name = f"ft_{source.table}"
+    if name in {index["name"] for index in inspect(engine).get_indexes(source.table)}:
+        return
+    columns = ", ".join(f"`{column}`" for column in source.columns)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {source.table} ADD FULLTEXT INDEX {name} ({columns})"))
+    logger.info("Created FULLTEXT index %s", name)
+
+
+def _tsvector(source: SearchSource) -> str:
+    document = " || ' ' || ".join(f"coalesce(\"{column}\", '')" for column in source.columns)
+    return f"to_tsvector('simple', {document})"
+
+
+def _install_postgres(engine, source: SearchSource) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{source.table}_search "
+                f"ON {source.table} USING GIN (({_tsvector(source)}))"
+            )
+        )
+
+
+def _ranked_ids(source: SearchSource, terms: List[str], limit: int) -> List[Tuple[float, int]]:
+    """The best `limit` (score, id) pairs of one source; higher scores rank first."""
+    backend = _backend or install_search_indexes()
+    if backend == "fts5":
+        fts = _fts_table(source)
+        statement = text(
+            f"SELECT -bm25({fts}) AS score, rowid AS id FROM {fts} "
+            f"WHERE {fts} MATCH :match ORDER BY score DESC, id DESC LIMIT :limit"
+        )
+        params = {"match": " ".join(f'"{term}"*' for term in terms)}
+    elif backend == "mysql":
+        indexed = [term for term in terms if len(term) >= _mysql_min_token_size]
+        if not indexed:
+            return _like_ids(source, terms, limit)
+        columns = ", ".join(f"`{column}`" for column in source.columns)
+        match = f"MATCH({columns}) AGAINST(:match IN BOOLEAN MODE)"
+        statement = text(
+            f"SELECT {match} AS score, id FROM {source.table} "
+            f"WHERE {match} ORDER BY score DESC, id DESC LIMIT :limit"
+        )
+        params = {"match": " ".join(f"+{term}*" for term in indexed)}
+    elif backend == "postgresql":
+        vector = _tsvector(source)
+        statement = text(
+            f"SELECT ts_rank({vector}, to_tsquery('simple', :match)) AS score, id FROM {source.table} "
+            f"WHERE {vector} @@ to_tsquery('simple', :match) ORDER BY score DESC, id DESC LIMIT :limit"
+        )
+        params = {"match": " & ".join(f"{term}:*" for term in terms)}
+    else:
+        return _like_ids(source, terms, limit)
+
+    rows = db.session.execute(statement, {**params, "limit": limit}).all()
+    return [(float(row.score or 0), row.id) for row in rows]
+
+
+def _like_ids(source: SearchSource, terms: List[str], limit: int) -> List[Tuple[float, int]]:
+    """Unindexed fallback: rows containing every term, newest first, unscored."""
+    model = source.model
+    matches = [or_(*[getattr(model, attr).ilike(f"%{term}%") for attr in source.attributes]) for term in terms]
+    rows = db.session.query(model.id).filter(and_(*matches)).order_by(model.id.desc()).limit(limit).all()
+    return [(0.0, row.id) for row in rows]
+
+
+def _normalized(ranked: List[Tuple[float, int]]) -> List[Tuple[float, int]]:
+    """
+    Scale one source's scores to 0..1 by its best hit. bm25, MySQL relevance
+    and `ts_rank` are on unrelated scales, so raw scores from different
+    sources (or backends) cannot be compared.
+    """
+    top = max((score for score, _ in ranked), default=0.0)
+    if top <= 0:
+        return [(0.0, row_id) for _, row_id in ranked]
+    return [(score / top, row_id) for score, row_id in ranked]
+
+
+def search(
+    query: Optional[str], sources: Optional[Sequence[str]] = None, *, limit: int, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Ranked search across `sources` (default: all default sources). Each source's scores
+    are scaled by its best hit before merging; the cursor is the offset into the merged list.
+    """
+    terms = parse_terms(query)
+    names = list(sources) if sources else [name for name, source in SEARCH_SOURCES.items() if source.default]
+    unknown = [name for name in names if name not in SEARCH_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown search type: {', '.join(unknown)}")
+
+    offset = decode_cursor(cursor, OFFSET_CURSOR)[0] if cursor else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor.")
+
+    ranked = []
+    for name in names:
+        source = SEARCH_SOURCES[name]
+        ranked.extend(
+            (score, name, row_id)
+            for score, row_id in _normalized(_ranked_ids(source, terms, offset + limit + 1))
+        )
+    ranked.sort(key=lambda item: (-item[0], item[1], -item[2]))
+    page = ranked[offset : offset + limit]
+
+    records = {}
+    for name in names:
+        ids = [row_id for _, source_name, row_id in page if source_name == name]
+        if ids:
+            model = SEARCH_SOURCES[name].model
+            records.update({(name, row.id): row for row in model.query.filter(model.id.in_(ids))})
+
+    items = [
+        {"type": name, "id": row_id, "score": round(score, 4), "record": records[(name, row_id)].to_dict()}
+        for score, name, row_id in page
+        if (name, row_id) in records
+    ]
+    has_more = len(ranked) > offset + limit
+    return {
+        "backend": _backend,
+        "items": items,
+        "next_cursor": encode_cursor([offset + limit]) if has_more else None,
+    }
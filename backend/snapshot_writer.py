@@ -0,0 +1,144 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from backend import change_tracking
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWriter:
+    """
+    Export the seed snapshot (`data/snapshot/`) from a background thread.
+
+    Committed transactions report the tables they touched (see
+    `backend.change_tracking`); `request_export()` marks those snapshot
+    segments dirty. The worker waits until writes have been quiet for
+    `debounce` seconds (but never longer than `max_delay` after the first
+    pending request) and then re-exports the dirty segments once for the
+    whole burst.
+    """
+
+    def __init__(self, debounce: float = 2.0, max_delay: float = 30.0):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+        self._export_lock = threading.Lock()
+        self._pending_since: Optional[float] = None
+        self._last_request: Optional[float] = None
+        # None means "everything"; otherwise the set of touched table names.
+        self._pending_tables: Optional[Set[str]] = set()
+
+        self.export_count = 0
+        self.coalesced_requests = 0
+        self.last_export_at: Optional[datetime] = None
+        self.last_export_latency: Optional[float] = None
+        self.last_export_lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def init_app(self, app):
+        self._app = app
+        self.debounce = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", self.debounce))
+        self.max_delay = float(os.getenv("SNAPSHOT_MAX_DELAY_SECONDS", self.max_delay))
+        app.extensions["snapshot_writer"] = self
+        change_tracking.on_commit(self._after_commit)
+        atexit.register(self.flush)
+
+    def _after_commit(self, tables: Set[str]) -> None:
+        from seed_data import SNAPSHOT_TABLES
+
+        touched = tables & SNAPSHOT_TABLES
+        if touched:
+            self.request_export(touched)
+
+    def request_export(self, tables: Optional[Iterable[str]] = None) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            else:
+                self.coalesced_requests += 1
+            if tables is None or self._pending_tables is None:
+                self._pending_tables = None
+            else:
+                self._pending_tables.update(tables)
+            self._last_request = now
+            self._ensure_thread()
+            self._condition.notify()
+
+    def flush(self) -> None:
+        """Run a pending export immediately (used at shutdown and by CLI tools)."""
+        with self._condition:
+            pending_since, tables = self._take_pending()
+        if pending_since is not None:
+            self._export(pending_since, tables)
+
+    def _take_pending(self):
+        pending = (self._pending_since, self._pending_tables)
+        self._pending_since = None
+        self._last_request = None
+        self._pending_tables = set()
+        return pending
+
+    def status(self) -> Dict[str, Any]:
+        with self._condition:
+            pending_since = self._pending_since
+        return {
+            "pending": pending_since is not None,
+            "pending_tables": sorted(self._pending_tables) if self._pending_tables is not None else "all",
+            "pending_seconds": round(time.monotonic() - pending_since, 3) if pending_since else 0.0,
+            "export_count": self.export_count,
+            "coalesced_requests": self.coalesced_requests,
+            "last_export_at": self.last_export_at.isoformat() if self.last_export_at else None,
+            "last_export_latency": self.last_export_latency,
+            "last_export_lag": self.last_export_lag,
+            "last_error": self.last_error,
+        }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending_since is None:
+                    self._condition.wait()
+                while self._pending_since is not None:
+                    due = min(self._last_request + self.debounce, self._pending_since + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                pending_since, tables = self._take_pending()
+            if pending_since is not None:
+                self._export(pending_since, tables)
+
+    def _export(self, pending_since: float, tables: Optional[Set[str]]) -> None:
+        from seed_data import write_seed_snapshot
+
+        with self._export_lock:
+            started = time.monotonic()
+            try:
+                with self._app.app_context():
+                    write_seed_snapshot(tables=tables)
+            except Exception as exc:  # pragma: no cover - export failures shouldn't kill the worker
+                self.last_error = str(exc)
+                logger.exception("Snapshot export failed: %s", exc)
+                return
+            finished = time.monotonic()
+            self.export_count += 1
+            self.last_error = None
+            self.last_export_at = datetime.utcnow()
+            self.last_export_latency = round(finished - started, 4)
+            self.last_export_lag = round(finished - pending_since, 4)
+
+
+snapshot_writer = SnapshotWriter()
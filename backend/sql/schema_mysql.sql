@@ -11,6 +11,7 @@ CREATE TABLE IF NOT EXISTS admins (
 CREATE TABLE IF NOT EXISTS fees_structures (
     id INT AUTO_INCREMENT PRIMARY KEY,
     category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50),
     prospectus_fees DECIMAL(10, 2) DEFAULT 0,
     tuition_fees DECIMAL(10, 2) DEFAULT 0,
     development_fees DECIMAL(10, 2) DEFAULT 0,
@@ -19,22 +20,31 @@ CREATE TABLE IF NOT EXISTS fees_structures (
     library_lab_fees DECIMAL(10, 2) DEFAULT 0,
     student_insurance DECIMAL(10, 2) DEFAULT 0,
     total_fees DECIMAL(10, 2) DEFAULT 0,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_fees_structures_category_key (category_key),
+    INDEX ix_fees_structures_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS admission_documents (
     id INT AUTO_INCREMENT PRIMARY KEY,
     admission_type VARCHAR(50) NOT NULL,
+    admission_type_key VARCHAR(50),
     document_name VARCHAR(200) NOT NULL,
     is_required BOOLEAN DEFAULT TRUE,
-    display_order INT DEFAULT 0
+    display_order INT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_admission_documents_type_order (admission_type_key, display_order),
+    INDEX ix_admission_documents_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS library_books (
     id INT AUTO_INCREMENT PRIMARY KEY,
     category VARCHAR(100) NOT NULL,
     book_count INT DEFAULT 0,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_library_books_category (category),
+    INDEX ix_library_books_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS library_timings (
@@ -44,7 +54,9 @@ CREATE TABLE IF NOT EXISTS library_timings (
     return_start_time VARCHAR(10) NOT NULL,
     return_end_time VARCHAR(10) NOT NULL,
     lunch_break_start VARCHAR(10) NOT NULL,
-    lunch_break_end VARCHAR(10) NOT NULL
+    lunch_break_end VARCHAR(10) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_library_timings_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS hostel_information (
@@ -52,28 +64,42 @@ CREATE TABLE IF NOT EXISTS hostel_information (
     facility_name VARCHAR(200) NOT NULL,
     is_available BOOLEAN DEFAULT TRUE,
     hostel_fees_per_semester DECIMAL(10, 2) DEFAULT 0,
-    mess_fees_per_month DECIMAL(10, 2) DEFAULT 0
+    mess_fees_per_month DECIMAL(10, 2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_hostel_information_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS scholarships (
     id INT AUTO_INCREMENT PRIMARY KEY,
     scholarship_name VARCHAR(200) NOT NULL,
     category VARCHAR(100) NOT NULL,
+    category_key VARCHAR(100),
     amount VARCHAR(100) NOT NULL,
     eligibility TEXT NOT NULL,
     documents_required TEXT NOT NULL,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_scholarships_scholarship_name (scholarship_name),
+    INDEX ix_scholarships_category_key (category_key),
+    INDEX ix_scholarships_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS faculty (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(200) NOT NULL,
     department VARCHAR(100) NOT NULL,
+    department_key VARCHAR(100),
     designation VARCHAR(100) NOT NULL,
+    designation_key VARCHAR(100),
     subjects_taught TEXT DEFAULT '',
     contact VARCHAR(20) DEFAULT '',
     email VARCHAR(100) DEFAULT '',
-    photo_url VARCHAR(500) DEFAULT ''
+    photo_url VARCHAR(500) DEFAULT '',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_faculty_department_name (department, name, id),
+    INDEX ix_faculty_department_key (department_key),
+    INDEX ix_faculty_designation_key (designation_key),
+    INDEX ix_faculty_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS principal_info (
@@ -84,16 +110,23 @@ CREATE TABLE IF NOT EXISTS principal_info (
     medals TEXT DEFAULT '',
     contact VARCHAR(20) DEFAULT '',
     email VARCHAR(100) DEFAULT '',
-    photo_url VARCHAR(500) DEFAULT ''
+    photo_url VARCHAR(500) DEFAULT '',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_principal_info_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS events (
     id INT AUTO_INCREMENT PRIMARY KEY,
     event_name VARCHAR(200) NOT NULL,
     event_type VARCHAR(50) NOT NULL,
+    event_type_key VARCHAR(50),
     event_date DATE NOT NULL,
     description TEXT DEFAULT '',
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_events_event_date_id (event_date, id),
+    INDEX ix_events_event_type_key (event_type_key),
+    INDEX ix_events_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS college_timings (
@@ -101,7 +134,9 @@ CREATE TABLE IF NOT EXISTS college_timings (
     opening_time VARCHAR(10) NOT NULL,
     closing_time VARCHAR(10) NOT NULL,
     saturday_opening VARCHAR(10) NOT NULL,
-    saturday_closing VARCHAR(10) NOT NULL
+    saturday_closing VARCHAR(10) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_college_timings_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS student_fees_payments (
@@ -110,12 +145,45 @@ CREATE TABLE IF NOT EXISTS student_fees_payments (
     student_id VARCHAR(50) NOT NULL,
     admission_year VARCHAR(10) NOT NULL,
     category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50),
     total_fees DECIMAL(10, 2) DEFAULT 0,
     paid_amount DECIMAL(10, 2) DEFAULT 0,
     remaining_amount DECIMAL(10, 2) DEFAULT 0,
     payment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     receipt_number VARCHAR(100) NOT NULL,
-    semester VARCHAR(20) NOT NULL
+    semester VARCHAR(20) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_student_fees_payments_student_id (student_id),
+    INDEX ix_student_fees_payments_admission_year (admission_year),
+    INDEX ix_student_fees_payments_semester (semester),
+    INDEX ix_student_fees_payments_category_key (category_key),
+    INDEX ix_student_fees_payments_payment_date_id (payment_date, id),
+    FULLTEXT INDEX ft_student_fees_payments (student_name, student_id, receipt_number),
+    INDEX ix_student_fees_payments_updated_at (updated_at)
+);
+
+CREATE TABLE IF NOT EXISTS fee_collection_summary (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50) NOT NULL,
+    admission_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    payment_count INT NOT NULL DEFAULT 0,
+    total_fees DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    remaining_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    CONSTRAINT uq_fee_collection_summary_group UNIQUE (category_key, admission_year, semester)
+);
+
+CREATE TABLE IF NOT EXISTS student_fee_balances (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    student_id VARCHAR(50) NOT NULL UNIQUE,
+    student_name VARCHAR(200) NOT NULL,
+    payment_count INT NOT NULL DEFAULT 0,
+    total_due DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    balance DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    last_payment_date TIMESTAMP NULL
 );
 
 CREATE TABLE IF NOT EXISTS help_tickets (
@@ -123,10 +191,97 @@ CREATE TABLE IF NOT EXISTS help_tickets (
     student_name VARCHAR(200) NOT NULL,
     contact VARCHAR(100) NOT NULL,
     topic VARCHAR(100) NULL,
+    topic_key VARCHAR(100),
     `query` TEXT NOT NULL,
     pdf_filename VARCHAR(255) NULL,
+    pdf_original_name VARCHAR(255) NULL,
+    pdf_page_count INT NULL,
+    pdf_thumbnail VARCHAR(255) NULL,
+    pdf_snippet VARCHAR(300) NULL,
     status VARCHAR(50) DEFAULT 'Open',
+    status_key VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    resolved_at TIMESTAMP NULL,
+    intake_ref VARCHAR(32) NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_help_tickets_created_at_id (created_at, id),
+    UNIQUE INDEX ux_help_tickets_intake_ref (intake_ref),
+    INDEX ix_help_tickets_status_key (status_key),
+    INDEX ix_help_tickets_topic_key (topic_key),
+    FULLTEXT INDEX ft_help_tickets (student_name, topic, `query`),
+    INDEX ix_help_tickets_updated_at (updated_at)
+);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL,
+    row_id INT NOT NULL,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_tombstones_table_deleted (table_name, deleted_at)
+);
+
+CREATE TABLE IF NOT EXISTS ticket_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ticket_id INT NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    payload TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    resolved_at TIMESTAMP NULL
+    INDEX ix_ticket_events_ticket_id (ticket_id),
+    INDEX ix_ticket_events_created_at (created_at)
 );
 
+CREATE TABLE IF NOT EXISTS archived_help_tickets (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    original_id INT NULL,
+    student_name VARCHAR(200) NOT NULL,
+    contact VARCHAR(100) NOT NULL,
+    topic VARCHAR(100) NULL,
+    topic_key VARCHAR(100),
+    `query` TEXT NOT NULL,
+    pdf_filename VARCHAR(255) NULL,
+    pdf_original_name VARCHAR(255) NULL,
+    pdf_page_count INT NULL,
+    pdf_thumbnail VARCHAR(255) NULL,
+    pdf_snippet VARCHAR(300) NULL,
+    status VARCHAR(50),
+    status_key VARCHAR(50),
+    created_at TIMESTAMP NULL,
+    resolved_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    intake_ref VARCHAR(32) NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_archived_help_tickets_resolved_at_id (resolved_at, id),
+    INDEX ix_archived_help_tickets_topic_key (topic_key),
+    INDEX ix_archived_help_tickets_original_id (original_id),
+    FULLTEXT INDEX ft_archived_help_tickets (student_name, topic, `query`)
+);
+
+CREATE TABLE IF NOT EXISTS attachments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL UNIQUE,
+    storage_path VARCHAR(255) NOT NULL,
+    size INT NOT NULL DEFAULT 0,
+    ref_count INT NOT NULL DEFAULT 0,
+    page_count INT NULL,
+    text LONGTEXT NULL,
+    thumbnail_path VARCHAR(255) NULL,
+    processed_at TIMESTAMP NULL,
+    processing_error VARCHAR(255) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_attachments_processed_at (processed_at),
+    FULLTEXT INDEX ft_attachments (text)
+);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    scope VARCHAR(255) NOT NULL,
+    `key` VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INT NULL,
+    response_body LONGTEXT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    UNIQUE INDEX ux_idempotency_keys_scope_key (scope, `key`),
+    INDEX ix_idempotency_keys_expires_at (expires_at)
+);
@@ -11,6 +11,7 @@ CREATE TABLE IF NOT EXISTS admins (
 CREATE TABLE IF NOT EXISTS fees_structures (
     id SERIAL PRIMARY KEY,
     category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50),
     prospectus_fees NUMERIC DEFAULT 0,
     tuition_fees NUMERIC DEFAULT 0,
     development_fees NUMERIC DEFAULT 0,
@@ -21,21 +22,30 @@ CREATE TABLE IF NOT EXISTS fees_structures (
     total_fees NUMERIC DEFAULT 0,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_fees_structures_category_key ON fees_structures (category_key);
+CREATE INDEX IF NOT EXISTS ix_fees_structures_updated_at ON fees_structures (updated_at);
 
 CREATE TABLE IF NOT EXISTS admission_documents (
     id SERIAL PRIMARY KEY,
     admission_type VARCHAR(50) NOT NULL,
+    admission_type_key VARCHAR(50),
     document_name VARCHAR(200) NOT NULL,
     is_required BOOLEAN DEFAULT TRUE,
-    display_order INTEGER DEFAULT 0
+    display_order INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_admission_documents_type_order ON admission_documents (admission_type_key, display_order);
+CREATE INDEX IF NOT EXISTS ix_admission_documents_updated_at ON admission_documents (updated_at);
 
 CREATE TABLE IF NOT EXISTS library_books (
     id SERIAL PRIMARY KEY,
     category VARCHAR(100) NOT NULL,
     book_count INTEGER DEFAULT 0,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_library_books_category ON library_books (category);
+CREATE INDEX IF NOT EXISTS ix_library_books_updated_at ON library_books (updated_at);
 
 CREATE TABLE IF NOT EXISTS library_timings (
     id SERIAL PRIMARY KEY,
@@ -44,37 +54,53 @@ CREATE TABLE IF NOT EXISTS library_timings (
     return_start_time VARCHAR(10) NOT NULL,
     return_end_time VARCHAR(10) NOT NULL,
     lunch_break_start VARCHAR(10) NOT NULL,
-    lunch_break_end VARCHAR(10) NOT NULL
+    lunch_break_end VARCHAR(10) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_library_timings_updated_at ON library_timings (updated_at);
 
 CREATE TABLE IF NOT EXISTS hostel_information (
     id SERIAL PRIMARY KEY,
     facility_name VARCHAR(200) NOT NULL,
     is_available BOOLEAN DEFAULT TRUE,
     hostel_fees_per_semester NUMERIC DEFAULT 0,
-    mess_fees_per_month NUMERIC DEFAULT 0
+    mess_fees_per_month NUMERIC DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_hostel_information_updated_at ON hostel_information (updated_at);
 
 CREATE TABLE IF NOT EXISTS scholarships (
     id SERIAL PRIMARY KEY,
     scholarship_name VARCHAR(200) NOT NULL,
     category VARCHAR(100) NOT NULL,
+    category_key VARCHAR(100),
     amount VARCHAR(100) NOT NULL,
     eligibility TEXT NOT NULL,
     documents_required TEXT NOT NULL,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_scholarships_scholarship_name ON scholarships (scholarship_name);
+CREATE INDEX IF NOT EXISTS ix_scholarships_category_key ON scholarships (category_key);
+CREATE INDEX IF NOT EXISTS ix_scholarships_updated_at ON scholarships (updated_at);
 
 CREATE TABLE IF NOT EXISTS faculty (
     id SERIAL PRIMARY KEY,
     name VARCHAR(200) NOT NULL,
     department VARCHAR(100) NOT NULL,
+    department_key VARCHAR(100),
     designation VARCHAR(100) NOT NULL,
+    designation_key VARCHAR(100),
     subjects_taught TEXT DEFAULT '',
     contact VARCHAR(20) DEFAULT '',
     email VARCHAR(100) DEFAULT '',
-    photo_url VARCHAR(500) DEFAULT ''
+    photo_url VARCHAR(500) DEFAULT '',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_faculty_department_name ON faculty (department, name, id);
+CREATE INDEX IF NOT EXISTS ix_faculty_department_key ON faculty (department_key);
+CREATE INDEX IF NOT EXISTS ix_faculty_designation_key ON faculty (designation_key);
+CREATE INDEX IF NOT EXISTS ix_faculty_updated_at ON faculty (updated_at);
 
 CREATE TABLE IF NOT EXISTS principal_info (
     id SERIAL PRIMARY KEY,
@@ -84,25 +110,34 @@ CREATE TABLE IF NOT EXISTS principal_info (
     medals TEXT DEFAULT '',
     contact VARCHAR(20) DEFAULT '',
     email VARCHAR(100) DEFAULT '',
-    photo_url VARCHAR(500) DEFAULT ''
+    photo_url VARCHAR(500) DEFAULT '',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_principal_info_updated_at ON principal_info (updated_at);
 
 CREATE TABLE IF NOT EXISTS events (
     id SERIAL PRIMARY KEY,
     event_name VARCHAR(200) NOT NULL,
     event_type VARCHAR(50) NOT NULL,
+    event_type_key VARCHAR(50),
     event_date DATE NOT NULL,
     description TEXT DEFAULT '',
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_events_event_date_id ON events (event_date, id);
+CREATE INDEX IF NOT EXISTS ix_events_event_type_key ON events (event_type_key);
+CREATE INDEX IF NOT EXISTS ix_events_updated_at ON events (updated_at);
 
 CREATE TABLE IF NOT EXISTS college_timings (
     id SERIAL PRIMARY KEY,
     opening_time VARCHAR(10) NOT NULL,
     closing_time VARCHAR(10) NOT NULL,
     saturday_opening VARCHAR(10) NOT NULL,
-    saturday_closing VARCHAR(10) NOT NULL
+    saturday_closing VARCHAR(10) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS ix_college_timings_updated_at ON college_timings (updated_at);
 
 CREATE TABLE IF NOT EXISTS student_fees_payments (
     id SERIAL PRIMARY KEY,
@@ -110,21 +145,144 @@ CREATE TABLE IF NOT EXISTS student_fees_payments (
     student_id VARCHAR(50) NOT NULL,
     admission_year VARCHAR(10) NOT NULL,
     category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50),
     total_fees NUMERIC DEFAULT 0,
     paid_amount NUMERIC DEFAULT 0,
     remaining_amount NUMERIC DEFAULT 0,
     payment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     receipt_number VARCHAR(100) NOT NULL,
-    semester VARCHAR(20) NOT NULL
+    semester VARCHAR(20) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_student_id ON student_fees_payments (student_id);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_admission_year ON student_fees_payments (admission_year);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_semester ON student_fees_payments (semester);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_category_key ON student_fees_payments (category_key);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_payment_date_id ON student_fees_payments (payment_date, id);
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_search ON student_fees_payments USING GIN ((to_tsvector('simple', coalesce("student_name", '') || ' ' || coalesce("student_id", '') || ' ' || coalesce("receipt_number", ''))));
+CREATE INDEX IF NOT EXISTS ix_student_fees_payments_updated_at ON student_fees_payments (updated_at);
+
+CREATE TABLE IF NOT EXISTS fee_collection_summary (
+    id SERIAL PRIMARY KEY,
+    category VARCHAR(50) NOT NULL,
+    category_key VARCHAR(50) NOT NULL,
+    admission_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    total_fees NUMERIC NOT NULL DEFAULT 0,
+    paid_amount NUMERIC NOT NULL DEFAULT 0,
+    remaining_amount NUMERIC NOT NULL DEFAULT 0,
+    CONSTRAINT uq_fee_collection_summary_group UNIQUE (category_key, admission_year, semester)
+);
+
+CREATE TABLE IF NOT EXISTS student_fee_balances (
+    id SERIAL PRIMARY KEY,
+    student_id VARCHAR(50) NOT NULL UNIQUE,
+    student_name VARCHAR(200) NOT NULL,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    total_due NUMERIC NOT NULL DEFAULT 0,
+    total_paid NUMERIC NOT NULL DEFAULT 0,
+    balance NUMERIC NOT NULL DEFAULT 0,
+    last_payment_date TIMESTAMP
 );
 
 CREATE TABLE IF NOT EXISTS help_tickets (
     id SERIAL PRIMARY KEY,
     student_name VARCHAR(200) NOT NULL,
     contact VARCHAR(100) NOT NULL,
+    topic VARCHAR(100),
+    topic_key VARCHAR(100),
     query TEXT NOT NULL,
+    pdf_filename VARCHAR(255),
+    pdf_original_name VARCHAR(255),
+    pdf_page_count INTEGER,
+    pdf_thumbnail VARCHAR(255),
+    pdf_snippet VARCHAR(300),
     status VARCHAR(50) DEFAULT 'Open',
+    status_key VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    resolved_at TIMESTAMP,
+    intake_ref VARCHAR(32),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_help_tickets_created_at_id ON help_tickets (created_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_help_tickets_intake_ref ON help_tickets (intake_ref);
+CREATE INDEX IF NOT EXISTS ix_help_tickets_status_key ON help_tickets (status_key);
+CREATE INDEX IF NOT EXISTS ix_help_tickets_topic_key ON help_tickets (topic_key);
+CREATE INDEX IF NOT EXISTS ix_help_tickets_search ON help_tickets USING GIN ((to_tsvector('simple', coalesce("student_name", '') || ' ' || coalesce("topic", '') || ' ' || coalesce("query", ''))));
+CREATE INDEX IF NOT EXISTS ix_help_tickets_updated_at ON help_tickets (updated_at);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    id SERIAL PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL,
+    row_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_tombstones_table_deleted ON tombstones (table_name, deleted_at);
+
+CREATE TABLE IF NOT EXISTS ticket_events (
+    id SERIAL PRIMARY KEY,
+    ticket_id INTEGER NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_ticket_events_ticket_id ON ticket_events (ticket_id);
+CREATE INDEX IF NOT EXISTS ix_ticket_events_created_at ON ticket_events (created_at);
+
+CREATE TABLE IF NOT EXISTS archived_help_tickets (
+    id SERIAL PRIMARY KEY,
+    original_id INTEGER,
+    student_name VARCHAR(200) NOT NULL,
+    contact VARCHAR(100) NOT NULL,
+    topic VARCHAR(100),
+    topic_key VARCHAR(100),
+    query TEXT NOT NULL,
+    pdf_filename VARCHAR(255),
+    pdf_original_name VARCHAR(255),
+    pdf_page_count INTEGER,
+    pdf_thumbnail VARCHAR(255),
+    pdf_snippet VARCHAR(300),
+    status VARCHAR(50),
+    status_key VARCHAR(50),
+    created_at TIMESTAMP,
+    resolved_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    intake_ref VARCHAR(32),
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_archived_help_tickets_resolved_at_id ON archived_help_tickets (resolved_at, id);
+CREATE INDEX IF NOT EXISTS ix_archived_help_tickets_topic_key ON archived_help_tickets (topic_key);
+CREATE INDEX IF NOT EXISTS ix_archived_help_tickets_original_id ON archived_help_tickets (original_id);
+CREATE INDEX IF NOT EXISTS ix_archived_help_tickets_search ON archived_help_tickets USING GIN ((to_tsvector('simple', coalesce("student_name", '') || ' ' || coalesce("topic", '') || ' ' || coalesce("query", ''))));
+
+CREATE TABLE IF NOT EXISTS attachments (
+    id SERIAL PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL UNIQUE,
+    storage_path VARCHAR(255) NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    page_count INTEGER,
+    text TEXT,
+    thumbnail_path VARCHAR(255),
+    processed_at TIMESTAMP,
+    processing_error VARCHAR(255),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    resolved_at TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS ix_attachments_processed_at ON attachments (processed_at);
+CREATE INDEX IF NOT EXISTS ix_attachments_search ON attachments USING GIN ((to_tsvector('simple', coalesce("text", ''))));
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id SERIAL PRIMARY KEY,
+    scope VARCHAR(255) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_body TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_idempotency_keys_scope_key ON idempotency_keys (scope, key);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select
+
+from backend import change_tracking
+from backend.database import db
+from backend.models import ArchivedHelpTickets, HelpTickets, Tombstone
+
+DEFAULT_ARCHIVE_DAYS = int(os.getenv("TICKET_ARCHIVE_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = 500
+
+# Columns copied verbatim; the archive assigns its own `id`, the live id goes
+# to `original_id` and `archived_at` is stamped by the job.
+ARCHIVED_COLUMNS = [
+    column.name
+    for column in ArchivedHelpTickets.__table__.columns
+    if column.name not in ("id", "original_id", "archived_at")
+]
+
+
+def _archivable(cutoff: datetime):
+    table = HelpTickets.__table__
+    return and_(
+        table.c.status_key == "resolved",
+        or_(
+            table.c.resolved_at < cutoff,
+            and_(table.c.resolved_at.is_(None), table.c.updated_at < cutoff),
+        ),
+    )
+
+
+def archive_resolved_tickets(
+    older_than_days: int = DEFAULT_ARCHIVE_DAYS, *, batch_size: int = ARCHIVE_BATCH_SIZE, dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Move tickets resolved more than `older_than_days` ago into
+    `archived_help_tickets`, one transaction per batch.
+
+    Rows are copied with INSERT ... SELECT under new archive ids (the live id
+    is kept as `original_id`) and deleted from the hot table, which takes
+    their search index entries with them; a tombstone per row lets `?since=`
+    clients drop them. PDF files stay where they are and are served from the
+    archive by the same `pdf_filename`.
+    """
+    if older_than_days < 0:
+        raise ValueError("older_than_days must not be negative.")
+    table = HelpTickets.__table__
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    report: Dict[str, Any] = {"cutoff": cutoff.isoformat(), "archived": 0, "batches": 0, "dry_run": dry_run}
+
+    if dry_run:
+        report["archived"] = db.session.query(HelpTickets.id).filter(_archivable(cutoff)).count()
+        return report
+
+    while True:
+        ids: List[int] = list(
+            db.session.execute(
+                select(table.c.id).where(_archivable(cutoff)).order_by(table.c.id).limit(batch_size)
+            ).scalars()
+        )
+        if not ids:
+            break
+        now = datetime.utcnow()
+        db.session.execute(
+            insert(ArchivedHelpTickets.__table__).from_select(
+                ARCHIVED_COLUMNS + ["original_id", "archived_at"],
+                select(
+                    *[table.c[name] for name in ARCHIVED_COLUMNS], table.c.id, literal(now, DateTime)
+                ).where(table.c.id.in_(ids)),
+            )
+        )
+        db.session.execute(delete(table).where(table.c.id.in_(ids)))
+        db.session.execute(
+            insert(Tombstone.__table__),
+            [{"table_name": table.name, "row_id": row_id, "deleted_at": now} for row_id in ids],
+        )
+        change_tracking.touch(
+            db.session, table.name, ArchivedHelpTickets.__tablename__, Tombstone.__tablename__
+        )
+        db.session.commit()
+        report["archived"] += len(ids)
+        report["batches"] += 1
+    return report
@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import event, func, inspect, insert, select
+
+from backend import change_tracking
+from backend.database import db
+from backend.models import HelpTickets, TicketEvent
+
+logger = logging.getLogger(__name__)
+
+# Commits in this process wake the streams at once; commits made by other
+# workers are picked up by polling the journal this often.
+POLL_SECONDS = 2.0
+HEARTBEAT_SECONDS = 15.0
+# Streams end after this long and the browser reconnects with Last-Event-ID,
+# so a worker thread is never held indefinitely.
+STREAM_SECONDS = 300.0
+RETRY_MILLISECONDS = 3000
+EVENT_BATCH_SIZE = 100
+EVENT_RETENTION = timedelta(days=7)
+# Journal ids are allocated when a transaction flushes, not when it commits,
+# so with several workers a lower id can become visible after a higher one.
+# Ids a stream has skipped over are checked again until they appear or this
+# long has passed (rolled-back transactions leave gaps that never fill).
+GAP_SECONDS = 60.0
+MAX_GAPS = 1000
+# Each open stream holds a request worker for up to STREAM_SECONDS; further
+# streams in this process get a 503 and the admin panel falls back to reloading.
+MAX_STREAMS = int(os.getenv("TICKET_STREAM_LIMIT", "4"))
+
+_wakeup = threading.Condition()
+_stream_slots = threading.BoundedSemaphore(max(MAX_STREAMS, 1))
+
+
+def _journal(connection, ticket: HelpTickets, event_type: str) -> None:
+    connection.execute(
+        insert(TicketEvent.__table__).values(
+            ticket_id=ticket.id,
+            event_type=event_type,
+            payload=json.dumps(ticket.to_dict()),
+            created_at=datetime.utcnow(),
+        )
+    )
+
+
+@event.listens_for(HelpTickets, "after_insert")
+def _ticket_created(mapper, connection, target):
+    _journal(connection, target, "created")
+
+
+@event.listens_for(HelpTickets, "after_update")
+def _ticket_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.status.history.has_changes():
+        _journal(connection, target, "status")
+    elif any(state.attrs[attr.key].history.has_changes() for attr in mapper.column_attrs):
+        _journal(connection, target, "updated")
+
+
+@change_tracking.on_commit
+def _wake_streams(tables):
+    if HelpTickets.__tablename__ in tables:
+        with _wakeup:
+            _wakeup.notify_all()
+
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        event_id = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Last-Event-ID must be an integer.")
+    if event_id < 0:
+        raise ValueError("Last-Event-ID must be an integer.")
+    return event_id
+
+
+def latest_event_id() -> int:
+    with db.engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(TicketEvent.id), 0))).scalar_one()
+
+
+def acquire_stream_slot() -> bool:
+    return MAX_STREAMS > 0 and _stream_slots.acquire(blocking=False)
+
+
+def release_stream_slot() -> None:
+    _stream_slots.release()
+
+
+def _format(row) -> str:
+    data = {
+        "event_id": row.id,
+        "ticket_id": row.ticket_id,
+        "type": row.event_type,
+        "ticket": json.loads(row.payload),
+        "created_at": row.created_at.isoformat(),
+    }
+    return f"id: {row.id}\nevent: ticket.{row.event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def _note_gaps(gaps: Dict[int, float], missing: Iterable[int], now: float) -> None:
+    for event_id in missing:
+        gaps.setdefault(event_id, now + GAP_SECONDS)
+    for event_id in [event_id for event_id, expires in gaps.items() if expires <= now]:
+        del gaps[event_id]
+    if len(gaps) > MAX_GAPS:
+        for event_id in sorted(gaps)[: len(gaps) - MAX_GAPS]:
+            del gaps[event_id]
+
+
+def stream(after_id: int, resumed: bool = False) -> Iterator[str]:
+    """
+    Yield server-sent events for journal entries after `after_id`.
+
+    Each poll uses its own short-lived connection so no transaction (and no
+    stale snapshot) is held between polls. Missing ids below the newest one
+    sent are polled again for `GAP_SECONDS`, so an entry that commits after a
+    higher one is still delivered, out of id order. A resumed stream first
+    resends entries from the last `GAP_SECONDS`, because the client cannot
+    say which of them it missed; clients skip events older than the last one
+    applied to the same ticket. A resumed stream whose position has already
+    been pruned gets a `reset` event telling the client to reload.
+    """
+    table = TicketEvent.__table__
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+    window_start = max(after_id - EVENT_BATCH_SIZE, 0)
+    window = (table.c.id > window_start) & (table.c.id <= after_id)
+    with db.engine.connect() as conn:
+        if resumed:
+            oldest = conn.execute(select(func.min(table.c.id))).scalar()
+            if oldest is not None and oldest > after_id + 1:
+                yield "event: reset\ndata: {}\n\n"
+        present = set(conn.execute(select(table.c.id).where(window)).scalars())
+        recent = []
+        if resumed:
+            recent = conn.execute(
+                select(table)
+                .where(window, table.c.created_at >= datetime.utcnow() - timedelta(seconds=GAP_SECONDS))
+                .order_by(table.c.id)
+            ).all()
+    gaps: Dict[int, float] = {}
+    _note_gaps(gaps, set(range(window_start + 1, after_id + 1)) - present, time.monotonic())
+    if recent:
+        yield "".join(_format(row) for row in recent)
+
+    deadline = time.monotonic() + STREAM_SECONDS
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(table).where(table.c.id > after_id).order_by(table.c.id).limit(EVENT_BATCH_SIZE)
+            ).all()
+            late = []
+            if gaps:
+                late = conn.execute(select(table).where(table.c.id.in_(list(gaps)))).all()
+        now = time.monotonic()
+        for row in late:
+            gaps.pop(row.id, None)
+        missing = []
+        for row in rows:
+            missing.extend(range(max(after_id + 1, row.id - MAX_GAPS), row.id))
+            after_id = row.id
+        _note_gaps(gaps, missing, now)
+        if rows or late:
+            last_sent = now
+            yield "".join(_format(row) for row in sorted(late + rows, key=lambda row: row.id))
+            if len(rows) == EVENT_BATCH_SIZE:
+                continue
+        elif now - last_sent >= HEARTBEAT_SECONDS:
+            last_sent = now
+            yield ": heartbeat\n\n"
+        with _wakeup:
+            _wakeup.wait(POLL_SECONDS)
+
+
+def prune_ticket_events() -> int:
+    deleted = TicketEvent.query.filter(
+        TicketEvent.created_at < datetime.utcnow() - EVENT_RETENTION
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from backend.database import db
+from backend.models import HelpTickets
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 200
+# The drainer also wakes this often, to pick up rows journaled by other
+# processes and retries whose backoff has passed.
+POLL_SECONDS = 1.0
+# A claimed row not written within this long (crashed drainer) is claimed again.
+CLAIM_SECONDS = 60.0
+MAX_BACKOFF_SECONDS = 300.0
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    intake_ref TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+
+class TicketQueue:
+    """
+    Optional write-behind journal for help ticket intake.
+
+    With `TICKET_QUEUE_PATH` set, `create_help_ticket` appends the ticket to a
+    local SQLite journal (WAL, `synchronous=FULL`, so it survives a crash once
+    acknowledged) and answers 202. A background drainer copies journaled
+    tickets into the main database in batches of `DRAIN_BATCH_SIZE`, one
+    transaction each, and only then deletes them from the journal. Every row
+    carries an `intake_ref` that is unique in `help_tickets`, so a batch
+    replayed after a crash between the two steps is skipped rather than
+    inserted twice. Several processes may share one journal: rows are claimed
+    before they are written.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+        self._pending = False
+
+        self.drained_total = 0
+        self.last_drain_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def init_app(self, app):
+        self.path = os.getenv("TICKET_QUEUE_PATH") or None
+        self._app = app
+        app.extensions["ticket_queue"] = self
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(JOURNAL_SCHEMA)
+            leftover = conn.execute("SELECT COUNT(*) FROM queued_tickets").fetchone()[0]
+        finally:
+            conn.close()
+        if leftover:
+            # Tickets acknowledged before the last shutdown or crash.
+            self._wake()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    # Intake --------------------------------------------------------------------
+    def enqueue(self, values: Dict[str, Any]) -> str:
+        """Journal one ticket (model field values) and return its intake reference."""
+        intake_ref = uuid.uuid4().hex
+        payload = dict(values, created_at=datetime.utcnow().isoformat())
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO queued_tickets (intake_ref, payload, enqueued_at) VALUES (?, ?, ?)",
+                (intake_ref, json.dumps(payload), time.time()),
+            )
+        finally:
+            conn.close()
+        self._wake()
+        return intake_ref
+
+    def queued_paths(self) -> Set[str]:
+        """Stored PDF paths of journaled tickets, which no ticket row references yet."""
+        if not self.enabled:
+            return set()
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT payload FROM queued_tickets").fetchall()
+        finally:
+            conn.close()
+        return {path for path in (json.loads(row[0]).get("pdf_filename") for row in rows) if path}
+
+    def status(self) -> Dict[str, Any]:
+        data = {
+            "enabled": self.enabled,
+            "depth": 0,
+            "retrying": 0,
+            "oldest_seconds": 0.0,
+            "drained_total": self.drained_total,
+            "last_drain_at": self.last_drain_at.isoformat() if self.last_drain_at else None,
+            "last_error": self.last_error,
+        }
+        if not self.enabled:
+            return data
+        conn = self._connect()
+        try:
+            depth, retrying, oldest = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0), MIN(enqueued_at) FROM queued_tickets"
+            ).fetchone()
+        finally:
+            conn.close()
+        data.update(
+            depth=depth,
+            retrying=retrying,
+            oldest_seconds=round(time.time() - oldest, 3) if oldest else 0.0,
+        )
+        return data
+
+    # Draining ------------------------------------------------------------------
+    def _wake(self) -> None:
+        with self._condition:
+            self._pending = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ticket-queue", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._pending:
+                    self._condition.wait(POLL_SECONDS)
+                self._pending = False
+            try:
+                with self._app.app_context():
+                    self.drain()
+            except Exception as exc:  # pragma: no cover - keep the drainer alive
+                self.last_error = str(exc)
+                logger.exception("Ticket queue drain failed: %s", exc)
+
+    def drain(self, batch_size: int = DRAIN_BATCH_SIZE) -> int:
+        """Write journaled tickets to the database until none are due. Returns the number written."""
+        written = 0
+        while True:
+            rows = self._claim(batch_size)
+            if not rows:
+                return written
+            done, failed = self._write(rows)
+            self._settle(done, failed)
+            written += len(done)
+            if failed:
+                return written
+
+    def _claim(self, limit: int) -> List[sqlite3.Row]:
+        now = time.time()
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, intake_ref, payload FROM queued_tickets "
+                "WHERE claimed_until IS NULL OR claimed_until < ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE queued_tickets SET claimed_until = ? WHERE id = ?",
+                    [(now + CLAIM_SECONDS, row["id"]) for row in rows],
+                )
+            conn.execute("COMMIT")
+            return rows
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _write(self, rows):
+        """
+        Insert a claimed batch in one transaction. If the database rejects it
+        (rather than being unreachable or locked), each row is retried on its
+        own so one bad row does not hold back the others.
+        Returns (written rows, {row id: error}).
+        """
+        try:
+            self._insert(rows)
+            return rows, {}
+        except OperationalError as exc:
+            db.session.rollback()
+            return [], {row["id"]: str(exc) for row in rows}
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            if len(rows) == 1:
+                return [], {rows[0]["id"]: str(exc)}
+        done, failed = [], {}
+        for row in rows:
+            try:
+                self._insert([row])
+                done.append(row)
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                failed[row["id"]] = str(exc)
+        return done, failed
+
+    def _insert(self, rows) -> None:
+        from backend.attachment_processing import attachment_processor
+
+        refs = [row["intake_ref"] for row in rows]
+        existing = {
+            ref for (ref,) in db.session.query(HelpTickets.intake_ref).filter(HelpTickets.intake_ref.in_(refs))
+        }
+        tickets = []
+        for row in rows:
+            if row["intake_ref"] in existing:
+                continue
+            values = json.loads(row["payload"])
+            values["created_at"] = datetime.fromisoformat(values["created_at"])
+            tickets.append(HelpTickets(intake_ref=row["intake_ref"], **values))
+        if not tickets:
+            return
+        db.session.add_all(tickets)
+        db.session.commit()
+        for ticket in tickets:
+            attachment_processor.submit(ticket.pdf_filename)
+
+    def _settle(self, done, failed: Dict[int, str]) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM queued_tickets WHERE id = ?", [(row["id"],) for row in done])
+            for row_id, error in failed.items():
+                conn.execute(
+                    "UPDATE queued_tickets SET attempts = attempts + 1, last_error = ?, "
+                    "claimed_until = ? + MIN(?, (1 << MIN(attempts, 16))) WHERE id = ?",
+                    (error[:500], now, MAX_BACKOFF_SECONDS, row_id),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        if done:
+            self.drained_total += len(done)
+            self.last_drain_at = datetime.utcnow()
+        if failed:
+            self.last_error = next(iter(failed.values()))
+            logger.warning("%d queued ticket(s) could not be written; retrying later.", len(failed))
+        elif done:
+            self.last_error = None
+
+
+ticket_queue = TicketQueue()
@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import quote
+
+from flask import Response, current_app, send_from_directory
+from sqlalchemy import delete, event, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+from backend.database import db
+from backend.models import Attachment, HelpTickets
+
+UPLOADS_DIR = Path(__file__).resolve().parent / "uploads"
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+DEFAULT_MAX_PDF_BYTES = 10 * 1024 * 1024
+# Unreferenced files younger than this are kept: a new upload of the same
+# content may have found the file but not yet committed its reference.
+PRUNE_GRACE = timedelta(hours=1)
+
+# `ab/cd/abcd....pdf`: two levels of 256 directories keyed by the SHA-256.
+STORAGE_PATH = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.pdf$")
+
+# "internal" serves files from the worker; "x-accel" (nginx) and "x-sendfile"
+# (Apache, lighttpd) hand the transfer to the front proxy after the auth check.
+SENDFILE_MODES = ("internal", "x-accel", "x-sendfile")
+# Content-addressed files never change, so browsers may keep them.
+ATTACHMENT_MAX_AGE = 7 * 24 * 3600
+
+
+class StoredUpload(NamedTuple):
+    storage_path: str
+    original_name: str
+    sha256: str
+    size: int
+
+
+def init_app(app) -> None:
+    mode = os.getenv("ATTACHMENT_SENDFILE_MODE", "internal").strip().lower()
+    if mode not in SENDFILE_MODES:
+        raise ValueError(f"ATTACHMENT_SENDFILE_MODE must be one of: {', '.join(SENDFILE_MODES)}.")
+    app.config["ATTACHMENT_SENDFILE_MODE"] = mode
+    app.config["ATTACHMENT_ACCEL_PREFIX"] = os.getenv("ATTACHMENT_ACCEL_PREFIX", "/protected-uploads/")
+
+
+def max_pdf_bytes() -> int:
+    return int(os.getenv("TICKET_PDF_MAX_BYTES", DEFAULT_MAX_PDF_BYTES))
+
+
+def storage_path_for(digest: str) -> str:
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+
+
+def store_ticket_pdf(file_storage, max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Copy an uploaded PDF into the content-addressed store.
+
+    The upload is read in `CHUNK_SIZE` pieces into a temp file, hashed as it
+    goes, and rejected as soon as it exceeds `max_bytes` or does not start
+    with the PDF magic bytes. A complete file is renamed to its hash path, or
+    dropped if that content is already stored. Raises ValueError for files
+    that are not PDFs and RequestEntityTooLarge for oversized ones.
+    """
+    original_name = file_storage.filename or ""
+    if not original_name.lower().endswith(".pdf"):
+        raise ValueError("Only PDF files are allowed.")
+    max_bytes = max_pdf_bytes() if max_bytes is None else max_bytes
+
+    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".upload-", suffix=".part", dir=UPLOADS_DIR)
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            head = b""
+            size = 0
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(head) < len(PDF_MAGIC):
+                    head += chunk[: len(PDF_MAGIC) - len(head)]
+                    if len(head) == len(PDF_MAGIC) and head != PDF_MAGIC:
+                        raise ValueError("The uploaded file is not a valid PDF.")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise RequestEntityTooLarge(
+                        f"PDF files must be at most {round(max_bytes / (1024 * 1024), 1):g} MB."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        if head != PDF_MAGIC:
+            raise ValueError("The uploaded file is not a valid PDF.")
+
+        stored = StoredUpload(
+            storage_path_for(digest.hexdigest()), secure_filename(original_name), digest.hexdigest(), size
+        )
+        place_file(temp_path, stored.storage_path)
+        return stored
+    except BaseException:
+        _remove(temp_path)
+        raise
+
+
+def place_file(source, storage_path: str, move: bool = True) -> None:
+    """
+    Put `source` at `storage_path` unless identical content is already
+    there, in which case the existing file is kept (and its mtime refreshed
+    so it is not pruned while the new reference commits).
+    """
+    target = UPLOADS_DIR / storage_path
+    if target.exists():
+        os.utime(target)
+        if move:
+            _remove(source)
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if move:
+        os.replace(source, target)
+    else:
+        temp = target.with_name(f".{target.name}.part")
+        with open(source, "rb") as src, open(temp, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(temp, target)
+
+
+def _remove(path) -> None:
+    try:
+        os.remove(UPLOADS_DIR / path)
+    except FileNotFoundError:
+        pass
+
+
+def send_attachment(storage_path: str, download_name: str) -> Response:
+    """
+    Respond with the stored file at `storage_path` as a download.
+
+    In "internal" mode Werkzeug answers Range and If-None-Match /
+    If-Modified-Since requests itself (206 / 304); content-addressed files use
+    their hash as a strong ETag. The proxy modes return only headers and let
+    the proxy read the file, including ranges, so the worker is freed at once.
+    Raises NotFound when the file is missing (internal mode) or the path
+    escapes the uploads directory.
+    """
+    mode = current_app.config.get("ATTACHMENT_SENDFILE_MODE", "internal")
+    match = STORAGE_PATH.match(storage_path)
+    etag = match.group(1) if match else True
+    max_age = ATTACHMENT_MAX_AGE if match else None
+
+    if mode == "internal":
+        response = send_from_directory(
+            UPLOADS_DIR,
+            storage_path,
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name=download_name,
+            etag=etag,
+            max_age=max_age,
+        )
+    else:
+        if ".." in storage_path.split("/") or storage_path.startswith("/"):
+            raise NotFound()
+        response = Response(mimetype="application/pdf")
+        response.headers.set("Content-Disposition", "attachment", filename=download_name)
+        if mode == "x-accel":
+            prefix = current_app.config.get("ATTACHMENT_ACCEL_PREFIX", "/protected-uploads/")
+            response.headers["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(storage_path)
+        else:
+            response.headers["X-Sendfile"] = str(UPLOADS_DIR / storage_path)
+        if match:
+            response.set_etag(etag)
+            response.cache_control.max_age = max_age
+    # Attachments are only served to signed-in admins; keep them out of shared caches.
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
+# Reference counts --------------------------------------------------------------
+def add_reference(connection, storage_path: Optional[str], delta: int) -> None:
+    """
+    Adjust the reference count of the attachment at `storage_path` on
+    `connection`, so it commits or rolls back with the ticket change. Paths
+    outside the content-addressed layout (legacy uploads) are ignored.
+    """
+    match = STORAGE_PATH.match(storage_path or "")
+    if not match or not delta:
+        return
+    table = Attachment.__table__
+    where = table.c.sha256 == match.group(1)
+    increment = {"ref_count": table.c.ref_count + delta, "updated_at": datetime.utcnow()}
+    if connection.execute(update(table).where(where).values(**increment)).rowcount:
+        return
+    path = UPLOADS_DIR / storage_path
+    row = {
+        "sha256": match.group(1),
+        "storage_path": storage_path,
+        "size": path.stat().st_size if path.exists() else 0,
+        "ref_count": delta,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(table).values(**row))
+    except IntegrityError:
+        # Another transaction registered the same content first.
+        connection.execute(update(table).where(where).values(**increment))
+
+
+# Load the previous value on assignment so `after_update` can release it even
+# when the row was expired before being modified.
+event.listen(HelpTickets.pdf_filename, "set", lambda *args: None, active_history=True)
+
+
+@event.listens_for(HelpTickets, "after_insert")
+def _ticket_inserted(mapper, connection, target):
+    add_reference(connection, target.pdf_filename, 1)
+
+
+@event.listens_for(HelpTickets, "after_update")
+def _ticket_updated(mapper, connection, target):
+    history = inspect(target).attrs.pdf_filename.history
+    if not history.has_changes():
+        return
+    for previous in history.deleted:
+        add_reference(connection, previous, -1)
+    add_reference(connection, target.pdf_filename, 1)
+
+
+@event.listens_for(HelpTickets, "after_delete")
+def _ticket_deleted(mapper, connection, target):
+    add_reference(connection, target.pdf_filename, -1)
+
+
+def rebuild_reference_counts() -> int:
+    """
+    Recount references from `help_tickets` and `archived_help_tickets`.
+    Returns the number of attachments that are referenced.
+    """
+    from backend.models import ArchivedHelpTickets
+
+    counts = {}
+    for model in (HelpTickets, ArchivedHelpTickets):
+        for (path,) in db.session.query(model.pdf_filename).filter(model.pdf_filename.isnot(None)):
+            if STORAGE_PATH.match(path):
+                counts[path] = counts.get(path, 0) + 1
+
+    connection = db.session.connection()
+    connection.execute(update(Attachment.__table__).values(ref_count=0))
+    for path, count in counts.items():
+        add_reference(connection, path, count)
+    db.session.commit()
+    return len(counts)
+
+
+def prune_attachments(grace: timedelta = PRUNE_GRACE) -> int:
+    """
+    Delete unreferenced attachments (rows, files and thumbnails) that have
+    been unreferenced for at least `grace`. Returns the number removed.
+    """
+    table = Attachment.__table__
+    cutoff = datetime.utcnow() - grace
+    rows = db.session.execute(
+        select(table.c.id, table.c.storage_path, table.c.thumbnail_path).where(
+            table.c.ref_count <= 0, table.c.updated_at < cutoff
+        )
+    ).all()
+    removed = 0
+    for row in rows:
+        path = UPLOADS_DIR / row.storage_path
+        if path.exists() and path.stat().st_mtime > time.time() - grace.total_seconds():
+            continue
+        deleted = db.session.execute(
+            delete(table).where(table.c.id == row.id, table.c.ref_count <= 0)
+        ).rowcount
+        db.session.commit()
+        if deleted:
+            _remove(row.storage_path)
+            if row.thumbnail_path:
+                _remove(row.thumbnail_path)
+            removed += 1
+    return removed
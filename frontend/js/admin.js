@@ -7,12 +7,21 @@ const adminState = {
 };
 
 // ------------------------ Core Helpers ------------------------
-async function apiCall(endpoint, method = "GET", data) {
+function newIdempotencyKey() {
+    return window.crypto?.randomUUID?.() || `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+async function apiRequest(endpoint, method = "GET", data) {
     const options = {
         method,
         headers: { "Content-Type": "application/json" },
         credentials: "include",
     };
+    if (method === "POST") {
+        // Repeated submits of the same modal share its key, so a double-click
+        // creates one record and the second request gets the first response.
+        options.headers["Idempotency-Key"] = adminState.modalContext?.idempotencyKey || newIdempotencyKey();
+    }
     if (data) options.body = JSON.stringify(data);
 
     const res = await fetch(`${ADMIN_API}${endpoint}`, options);
@@ -25,7 +34,138 @@ async function apiCall(endpoint, method = "GET", data) {
         const message = body.error || `Request failed (${res.status})`;
         throw new Error(message);
     }
-    return body;
+    return { body, headers: res.headers };
+}
+
+async function apiCall(endpoint, method = "GET", data) {
+    return (await apiRequest(endpoint, method, data)).body;
+}
+
+function formatAmount(value) {
+    return `₹${Number(value || 0).toFixed(2)}`;
+}
+
+function buildQuery(params = {}) {
+    const search = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && `${value}` !== "") {
+            search.append(key, value);
+        }
+    });
+    const text = search.toString();
+    return text ? `?${text}` : "";
+}
+
+function localDateString(offsetDays = 0) {
+    const date = new Date();
+    date.setDate(date.getDate() + offsetDays);
+    const pad = (n) => String(n).padStart(2, "0");
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}`;
+}
+
+// ------------------------ Paged Lists ------------------------
+// List endpoints return keyset pages ({ items, next_cursor, total }); each
+// pager fetches the next page when its sentinel scrolls into view.
+const PAGE_SIZE = 50;
+const pagers = {};
+
+function createPager(name, { endpoint, params = {}, anchor, reset, render }) {
+    const previous = pagers[name];
+    previous?.observer?.disconnect();
+    previous?.sentinel?.remove();
+
+    const pager = { name, endpoint, params, render, cursor: null, done: false, loading: false, items: [] };
+    pagers[name] = pager;
+    reset?.();
+
+    const anchorEl = document.getElementById(anchor);
+    if (anchorEl && "IntersectionObserver" in window) {
+        pager.sentinel = document.createElement("div");
+        pager.sentinel.className = "scroll-sentinel";
+        (anchorEl.closest(".table-wrapper") || anchorEl).after(pager.sentinel);
+        pager.observer = new IntersectionObserver(
+            (entries) => {
+                if (entries.some((entry) => entry.isIntersecting)) loadNextPage(pager);
+            },
+            { rootMargin: "200px" }
+        );
+    }
+    return loadNextPage(pager);
+}
+
+async function loadNextPage(pager) {
+    if (pager.loading || pager.done) return null;
+    pager.loading = true;
+    try {
+        const query = buildQuery({ ...pager.params, limit: PAGE_SIZE, cursor: pager.cursor });
+        const data = await apiCall(`${pager.endpoint}${query}`);
+        if (pagers[pager.name] !== pager) return null;
+        pager.cursor = data.next_cursor;
+        pager.done = !data.next_cursor;
+        pager.items.push(...data.items);
+        pager.render(data.items, data);
+        return data;
+    } catch (err) {
+        showToast(err.message, "error");
+        return null;
+    } finally {
+        pager.loading = false;
+        // Re-observing fires a fresh callback, so a sentinel that is still
+        // visible after a short page keeps loading until the view is filled.
+        if (pager.observer && pager.sentinel) {
+            pager.observer.unobserve(pager.sentinel);
+            if (!pager.done && pagers[pager.name] === pager) pager.observer.observe(pager.sentinel);
+        }
+    }
+}
+
+function findPagedItem(names, id) {
+    for (const name of [].concat(names)) {
+        const item = pagers[name]?.items.find((entry) => entry.id === Number(id));
+        if (item) return item;
+    }
+    return null;
+}
+
+// ------------------------ Synced Lists ------------------------
+// Whole-list endpoints are kept in a local store per URL. After the first
+// fetch only rows changed or deleted since the last sync token are requested
+// and merged in; a `reset` answer falls back to a full reload.
+const syncedLists = {};
+
+function byField(field) {
+    return (a, b) => String(a[field] ?? "").localeCompare(String(b[field] ?? ""));
+}
+
+async function syncList(endpoint, compare) {
+    let store = syncedLists[endpoint];
+    if (store) {
+        const join = endpoint.includes("?") ? "&" : "?";
+        const delta = await apiCall(`${endpoint}${join}since=${encodeURIComponent(store.token)}`);
+        if (delta.reset) {
+            store = null;
+        } else {
+            delta.deleted.forEach((id) => store.rows.delete(id));
+            delta.items.forEach((row) => store.rows.set(row.id, row));
+            store.token = delta.synced_at;
+        }
+    }
+    if (!store) {
+        const { body, headers } = await apiRequest(endpoint);
+        store = { token: headers.get("X-Sync-Token"), rows: new Map(body.map((row) => [row.id, row])) };
+        if (store.token) syncedLists[endpoint] = store;
+    }
+    const rows = Array.from(store.rows.values());
+    return compare ? rows.sort(compare) : rows;
+}
+
+async function findSyncedItem(endpoint, id) {
+    for (const [key, store] of Object.entries(syncedLists)) {
+        if ((key === endpoint || key.startsWith(`${endpoint}?`)) && store.rows.has(Number(id))) {
+            return store.rows.get(Number(id));
+        }
+    }
+    return (await syncList(endpoint)).find((row) => row.id === Number(id)) || null;
 }
 
 function showToast(message, type = "info") {
@@ -116,7 +256,7 @@ function openModal(title, innerHtml, onSubmit) {
     form.innerHTML = innerHtml;
     overlay.classList.remove("hidden");
 
-    adminState.modalContext = { onSubmit };
+    adminState.modalContext = { onSubmit, idempotencyKey: newIdempotencyKey() };
 }
 
 function handleModalSubmit(event) {
@@ -137,7 +277,7 @@ async function loadFeesData() {
     try {
         const filter = document.getElementById("fees-filter").value;
         const query = filter ? `?category=${encodeURIComponent(filter)}` : "";
-        const data = await apiCall(`/fees${query}`);
+        const data = await syncList(`/fees${query}`, byField("category"));
 
         const tbody = document.getElementById("fees-table");
         tbody.innerHTML = "";
@@ -226,8 +366,7 @@ function addFees() {
 
 async function editFees(id) {
     try {
-        const all = await apiCall("/fees", "GET");
-        const fee = all.find((f) => f.id === Number(id));
+        const fee = await findSyncedItem("/fees", id);
         if (!fee) return;
         openModal("Edit Fees Structure", buildFeesForm(fee), async (payload) => {
             const numericFields = [
@@ -275,8 +414,10 @@ async function loadDocuments() {
     const type = activeTab ? activeTab.dataset.docTab : "12th";
 
     try {
-        const docs = await apiCall(`/documents?type=${encodeURIComponent(type)}`);
-        docs.sort((a, b) => (a.display_order || 0) - (b.display_order || 0));
+        const docs = await syncList(
+            `/documents?type=${encodeURIComponent(type)}`,
+            (a, b) => (a.display_order || 0) - (b.display_order || 0)
+        );
 
         docs.forEach((doc) => {
             const row = document.createElement("div");
@@ -300,6 +441,43 @@ async function loadDocuments() {
     }
 }
 
+function attachDocumentReordering() {
+    const container = document.getElementById("documents-list");
+    if (!container) return;
+    let dragged = null;
+
+    container.addEventListener("dragstart", (event) => {
+        dragged = event.target.closest?.(".document-item");
+        dragged?.classList.add("dragging");
+    });
+    container.addEventListener("dragover", (event) => {
+        if (!dragged) return;
+        event.preventDefault();
+        const target = event.target.closest?.(".document-item");
+        if (!target || target === dragged) return;
+        const { top, height } = target.getBoundingClientRect();
+        target[event.clientY > top + height / 2 ? "after" : "before"](dragged);
+    });
+    container.addEventListener("dragend", async () => {
+        if (!dragged) return;
+        dragged.classList.remove("dragging");
+        dragged = null;
+        const operations = Array.from(container.querySelectorAll(".document-item")).map((row, index) => ({
+            resource: "documents",
+            action: "update",
+            id: Number(row.dataset.id),
+            data: { display_order: index + 1 },
+        }));
+        try {
+            await apiCall("/batch", "POST", { operations });
+            showToast("Document order saved.", "success");
+        } catch (err) {
+            showToast(err.message, "error");
+            loadDocuments();
+        }
+    });
+}
+
 function buildDocumentForm(data = {}, type = "12th") {
     return `
         <div class="form-grid">
@@ -345,8 +523,7 @@ function addDocument() {
 
 async function editDocument(id) {
     try {
-        const all = await apiCall("/documents", "GET");
-        const doc = all.find((d) => d.id === Number(id));
+        const doc = await findSyncedItem("/documents", id);
         if (!doc) return;
         openModal("Edit Admission Document", buildDocumentForm(doc, doc.admission_type), async (payload) => {
             payload.display_order = parseInt(payload.display_order || 0, 10);
@@ -392,7 +569,7 @@ async function loadLibrary() {
 
 async function loadLibraryBooks() {
     try {
-        const books = await apiCall("/library/books");
+        const books = await syncList("/library/books", byField("category"));
         const tbody = document.getElementById("library-books-table");
         tbody.innerHTML = "";
         books.forEach((book) => {
@@ -460,8 +637,7 @@ function addLibraryBook() {
 
 async function editLibraryBook(id) {
     try {
-        const books = await apiCall("/library/books", "GET");
-        const book = books.find((b) => b.id === Number(id));
+        const book = await findSyncedItem("/library/books", id);
         if (!book) return;
         openModal(
             "Edit Library Category",
@@ -526,7 +702,7 @@ async function saveLibraryTimings(event) {
 // ------------------------ Hostel ------------------------
 async function loadHostel() {
     try {
-        const data = await apiCall("/hostel", "GET");
+        const data = await syncList("/hostel", byField("facility_name"));
         const container = document.getElementById("hostel-list");
         container.innerHTML = "";
         data.forEach((item) => {
@@ -548,8 +724,7 @@ async function loadHostel() {
 
 async function editHostel(id) {
     try {
-        const all = await apiCall("/hostel", "GET");
-        const item = all.find((h) => h.id === Number(id));
+        const item = await findSyncedItem("/hostel", id);
         if (!item) return;
         openModal(
             "Edit Hostel Facility",
@@ -596,7 +771,7 @@ async function loadScholarships() {
     try {
         const filter = document.getElementById("scholarship-filter").value;
         const query = filter ? `?category=${encodeURIComponent(filter)}` : "";
-        const data = await apiCall(`/scholarships${query}`);
+        const data = await syncList(`/scholarships${query}`, byField("scholarship_name"));
         const tbody = document.getElementById("scholarship-table");
         tbody.innerHTML = "";
         data.forEach((item) => {
@@ -660,8 +835,7 @@ function addScholarship() {
 
 async function editScholarship(id) {
     try {
-        const all = await apiCall("/scholarships", "GET");
-        const item = all.find((s) => s.id === Number(id));
+        const item = await findSyncedItem("/scholarships", id);
         if (!item) return;
         openModal("Edit Scholarship", buildScholarshipForm(item), async (payload) => {
             payload.is_active = !!payload.is_active;
@@ -692,11 +866,14 @@ async function deleteScholarship(id) {
 
 // ------------------------ Faculty ------------------------
 async function loadFaculty() {
-    try {
-        const data = await apiCall("/faculty", "GET");
-        const tbody = document.getElementById("faculty-table");
-        tbody.innerHTML = "";
-        data.forEach((member) => {
+    const tbody = document.getElementById("faculty-table");
+    await createPager("faculty", {
+        endpoint: "/faculty",
+        anchor: "faculty-table",
+        reset: () => {
+            tbody.innerHTML = "";
+        },
+        render: (items) => items.forEach((member) => {
             const tr = document.createElement("tr");
             tr.innerHTML = `
                 <td>${member.name}</td>
@@ -709,10 +886,8 @@ async function loadFaculty() {
                 </td>
             `;
             tbody.appendChild(tr);
-        });
-    } catch (err) {
-        showToast(err.message, "error");
-    }
+        }),
+    });
 }
 
 function buildFacultyForm(data = {}) {
@@ -759,8 +934,7 @@ function addFaculty() {
 
 async function editFaculty(id) {
     try {
-        const all = await apiCall("/faculty", "GET");
-        const item = all.find((f) => f.id === Number(id));
+        const item = findPagedItem("faculty", id);
         if (!item) return;
         openModal("Edit Faculty", buildFacultyForm(item), async (payload) => {
             try {
@@ -866,69 +1040,36 @@ function renderEventColumn(containerId, events, emptyMessage) {
     events.forEach((event) => container.appendChild(createEventListItem(event)));
 }
 
-async function loadEvents() {
-    try {
-        const filter = document.getElementById("events-filter").value;
-        const query = filter ? `?type=${encodeURIComponent(filter)}` : "";
-        const data = await apiCall(`/events${query}`);
-        const dashboardList = document.getElementById("upcoming-events");
-        if (dashboardList) {
-            dashboardList.innerHTML = "";
-        }
+const EVENT_COLUMNS = [
+    { name: "events-upcoming", range: () => ({ date_from: localDateString(1) }), empty: "No upcoming events scheduled." },
+    { name: "events-current", range: () => ({ date_from: localDateString(0), date_to: localDateString(0) }), empty: "No events happening today." },
+    { name: "events-past", range: () => ({ date_to: localDateString(-1) }), empty: "No previous events recorded." },
+];
 
-        const sorted = [...data].sort((a, b) => {
-            const dateA = normalizeDateValue(a.event_date) || 0;
-            const dateB = normalizeDateValue(b.event_date) || 0;
-            return dateA - dateB;
-        });
-
-        const today = normalizeDateValue(new Date());
-        const upcoming = [];
-        const current = [];
-        const past = [];
-
-        sorted.forEach((event) => {
-            const eventDate = normalizeDateValue(event.event_date);
-            if (!eventDate || !today) {
-                past.push(event);
-                return;
-            }
-            if (eventDate.getTime() === today.getTime()) {
-                current.push(event);
-            } else if (eventDate > today) {
-                upcoming.push(event);
-            } else {
-                past.push(event);
-            }
-        });
-
-        renderEventColumn("events-upcoming", upcoming, "No upcoming events scheduled.");
-        renderEventColumn("events-current", current, "No events happening today.");
-        renderEventColumn("events-past", past, "No previous events recorded.");
-
-        const setCount = (id, value) => {
-            const el = document.getElementById(id);
-            if (el) el.textContent = value;
-        };
-        setCount("events-upcoming-count", upcoming.length);
-        setCount("events-current-count", current.length);
-        setCount("events-past-count", past.length);
-
-        if (dashboardList) {
-            upcoming.slice(0, 4).forEach((event) => {
-                const li = document.createElement("li");
-                li.innerHTML = `<strong>${event.event_name}</strong> (${event.event_type}) - ${formatEventDate(event.event_date)}`;
-                dashboardList.appendChild(li);
+async function loadEvents() {
+    const filter = document.getElementById("events-filter").value;
+
+    await Promise.all(
+        EVENT_COLUMNS.map((column) => {
+            const container = document.getElementById(column.name);
+            return createPager(column.name, {
+                endpoint: "/events",
+                params: { type: filter, ...column.range() },
+                anchor: column.name,
+                reset: () => {
+                    if (container) container.innerHTML = "";
+                },
+                render: (items, page) => {
+                    if (page.total !== undefined) {
+                        const count = document.getElementById(`${column.name}-count`);
+                        if (count) count.textContent = page.total;
+                        if (!page.total) renderEventColumn(column.name, [], column.empty);
+                    }
+                    items.forEach((event) => container?.appendChild(createEventListItem(event)));
+                },
             });
-        }
-
-        const statEvents = document.getElementById("stat-events");
-        if (statEvents) {
-            statEvents.textContent = upcoming.length;
-        }
-    } catch (err) {
-        showToast(err.message, "error");
-    }
+        })
+    );
 }
 
 function buildEventForm(data = {}) {
@@ -970,8 +1111,7 @@ function addEvent() {
 
 async function editEvent(id) {
     try {
-        const all = await apiCall("/events", "GET");
-        const event = all.find((e) => e.id === Number(id));
+        const event = findPagedItem(EVENT_COLUMNS.map((column) => column.name), id);
         if (!event) return;
         openModal("Edit Event", buildEventForm(event), async (payload) => {
             payload.is_active = !!payload.is_active;
@@ -1030,35 +1170,36 @@ async function saveCollegeTimings(event) {
 }
 
 // ------------------------ Student Fees ------------------------
-async function loadStudentFees() {
-    try {
-        const data = await apiCall("/student-fees", "GET");
-        const tbody = document.getElementById("student-fees-table");
-        tbody.innerHTML = "";
-        let totalCollected = 0;
-        data.forEach((record) => {
-            totalCollected += Number(record.paid_amount || 0);
-            const tr = document.createElement("tr");
-            tr.innerHTML = `
-                <td>${record.student_name}</td>
-                <td>${record.student_id}</td>
-                <td>${record.category}</td>
-                <td>₹${record.total_fees.toFixed(2)}</td>
-                <td>₹${record.paid_amount.toFixed(2)}</td>
-                <td>₹${record.remaining_amount.toFixed(2)}</td>
-                <td>${record.semester}</td>
-                <td>
-                    <button class="ghost-btn" data-action="edit-student-fee" data-id="${record.id}">Edit</button>
-                    <button class="ghost-btn" data-action="delete-student-fee" data-id="${record.id}">Delete</button>
-                </td>
-            `;
-            tbody.appendChild(tr);
-        });
-        document.getElementById("stat-fees").textContent = `₹${totalCollected.toFixed(2)}`;
-        document.getElementById("stat-students").textContent = data.length;
-    } catch (err) {
-        showToast(err.message, "error");
-    }
+function renderStudentFeeRow(record) {
+    const tr = document.createElement("tr");
+    tr.innerHTML = `
+        <td>${record.student_name}</td>
+        <td>${record.student_id}</td>
+        <td>${record.category}</td>
+        <td>₹${record.total_fees.toFixed(2)}</td>
+        <td>₹${record.paid_amount.toFixed(2)}</td>
+        <td>₹${(record.balance_after ?? record.remaining_amount).toFixed(2)}</td>
+        <td>${record.semester}</td>
+        <td>
+            <button class="ghost-btn" data-action="edit-student-fee" data-id="${record.id}">Edit</button>
+            <button class="ghost-btn" data-action="delete-student-fee" data-id="${record.id}">Delete</button>
+        </td>
+    `;
+    return tr;
+}
+
+async function loadStudentFees(studentId = "") {
+    const tbody = document.getElementById("student-fees-table");
+    renderLedgerSummary(null);
+    await createPager("student-fees", {
+        endpoint: "/student-fees",
+        params: { student_id: studentId },
+        anchor: "student-fees-table",
+        reset: () => {
+            tbody.innerHTML = "";
+        },
+        render: (items) => items.forEach((record) => tbody.appendChild(renderStudentFeeRow(record))),
+    });
 }
 
 function buildStudentFeeForm(data = {}) {
@@ -1121,8 +1262,7 @@ function addStudentFee() {
 
 async function editStudentFee(id) {
     try {
-        const all = await apiCall("/student-fees", "GET");
-        const record = all.find((r) => r.id === Number(id));
+        const record = findPagedItem("student-fees", id);
         if (!record) return;
         openModal("Edit Student Payment", buildStudentFeeForm(record), async (payload) => {
             const numericFields = ["total_fees", "paid_amount", "remaining_amount"];
@@ -1157,103 +1297,231 @@ async function deleteStudentFee(id) {
     }
 }
 
-async function searchStudentById(event) {
-    const value = event.target.value.trim();
-    if (!value) {
+async function importStudentFees(event) {
+    const input = event.target;
+    const file = input.files?.[0];
+    if (!file) return;
+    const body = new FormData();
+    body.append("file", file);
+    try {
+        const res = await fetch(`${ADMIN_API}/student-fees/import`, {
+            method: "POST",
+            body,
+            credentials: "include",
+            headers: { "Idempotency-Key": newIdempotencyKey() },
+        });
+        const report = await res.json();
+        if (!res.ok) throw new Error(report.error || `Import failed (${res.status})`);
+        const firstError = report.errors[0] ? ` First error on line ${report.errors[0].line}: ${report.errors[0].error}` : "";
+        showToast(
+            `Imported ${report.imported} of ${report.processed} rows.${firstError}`,
+            report.failed ? "error" : "success"
+        );
         loadStudentFees();
+    } catch (err) {
+        showToast(err.message, "error");
+    } finally {
+        input.value = "";
+    }
+}
+
+function renderLedgerSummary(ledger) {
+    const summary = document.getElementById("student-ledger-summary");
+    if (!summary) return;
+    summary.hidden = !ledger;
+    if (!ledger) {
+        summary.innerHTML = "";
         return;
     }
+    const balance = ledger.balance;
+    const semesters = ledger.semesters
+        .map((item) => `<li>Semester ${item.semester}: paid ${formatAmount(item.paid)} of ${formatAmount(item.due)} (balance ${formatAmount(item.balance)})</li>`)
+        .join("");
+    summary.innerHTML = balance
+        ? `
+            <h4>${balance.student_name} (${balance.student_id})</h4>
+            <p>Paid ${formatAmount(balance.total_paid)} of ${formatAmount(balance.total_due)} in ${balance.payment_count} payment(s). Balance: <strong>${formatAmount(balance.balance)}</strong></p>
+            <ul class="simple-list">${semesters}</ul>
+        `
+        : `<p>No payments found for ${ledger.student_id}.</p>`;
+}
+
+async function loadStudentLedger(studentId) {
+    if (!studentId) {
+        loadStudentFees();
+        return;
+    }
+    const tbody = document.getElementById("student-fees-table");
     try {
-        const data = await apiCall(`/student-fees/search?student_id=${encodeURIComponent(value)}`);
-        const tbody = document.getElementById("student-fees-table");
+        const ledger = await apiCall(`/student-fees/ledger${buildQuery({ student_id: studentId })}`);
+        const current = document.getElementById("student-search")?.value.trim();
+        if (current !== studentId) return;
+        const previous = pagers["student-fees"];
+        previous?.observer?.disconnect();
+        previous?.sentinel?.remove();
+        pagers["student-fees"] = { name: "student-fees", items: ledger.entries, done: true };
         tbody.innerHTML = "";
-        if (!data || !data.id) return;
-        const tr = document.createElement("tr");
-        tr.innerHTML = `
-            <td>${data.student_name}</td>
-            <td>${data.student_id}</td>
-            <td>${data.category}</td>
-            <td>₹${data.total_fees.toFixed(2)}</td>
-            <td>₹${data.paid_amount.toFixed(2)}</td>
-            <td>₹${data.remaining_amount.toFixed(2)}</td>
-            <td>${data.semester}</td>
-            <td>
-                <button class="ghost-btn" data-action="edit-student-fee" data-id="${data.id}">Edit</button>
-                <button class="ghost-btn" data-action="delete-student-fee" data-id="${data.id}">Delete</button>
-            </td>
-        `;
-        tbody.appendChild(tr);
+        ledger.entries.forEach((record) => tbody.appendChild(renderStudentFeeRow(record)));
+        renderLedgerSummary(ledger);
     } catch (err) {
         showToast(err.message, "error");
     }
 }
 
+async function searchStudentById(event) {
+    loadStudentLedger(event.target.value.trim());
+}
+
 // ------------------------ Help Tickets ------------------------
-async function loadTickets() {
-    try {
-        const filter = document.getElementById("tickets-filter").value;
-        const query = filter ? `?status=${encodeURIComponent(filter)}` : "";
-        const data = await apiCall(`/tickets${query}`, "GET");
-        const tbody = document.getElementById("tickets-table");
-        const pendingList = document.getElementById("pending-tickets");
-        tbody.innerHTML = "";
-        pendingList.innerHTML = "";
+// Page count, snippet and thumbnail are filled in by the server shortly after
+// the ticket is created; until then only the file name is shown.
+function renderTicketAttachment(ticket) {
+    if (!ticket.pdf_filename) return "-";
+    const thumbnail = ticket.pdf_thumbnail
+        ? `<img class="ticket-thumbnail" src="${ADMIN_API}/tickets/${ticket.id}/thumbnail" alt="First page" loading="lazy" />`
+        : "";
+    const pages = ticket.pdf_page_count ? `${ticket.pdf_page_count} page${ticket.pdf_page_count === 1 ? "" : "s"}` : "";
+    return `
+        <div class="ticket-attachment">
+            ${thumbnail}
+            <div>
+                <strong>${ticket.pdf_original_name || "PDF"}</strong>
+                ${pages ? `<small>${pages}</small>` : ""}
+                ${ticket.pdf_snippet ? `<p class="ticket-snippet">${ticket.pdf_snippet}</p>` : ""}
+            </div>
+        </div>
+    `;
+}
 
-        let openCount = 0;
-        data.forEach((ticket) => {
-            if (ticket.status === "Open") openCount += 1;
-            const tr = document.createElement("tr");
-            const pdfButton = ticket.pdf_filename 
-                ? `<button class="ghost-btn" data-action="download-pdf" data-id="${ticket.id}">Download PDF</button>`
-                : '';
-            tr.innerHTML = `
-                <td>${ticket.student_name}</td>
-                <td>${ticket.contact}</td>
-                <td>${ticket.topic || "-"}</td>
-                <td>${ticket.query}</td>
-                <td>
-                    <select data-action="change-ticket-status" data-id="${ticket.id}">
-                        <option value="Open" ${ticket.status === "Open" ? "selected" : ""}>Open</option>
-                        <option value="In Progress" ${ticket.status === "In Progress" ? "selected" : ""}>In Progress</option>
-                        <option value="Resolved" ${ticket.status === "Resolved" ? "selected" : ""}>Resolved</option>
-                    </select>
-                </td>
-                <td>${ticket.created_at ? new Date(ticket.created_at).toLocaleString() : "-"}</td>
-                <td>
-                    <button class="ghost-btn" data-action="view-ticket" data-id="${ticket.id}">View</button>
-                    ${pdfButton}
-                </td>
-            `;
-            tbody.appendChild(tr);
+function renderTicketRow(ticket) {
+    const tr = document.createElement("tr");
+    tr.dataset.id = ticket.id;
+    const pdfButton = ticket.pdf_filename 
+        ? `<button class="ghost-btn" data-action="download-pdf" data-id="${ticket.id}">Download PDF</button>`
+        : '';
+    tr.innerHTML = `
+        <td>${ticket.student_name}</td>
+        <td>${ticket.contact}</td>
+        <td>${ticket.topic || "-"}</td>
+        <td>${ticket.query}</td>
+        <td>${renderTicketAttachment(ticket)}</td>
+        <td>
+            <select data-action="change-ticket-status" data-id="${ticket.id}">
+                <option value="Open" ${ticket.status === "Open" ? "selected" : ""}>Open</option>
+                <option value="In Progress" ${ticket.status === "In Progress" ? "selected" : ""}>In Progress</option>
+                <option value="Resolved" ${ticket.status === "Resolved" ? "selected" : ""}>Resolved</option>
+            </select>
+        </td>
+        <td>${ticket.created_at ? new Date(ticket.created_at).toLocaleString() : "-"}</td>
+        <td>
+            <button class="ghost-btn" data-action="view-ticket" data-id="${ticket.id}">View</button>
+            ${pdfButton}
+        </td>
+    `;
+    return tr;
+}
 
-            if (ticket.status !== "Resolved") {
-                const li = document.createElement("li");
-                li.textContent = `${ticket.student_name} - ${ticket.query}`;
-                pendingList.appendChild(li);
-            }
-        });
-        document.getElementById("stat-tickets").textContent = openCount;
+// Tickets acknowledged by the write-behind queue but not yet in the database.
+async function loadTicketQueue() {
+    const badge = document.getElementById("tickets-queue");
+    if (!badge) return;
+    try {
+        const queue = await apiCall("/tickets/queue");
+        badge.hidden = !queue.enabled || !queue.depth;
+        badge.textContent = `${queue.depth} queued${queue.retrying ? ` (${queue.retrying} retrying)` : ""}`;
+        badge.title = queue.last_error || "";
     } catch (err) {
-        showToast(err.message, "error");
+        badge.hidden = true;
     }
 }
 
+async function loadTickets() {
+    loadTicketQueue();
+    const filter = document.getElementById("tickets-filter").value;
+    const tbody = document.getElementById("tickets-table");
+    await createPager("tickets", {
+        endpoint: "/tickets",
+        params: { status: filter },
+        anchor: "tickets-table",
+        reset: () => {
+            tbody.innerHTML = "";
+        },
+        render: (items) => items.forEach((ticket) => tbody.appendChild(renderTicketRow(ticket))),
+    });
+}
+
 async function changeTicketStatus(id, status) {
     try {
         await apiCall(`/tickets/${id}/status`, "PUT", { status });
-        loadTickets();
+        // With the live feed connected the row is updated by its status event.
+        if (ticketFeed?.readyState !== EventSource.OPEN) loadTickets();
     } catch (err) {
         showToast(err.message, "error");
     }
 }
 
+// ------------------------ Live Ticket Feed ------------------------
+// Ticket creates and status changes are pushed over server-sent events; the
+// browser reconnects on its own and resumes from the last event id it saw.
+// Events can arrive out of id order or twice, so each ticket remembers the
+// last event applied to it.
+const TICKET_FEED_RETRY_MS = 30000;
+let ticketFeed = null;
+const ticketEventIds = new Map();
+
+function startTicketFeed() {
+    if (ticketFeed || !("EventSource" in window)) return;
+    ticketFeed = new EventSource(`${ADMIN_API}/tickets/stream`, { withCredentials: true });
+    ["ticket.created", "ticket.status", "ticket.updated"].forEach((type) =>
+        ticketFeed.addEventListener(type, (event) => applyTicketEvent(JSON.parse(event.data)))
+    );
+    ticketFeed.addEventListener("reset", () => {
+        if (pagers.tickets) loadTickets();
+    });
+    const feed = ticketFeed;
+    feed.addEventListener("error", () => {
+        // A refused stream (503, server busy) is not retried by the browser.
+        if (feed.readyState !== EventSource.CLOSED || ticketFeed !== feed) return;
+        ticketFeed = null;
+        setTimeout(startTicketFeed, TICKET_FEED_RETRY_MS);
+    });
+}
+
+function applyTicketEvent({ event_id, type, ticket }) {
+    if (event_id <= (ticketEventIds.get(ticket.id) || 0)) return;
+    ticketEventIds.set(ticket.id, event_id);
+    const pager = pagers.tickets;
+    const tbody = document.getElementById("tickets-table");
+    if (!pager || !tbody) return;
+
+    const filter = pager.params.status;
+    const matches = !filter || (ticket.status || "").toLowerCase() === filter.toLowerCase();
+    const index = pager.items.findIndex((item) => item.id === ticket.id);
+    const row = tbody.querySelector(`tr[data-id="${ticket.id}"]`);
+
+    if (!matches) {
+        if (index >= 0) pager.items.splice(index, 1);
+        row?.remove();
+        return;
+    }
+    if (index >= 0) {
+        pager.items[index] = ticket;
+        row?.replaceWith(renderTicketRow(ticket));
+    } else if (type === "created" || filter) {
+        // Newest first: a new ticket, or one that now matches the filter, goes on top.
+        pager.items.unshift(ticket);
+        tbody.prepend(renderTicketRow(ticket));
+    }
+    if (type === "created") showToast(`New ticket from ${ticket.student_name}.`, "info");
+}
+
 async function viewTicket(id) {
     try {
-        const all = await apiCall("/tickets", "GET");
-        const ticket = all.find((t) => t.id === Number(id));
+        const ticket = findPagedItem("tickets", id);
         if (!ticket) return;
         const pdfSection = ticket.pdf_filename 
-            ? `<p><strong>PDF Attachment:</strong> <a href="/api/admin/tickets/${ticket.id}/pdf" target="_blank" style="color: #00D26A; text-decoration: underline;">Download PDF</a></p>`
+            ? `<p><strong>PDF Attachment:</strong> <a href="/api/admin/tickets/${ticket.id}/pdf" target="_blank" style="color: #00D26A; text-decoration: underline;">Download PDF</a></p>
+               ${renderTicketAttachment(ticket)}`
             : '<p><strong>PDF Attachment:</strong> None</p>';
         openModal(
             "Ticket Details",
@@ -1286,14 +1554,149 @@ async function downloadTicketPdf(id) {
     }
 }
 
+// ------------------------ Export ------------------------
+const EXPORT_FILTERS = {
+    payments: () => ({ student_id: document.getElementById("student-search")?.value.trim() }),
+    tickets: () => ({ status: document.getElementById("tickets-filter")?.value }),
+};
+
+function exportRecords(name) {
+    const params = { format: "csv", ...(EXPORT_FILTERS[name]?.() || {}) };
+    window.location.href = `${ADMIN_API}/export/${name}${buildQuery(params)}`;
+}
+
+// ------------------------ Search ------------------------
+function renderSearchResult(item) {
+    const li = document.createElement("li");
+    const record = item.record;
+    if (item.type === "payments") {
+        li.innerHTML = `
+            <strong>${record.student_name}</strong> (${record.student_id}) - Receipt ${record.receipt_number}, Semester ${record.semester}, paid ${formatAmount(record.paid_amount)}
+            <button type="button" class="ghost-btn" data-action="open-ledger" data-id="${record.student_id}">Ledger</button>
+        `;
+    } else if (item.type === "attachments") {
+        const tickets = record.ticket_ids.map((id) => `#${id}`).join(", ") || "archived tickets";
+        li.innerHTML = `<strong>PDF</strong> (${tickets}) - ${record.snippet}`;
+    } else {
+        li.innerHTML = `<strong>${record.student_name}</strong> [${record.status}] - ${record.query}`;
+    }
+    return li;
+}
+
+async function runGlobalSearch() {
+    const q = document.getElementById("global-search")?.value.trim();
+    if (!q) return;
+    openModal(
+        `Search: ${q}`,
+        `
+        <ul id="search-results" class="simple-list"></ul>
+        <button type="button" class="ghost-btn" id="search-more" hidden>Load more</button>
+        `,
+        () => {}
+    );
+    const list = document.getElementById("search-results");
+    const more = document.getElementById("search-more");
+    let cursor = null;
+    const loadPage = async () => {
+        try {
+            const data = await apiCall(`/search${buildQuery({ q, limit: 20, cursor })}`);
+            if (!cursor && !data.items.length) list.innerHTML = "<li>No matches found.</li>";
+            data.items.forEach((item) => list.appendChild(renderSearchResult(item)));
+            cursor = data.next_cursor;
+            more.hidden = !cursor;
+        } catch (err) {
+            showToast(err.message, "error");
+        }
+    };
+    more.addEventListener("click", loadPage);
+    await loadPage();
+}
+
+function openLedger(studentId) {
+    hideModal();
+    switchSection("student-fees");
+    const input = document.getElementById("student-search");
+    if (input) input.value = studentId;
+    loadStudentLedger(studentId);
+}
+
 // ------------------------ Dashboard Init ------------------------
+const TICKET_AGE_LABELS = {
+    under_1_day: "Under 1 day",
+    "1_to_7_days": "1 - 7 days",
+    "7_to_30_days": "7 - 30 days",
+    over_30_days: "Over 30 days",
+};
+
+function renderFeeBreakdown() {
+    const tbody = document.getElementById("fee-breakdown-table");
+    const dimension = document.getElementById("fee-breakdown-filter")?.value || "by_category";
+    const rows = adminState.dashboard?.fees?.[dimension] || [];
+    if (!tbody) return;
+    tbody.innerHTML = "";
+    rows.forEach((row) => {
+        const tr = document.createElement("tr");
+        tr.innerHTML = `
+            <td>${row.value ?? "-"}</td>
+            <td>${row.payments}</td>
+            <td>${formatAmount(row.collected)}</td>
+            <td>${formatAmount(row.outstanding)}</td>
+        `;
+        tbody.appendChild(tr);
+    });
+}
+
 async function loadDashboard() {
-    await Promise.all([loadStudentFees(), loadTickets(), loadEvents()]);
+    try {
+        const data = await apiCall("/dashboard");
+        adminState.dashboard = data;
+
+        document.getElementById("stat-students").textContent = data.fees.students;
+        document.getElementById("stat-fees").textContent = formatAmount(data.fees.collected);
+        document.getElementById("stat-outstanding").textContent = formatAmount(data.fees.outstanding);
+        document.getElementById("stat-tickets").textContent = data.tickets.open;
+        document.getElementById("stat-events").textContent = data.events.upcoming;
+
+        const pendingList = document.getElementById("pending-tickets");
+        pendingList.innerHTML = "";
+        data.tickets.pending.forEach((ticket) => {
+            const li = document.createElement("li");
+            li.textContent = `${ticket.student_name} - ${ticket.query}`;
+            pendingList.appendChild(li);
+        });
+
+        const upcomingList = document.getElementById("upcoming-events");
+        upcomingList.innerHTML = "";
+        data.events.next.forEach((event) => {
+            const li = document.createElement("li");
+            li.innerHTML = `<strong>${event.event_name}</strong> (${event.event_type}) - ${formatEventDate(event.event_date)}`;
+            upcomingList.appendChild(li);
+        });
+
+        const ageList = document.getElementById("ticket-age");
+        ageList.innerHTML = "";
+        Object.entries(data.tickets.open_by_age).forEach(([bucket, count]) => {
+            const li = document.createElement("li");
+            li.textContent = `${TICKET_AGE_LABELS[bucket] || bucket}: ${count}`;
+            ageList.appendChild(li);
+        });
+        const resolved = document.createElement("li");
+        resolved.textContent = `Resolved: ${data.tickets.resolved}`;
+        ageList.appendChild(resolved);
+
+        renderFeeBreakdown();
+    } catch (err) {
+        showToast(err.message, "error");
+    }
 }
 
 function attachEventListeners() {
     document.getElementById("logout-btn")?.addEventListener("click", handleLogout);
     document.getElementById("menu-toggle")?.addEventListener("click", toggleSidebar);
+    attachDocumentReordering();
+    document.getElementById("global-search")?.addEventListener("keydown", (event) => {
+        if (event.key === "Enter") runGlobalSearch();
+    });
 
     document.querySelectorAll(".nav-link").forEach((btn) => {
         btn.addEventListener("click", () => {
@@ -1319,6 +1722,7 @@ function attachEventListeners() {
         .getElementById("scholarship-filter")
         ?.addEventListener("change", loadScholarships);
     document.getElementById("events-filter")?.addEventListener("change", loadEvents);
+    document.getElementById("fee-breakdown-filter")?.addEventListener("change", renderFeeBreakdown);
     document.getElementById("tickets-filter")?.addEventListener("change", loadTickets);
     document
         .getElementById("library-timings-form")
@@ -1332,6 +1736,7 @@ function attachEventListeners() {
     document
         .getElementById("student-search")
         ?.addEventListener("input", searchStudentById);
+    document.getElementById("student-fee-import")?.addEventListener("change", importStudentFees);
 
     // Tabs for documents
     document.querySelectorAll("[data-doc-tab]").forEach((tab) => {
@@ -1388,6 +1793,9 @@ function attachEventListeners() {
         if (action === "edit-student-fee") editStudentFee(id);
         if (action === "delete-student-fee") deleteStudentFee(id);
 
+        if (action === "open-ledger") openLedger(id);
+        if (action === "export") exportRecords(id);
+
         if (action === "view-ticket") viewTicket(id);
         if (action === "download-pdf") downloadTicketPdf(id);
     });
@@ -1414,6 +1822,7 @@ function attachEventListeners() {
 async function initAdmin() {
     await checkAuth();
     attachEventListeners();
+    startTicketFeed();
     switchSection("dashboard");
     loadDashboard();
 }
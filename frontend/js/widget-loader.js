@@ -0,0 +1,74 @@
+// Chatbot Widget Loader
+// Renders only the launcher button and pulls in widget.js on first interaction
+// (or once the page is idle). Keep this file small: scripts/check_loader_size.py
+// enforces its size budget.
+(function () {
+    var w = window;
+    var d = document;
+    if (w.__chatbotLoader) return;
+
+    var script = d.currentScript;
+    var attr = function (name, fallback) {
+        return (script && script.getAttribute('data-' + name)) || fallback;
+    };
+    var apiBase = attr('api-base', '');
+    var bundleSrc = attr('src', script ? script.src.replace(/widget-loader(\.min)?\.js/, 'widget.js') : 'js/widget.js');
+    var color = attr('color', '#00D26A');
+    var loader = (w.__chatbotLoader = { prefetch: {}, openOnReady: false, loaded: false });
+    var button;
+
+    if (apiBase) w.__CHATBOT_API_BASE__ = apiBase;
+
+    function prefetch(endpoint) {
+        loader.prefetch[endpoint] = fetch(apiBase + endpoint)
+            .then(function (res) { return res.ok ? res.json() : null; })
+            .catch(function () { return null; });
+    }
+
+    function load(open) {
+        if (open) {
+            loader.openOnReady = true;
+            button.style.opacity = '0.6';
+        }
+        if (loader.loaded) return;
+        loader.loaded = true;
+        // Bootstrap data and the bundle download in parallel.
+        prefetch('/api/chatbot/fees');
+        prefetch('/api/chatbot/scholarships');
+        var tag = d.createElement('script');
+        tag.src = bundleSrc;
+        tag.async = true;
+        tag.onerror = function () {
+            loader.loaded = false;
+            button.style.opacity = '1';
+        };
+        d.head.appendChild(tag);
+    }
+
+    function mount() {
+        button = d.createElement('button');
+        button.id = 'chatbot-loader-button';
+        button.setAttribute('aria-label', 'Open chat');
+        button.innerHTML =
+            '<svg width="28" height="28" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">' +
+            '<path d="M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z"></path></svg>';
+        button.style.cssText =
+            'position:fixed;bottom:16px;right:24px;width:60px;height:60px;border-radius:50%;border:none;' +
+            'background:' + color + ';color:#fff;cursor:pointer;box-shadow:0 4px 12px rgba(0,0,0,.15);' +
+            'z-index:9999;display:flex;align-items:center;justify-content:center';
+        button.addEventListener('click', function () { load(true); });
+        ['pointerenter', 'focus', 'touchstart'].forEach(function (type) {
+            button.addEventListener(type, function () { load(false); }, { once: true, passive: true });
+        });
+        d.body.appendChild(button);
+
+        var idle = w.requestIdleCallback || function (cb) { return setTimeout(cb, 3000); };
+        idle(function () { load(false); }, { timeout: 5000 });
+    }
+
+    if (d.readyState === 'loading') {
+        d.addEventListener('DOMContentLoaded', mount);
+    } else {
+        mount();
+    }
+})();
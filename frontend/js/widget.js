@@ -126,6 +126,19 @@ class ChatWidget {
         this.attachEventListeners();
         this.loadFeeCategories();
         this.loadScholarshipCategories();
+        this.takeOverFromLoader();
+    }
+
+    takeOverFromLoader() {
+        const loader = window.__chatbotLoader;
+        if (!loader) {
+            return;
+        }
+        document.getElementById('chatbot-loader-button')?.remove();
+        if (loader.openOnReady) {
+            loader.openOnReady = false;
+            this.toggleChat();
+        }
     }
 
     initVoiceRecognition() {
@@ -213,6 +226,17 @@ class ChatWidget {
     }
 
     async fetchChatbotData(endpoint, params = {}) {
+        // Reuse bootstrap data the embed loader already requested in parallel
+        // with this bundle; each prefetched response is consumed once.
+        const prefetched = window.__chatbotLoader?.prefetch?.[endpoint];
+        if (prefetched && !Object.keys(params).length) {
+            delete window.__chatbotLoader.prefetch[endpoint];
+            const data = await prefetched;
+            if (data) {
+                return data;
+            }
+        }
+
         const base = this.getApiBase();
         const url =
             endpoint.startsWith('http://') || endpoint.startsWith('https://')
@@ -970,15 +994,27 @@ class ChatWidget {
                 formData.append('pdf_file', pdfFile);
             }
 
+            // Resending the same ticket (e.g. after a dropped connection) reuses its
+            // Idempotency-Key, so the server returns the ticket it already created.
+            const signature = JSON.stringify([name, contact, query, topic, pdfFile?.name, pdfFile?.size]);
+            if (this.pendingTicket?.signature !== signature) {
+                const key = window.crypto?.randomUUID?.() || `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+                this.pendingTicket = { signature, key };
+            }
+
             const response = await fetch('/api/chatbot/help-ticket', {
                 method: 'POST',
                 body: formData,
+                headers: { 'Idempotency-Key': this.pendingTicket.key },
             });
 
             const data = await response.json();
             if (!response.ok) throw new Error(data.error || 'Unable to submit ticket.');
 
-            this.addMessage(`Thanks ${name}! Your ticket (#${data.ticket.id}) has been created. We'll reach out soon.`, 'bot');
+            // Queued tickets get their number once written; show the intake reference instead.
+            const ticketLabel = data.queued ? `ref ${data.reference.slice(0, 8).toUpperCase()}` : `#${data.ticket.id}`;
+            this.addMessage(`Thanks ${name}! Your ticket (${ticketLabel}) has been created. We'll reach out soon.`, 'bot');
+            this.pendingTicket = null;
             this.hideHelpForm();
             document.getElementById('widget-ticket-form')?.reset();
         } catch (error) {
@@ -0,0 +1,46 @@
+"""
+Move help tickets resolved more than N days ago into `archived_help_tickets`.
+
+Archived tickets are served by /api/admin/tickets/archive and stay searchable
+there; run this from cron to keep the live ticket table small.
+
+    python scripts/archive_tickets.py [--days 90] [--batch-size 500] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from backend.ticket_archive import (  # noqa: E402
+    ARCHIVE_BATCH_SIZE,
+    DEFAULT_ARCHIVE_DAYS,
+    archive_resolved_tickets,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archive resolved help tickets.")
+    parser.add_argument(
+        "--days", type=int, default=DEFAULT_ARCHIVE_DAYS, help="Archive tickets resolved more than this many days ago."
+    )
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Tickets per transaction.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the tickets that would be archived.")
+    args = parser.parse_args()
+
+    from backend.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        report = archive_resolved_tickets(args.days, batch_size=max(1, args.batch_size), dry_run=args.dry_run)
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {report['archived']} ticket(s) resolved before {report['cutoff']}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
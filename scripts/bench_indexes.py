@@ -0,0 +1,179 @@
+"""
+Compare query plans and timings for the admin/chatbot read paths with and
+without the model indexes and normalized `_key` columns.
+
+Builds two SQLite databases with the same synthetic data: one with only
+primary keys (legacy schema, queried with `ilike`), one with the current
+indexes (queried the way the routes do now).
+
+    python scripts/bench_indexes.py --rows 200000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import create_engine, insert, select, text  # noqa: E402
+
+from backend.database import db  # noqa: E402
+from backend.models import Events, HelpTickets, StudentFeesPayment, normalize_key  # noqa: E402
+
+CATEGORIES = ["OPEN", "OBC", "SC", "ST", "EWS", "VJNT", "SBC", "TFWS"]
+STATUSES = ["Open", "In Progress", "Resolved"]
+EVENT_TYPES = ["Cultural", "Sports", "Technical", "Academic"]
+
+
+def _generate(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2019, 6, 1)
+    fees, tickets, events = [], [], []
+    for i in range(rows):
+        category = rng.choice(CATEGORIES)
+        paid = rng.randint(1000, 20000)
+        fees.append(
+            {
+                "student_name": f"Student {i}",
+                "student_id": f"GP{rng.randint(1, rows // 3 + 1):07d}",
+                "admission_year": str(rng.randint(2019, 2025)),
+                "category": category,
+                "category_key": normalize_key(category),
+                "total_fees": 25000.0,
+                "paid_amount": float(paid),
+                "remaining_amount": float(25000 - paid),
+                "payment_date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 6)),
+                "receipt_number": f"R{i:08d}",
+                "semester": str(rng.randint(1, 6)),
+            }
+        )
+        status = rng.choice(STATUSES)
+        tickets.append(
+            {
+                "student_name": f"Student {i}",
+                "contact": "9999999999",
+                "topic": "Fees",
+                "topic_key": "fees",
+                "query": "Need help with my receipt",
+                "status": status,
+                "status_key": normalize_key(status),
+                "created_at": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 6)),
+            }
+        )
+        if i % 20 == 0:
+            event_type = rng.choice(EVENT_TYPES)
+            events.append(
+                {
+                    "event_name": f"Event {i}",
+                    "event_type": event_type,
+                    "event_type_key": normalize_key(event_type),
+                    "event_date": (start + timedelta(days=rng.randint(0, 365 * 6))).date(),
+                }
+            )
+    return fees, tickets, events
+
+
+def _build(path: Path, indexed: bool, data):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if not indexed:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        fees, tickets, events = data
+        conn.execute(insert(StudentFeesPayment.__table__), fees)
+        conn.execute(insert(HelpTickets.__table__), tickets)
+        conn.execute(insert(Events.__table__), events)
+        conn.execute(text("ANALYZE"))
+    return engine
+
+
+def _queries(sample_student: str):
+    today = datetime(2024, 1, 1)
+    legacy = {
+        "fees by student_id": select(StudentFeesPayment).where(
+            StudentFeesPayment.student_id == sample_student
+        ),
+        "fees by category": select(StudentFeesPayment).where(StudentFeesPayment.category.ilike("obc")),
+        "latest fees page": select(StudentFeesPayment)
+        .order_by(StudentFeesPayment.payment_date.desc())
+        .limit(50),
+        "open tickets page": select(HelpTickets)
+        .where(HelpTickets.status.ilike("open"))
+        .order_by(HelpTickets.created_at.desc())
+        .limit(50),
+        "events by type": select(Events).where(Events.event_type.ilike("sports")).order_by(Events.event_date),
+        "upcoming events": select(Events).where(Events.event_date >= today.date()).order_by(Events.event_date),
+    }
+    current = {
+        "fees by student_id": legacy["fees by student_id"],
+        "fees by category": select(StudentFeesPayment).where(StudentFeesPayment.category_key == "obc"),
+        "latest fees page": select(StudentFeesPayment)
+        .order_by(StudentFeesPayment.payment_date.desc(), StudentFeesPayment.id.desc())
+        .limit(50),
+        "open tickets page": select(HelpTickets)
+        .where(HelpTickets.status_key == "open")
+        .order_by(HelpTickets.created_at.desc(), HelpTickets.id.desc())
+        .limit(50),
+        "events by type": select(Events)
+        .where(Events.event_type_key == "sports")
+        .order_by(Events.event_date, Events.id),
+        "upcoming events": select(Events)
+        .where(Events.event_date >= today.date())
+        .order_by(Events.event_date, Events.id),
+    }
+    return legacy, current
+
+
+def _plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+def _time(engine, statement, repeat: int) -> float:
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(statement).fetchall()
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed vs. legacy read paths on synthetic data.")
+    parser.add_argument("--rows", type=int, default=100000, help="Fee payments and tickets to generate.")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per query; the median is reported.")
+    args = parser.parse_args()
+
+    data = _generate(args.rows)
+    sample_student = data[0][len(data[0]) // 2]["student_id"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generating {args.rows} payments/tickets ...")
+        legacy_engine = _build(Path(tmp) / "legacy.db", indexed=False, data=data)
+        indexed_engine = _build(Path(tmp) / "indexed.db", indexed=True, data=data)
+        legacy, current = _queries(sample_student)
+
+        for name in legacy:
+            legacy_ms = _time(legacy_engine, legacy[name], args.repeat)
+            current_ms = _time(indexed_engine, current[name], args.repeat)
+            print(f"\n{name}")
+            print(f"  legacy : {legacy_ms:9.2f} ms  | {_plan(legacy_engine, legacy[name])}")
+            print(f"  indexed: {current_ms:9.2f} ms  | {_plan(indexed_engine, current[name])}")
+
+        legacy_engine.dispose()
+        indexed_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
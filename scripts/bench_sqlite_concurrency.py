@@ -0,0 +1,175 @@
+"""
+Compare SQLite under concurrent chatbot reads and admin writes with the
+tuned profile (WAL, busy timeout, larger cache, mmap) and with the legacy
+defaults (rollback journal, driver defaults).
+
+Each mode gets a fresh database with the same data. Reader threads repeat
+the chatbot's fee and scholarship queries, writer threads insert help
+tickets and update fees, all through one pooled engine like the app's
+request threads.
+
+    python scripts/bench_sqlite_concurrency.py --readers 8 --writers 2 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import create_engine, insert, select, text, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from backend.database import db, engine_options, tune_sqlite_engine  # noqa: E402
+from backend.models import FeesStructure, HelpTickets, Scholarships, normalize_key  # noqa: E402
+
+CATEGORIES = ["OPEN", "OBC", "SC", "ST", "EWS", "VJNT", "SBC", "TFWS"]
+
+
+def _build(path: Path, tuned: bool):
+    url = f"sqlite:///{path}"
+    if tuned:
+        engine = create_engine(url, **engine_options(url))
+        tune_sqlite_engine(engine)
+    else:
+        engine = create_engine(url)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(FeesStructure.__table__),
+            [
+                {"category": category, "category_key": normalize_key(category), "total_fees": 25000.0}
+                for category in CATEGORIES
+            ],
+        )
+        conn.execute(
+            insert(Scholarships.__table__),
+            [
+                {
+                    "scholarship_name": f"Scholarship {i}",
+                    "category": CATEGORIES[i % len(CATEGORIES)],
+                    "amount": "10000",
+                    "eligibility": "Diploma students",
+                    "documents_required": "Income certificate",
+                    "is_active": True,
+                }
+                for i in range(50)
+            ],
+        )
+    return engine
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {"read": [], "write": []}
+        self.errors = {"read": 0, "write": 0}
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self.lock:
+            self.latencies[kind].append(seconds)
+
+    def error(self, kind: str) -> None:
+        with self.lock:
+            self.errors[kind] += 1
+
+
+def _reader(engine, stats: Stats, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(select(FeesStructure).order_by(FeesStructure.category)).fetchall()
+                conn.execute(
+                    select(Scholarships)
+                    .where(Scholarships.is_active.is_(True))
+                    .order_by(Scholarships.scholarship_name)
+                ).fetchall()
+        except OperationalError:
+            stats.error("read")
+            continue
+        stats.record("read", time.perf_counter() - started)
+
+
+def _writer(engine, stats: Stats, deadline: float, seed: int) -> None:
+    rng = random.Random(seed)
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    insert(HelpTickets.__table__).values(
+                        student_name="Bench",
+                        contact="9999999999",
+                        topic="Fees",
+                        query="Benchmark ticket",
+                        status="Open",
+                        created_at=datetime.utcnow(),
+                    )
+                )
+                conn.execute(
+                    update(FeesStructure.__table__)
+                    .where(FeesStructure.category == rng.choice(CATEGORIES))
+                    .values(total_fees=float(rng.randint(20000, 30000)))
+                )
+        except OperationalError:
+            stats.error("write")
+            continue
+        stats.record("write", time.perf_counter() - started)
+
+
+def _run(engine, readers: int, writers: int, seconds: float) -> Stats:
+    stats = Stats()
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=_reader, args=(engine, stats, deadline)) for _ in range(readers)]
+    threads += [threading.Thread(target=_writer, args=(engine, stats, deadline, i)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def _report(label: str, engine, stats: Stats, seconds: float) -> None:
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+    print(f"\n{label} (journal_mode={journal_mode})")
+    for kind in ("read", "write"):
+        samples = sorted(stats.latencies[kind])
+        if samples:
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+            median = statistics.median(samples) * 1000
+        else:
+            p95 = median = 0.0
+        print(
+            f"  {kind}s: {len(samples) / seconds:9.1f}/s  median {median:7.2f} ms  "
+            f"p95 {p95:8.2f} ms  errors {stats.errors[kind]}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tuned vs. legacy SQLite under concurrent reads and writes.")
+    parser.add_argument("--readers", type=int, default=8, help="Threads running chatbot read queries.")
+    parser.add_argument("--writers", type=int, default=2, help="Threads writing tickets and fee updates.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run.")
+    args = parser.parse_args()
+
+    os.environ.pop("SQLITE_TUNED", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuned in (("legacy", False), ("tuned", True)):
+            engine = _build(Path(tmp) / f"{label}.db", tuned=tuned)
+            stats = _run(engine, args.readers, args.writers, args.seconds)
+            _report(label, engine, stats, args.seconds)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
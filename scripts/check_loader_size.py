@@ -0,0 +1,38 @@
+import argparse
+import gzip
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOADER_PATH = BASE_DIR / "frontend" / "js" / "widget-loader.js"
+
+# The loader is parsed on every host page before the visitor interacts with the
+# chat, so it has to stay a small fraction of the full widget bundle.
+MAX_RAW_BYTES = 4096
+MAX_GZIP_BYTES = 1536
+
+
+def measure(path: Path) -> tuple:
+    raw = path.read_bytes()
+    return len(raw), len(gzip.compress(raw, compresslevel=9))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail if the widget embed loader exceeds its size budget.")
+    parser.add_argument("--path", type=Path, default=LOADER_PATH, help="Loader file to check.")
+    parser.add_argument("--max-raw", type=int, default=MAX_RAW_BYTES, help="Raw size budget in bytes.")
+    parser.add_argument("--max-gzip", type=int, default=MAX_GZIP_BYTES, help="Gzipped size budget in bytes.")
+    args = parser.parse_args()
+
+    raw_size, gzip_size = measure(args.path)
+    print(f"{args.path.name}: {raw_size} bytes raw (budget {args.max_raw}), "
+          f"{gzip_size} bytes gzip (budget {args.max_gzip})")
+
+    if raw_size > args.max_raw or gzip_size > args.max_gzip:
+        print("Loader size budget exceeded.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
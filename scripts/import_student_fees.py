@@ -0,0 +1,58 @@
+"""
+Bulk-import student fee payments from a CSV or NDJSON file.
+
+Rows are validated with the same rules as the admin "Add Payment" form and
+inserted in batches; invalid rows are listed and skipped.
+
+    python scripts/import_student_fees.py receipts.csv [--dry-run] [--batch-size 500]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from backend.fee_import import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_student_fees,
+    read_rows,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import student fee payments from CSV or NDJSON.")
+    parser.add_argument("path", type=Path, help="File to import.")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction.")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; do not insert.")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path.name)
+    if not fmt:
+        parser.error("could not detect the file format; pass --format.")
+
+    from backend.app import create_app
+
+    app = create_app()
+    with app.app_context(), args.path.open("rb") as stream:
+        report = import_student_fees(read_rows(stream, fmt), batch_size=max(1, args.batch_size), dry_run=args.dry_run)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for error in report["errors"]:
+            print(f"line {error['line']}: {error['error']}")
+        verb = "Validated" if args.dry_run else "Imported"
+        print(f"{verb} {report['imported']} of {report['processed']} row(s); {report['failed']} failed.")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
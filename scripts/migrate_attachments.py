@@ -0,0 +1,132 @@
+"""
+Move help ticket PDFs from the flat `backend/uploads/ticket_*.pdf` layout into
+the content-addressed store (`backend/uploads/ab/cd/<sha256>.pdf`), then
+recount attachment references.
+
+Each ticket is repointed and committed before its old file is removed, so the
+script can be interrupted and re-run. `--prune` also deletes stored files that
+no ticket references any more.
+
+    python scripts/migrate_attachments.py [--dry-run] [--prune]
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from sqlalchemy import select, update  # noqa: E402
+
+from backend.database import db  # noqa: E402
+from backend.models import ArchivedHelpTickets, Attachment, HelpTickets  # noqa: E402
+from backend.ticket_uploads import (  # noqa: E402
+    CHUNK_SIZE,
+    PRUNE_GRACE,
+    STORAGE_PATH,
+    UPLOADS_DIR,
+    add_reference,
+    place_file,
+    prune_attachments,
+    rebuild_reference_counts,
+    storage_path_for,
+)
+
+# ticket_<id>_<timestamp>_<name> (original layout) or ticket_<uuid>_<name>.
+LEGACY_NAME = re.compile(r"^ticket_(?:\d+_\d+|[0-9a-f]{32})_(.+)$")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def migrate(dry_run: bool) -> int:
+    moved = 0
+    for model in (HelpTickets, ArchivedHelpTickets):
+        table = model.__table__
+        rows = db.session.execute(
+            select(table.c.id, table.c.pdf_filename, table.c.pdf_original_name).where(
+                table.c.pdf_filename.isnot(None)
+            )
+        ).all()
+        for row in rows:
+            if STORAGE_PATH.match(row.pdf_filename):
+                continue
+            legacy = UPLOADS_DIR / row.pdf_filename
+            if not legacy.is_file():
+                print(f"{table.name} #{row.id}: {row.pdf_filename} is missing, skipped.")
+                continue
+            storage_path = storage_path_for(_sha256(legacy))
+            print(f"{table.name} #{row.id}: {row.pdf_filename} -> {storage_path}")
+            if dry_run:
+                moved += 1
+                continue
+
+            place_file(legacy, storage_path, move=False)
+            match = LEGACY_NAME.match(row.pdf_filename)
+            values = {
+                "pdf_filename": storage_path,
+                "pdf_original_name": row.pdf_original_name or (match.group(1) if match else row.pdf_filename),
+            }
+            if "updated_at" in table.c:
+                values["updated_at"] = datetime.utcnow()
+            connection = db.session.connection()
+            connection.execute(update(table).where(table.c.id == row.id).values(**values))
+            add_reference(connection, storage_path, 1)
+            db.session.commit()
+            legacy.unlink()
+            moved += 1
+    return moved
+
+
+def remove_orphans() -> int:
+    """Delete stored files, thumbnails and abandoned temp files that have no attachment row."""
+    from backend.ticket_queue import ticket_queue
+
+    # Files of tickets still waiting in the write-behind queue are referenced soon.
+    known = ticket_queue.queued_paths()
+    for storage_path, thumbnail_path in db.session.query(Attachment.storage_path, Attachment.thumbnail_path):
+        known.update((storage_path, thumbnail_path))
+    cutoff = time.time() - PRUNE_GRACE.total_seconds()
+    removed = 0
+    candidates = [UPLOADS_DIR.glob(pattern) for pattern in ("??/??/*.pdf", "??/??/*.png", ".upload-*.part")]
+    for path in [path for paths in candidates for path in paths]:
+        relative = path.relative_to(UPLOADS_DIR).as_posix()
+        if relative not in known and path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Move ticket PDFs into the content-addressed store.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the files that would move.")
+    parser.add_argument("--prune", action="store_true", help="Also delete unreferenced stored files.")
+    args = parser.parse_args()
+
+    from backend.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        moved = migrate(args.dry_run)
+        print(f"{'Would move' if args.dry_run else 'Moved'} {moved} file(s).")
+        if args.dry_run:
+            return 0
+        print(f"{rebuild_reference_counts()} attachment(s) referenced.")
+        if args.prune:
+            print(f"Pruned {prune_attachments() + remove_orphans()} unreferenced file(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Create missing tables, add new columns and indexes, and run the startup
+backfills, holding a database-wide lock.
+
+Run this once per deploy before starting the workers, and start them with
+`AUTO_MIGRATE=0` so they skip the schema upgrade:
+
+    python scripts/migrate_db.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+
+def main() -> int:
+    # Importing `backend.app` builds the app; this keeps that from migrating
+    # too, so only the explicit call below does.
+    os.environ["AUTO_MIGRATE"] = "0"
+
+    from backend.app import app
+    from backend.migrations import migrate_database
+
+    with app.app_context():
+        migrate_database()
+    print("Database schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
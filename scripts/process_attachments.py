@@ -0,0 +1,42 @@
+"""
+Extract page counts, text and thumbnails from stored ticket PDFs.
+
+New uploads are processed in the background by the app; run this after
+installing PyMuPDF or pypdf, after a restart dropped queued jobs, or with
+`--force` to redo every attachment.
+
+    python scripts/process_attachments.py [--force] [--limit 100]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from backend.attachment_processing import available, process_pending  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Extract previews from ticket PDF attachments.")
+    parser.add_argument("--force", action="store_true", help="Reprocess attachments that already have a preview.")
+    parser.add_argument("--limit", type=int, help="Process at most this many attachments.")
+    args = parser.parse_args()
+
+    if not available():
+        print("Install PyMuPDF (thumbnails and text) or pypdf (text only) first.", file=sys.stderr)
+        return 1
+
+    from backend.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        processed = process_pending(force=args.force, limit=args.limit)
+    print(f"Processed {processed} attachment(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
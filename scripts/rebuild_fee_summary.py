@@ -0,0 +1,88 @@
+"""
+Reconcile `fee_collection_summary` and `student_fee_balances` with
+`student_fees_payments`.
+
+Both are kept up to date incrementally by the admin routes; run this after
+bulk edits made outside the app, or with `--check` to report summary drift.
+
+    python scripts/rebuild_fee_summary.py [--check]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from sqlalchemy import func  # noqa: E402
+
+from backend.database import db  # noqa: E402
+from backend.fee_accounting import (  # noqa: E402
+    AMOUNT_COLUMNS,
+    GROUP_COLUMNS,
+    group_columns,
+    rebuild_fee_summary,
+    rebuild_student_balances,
+)
+from backend.models import FeeCollectionSummary, StudentFeesPayment  # noqa: E402
+
+TOLERANCE = 0.005
+
+
+def _current():
+    rows = db.session.query(FeeCollectionSummary).all()
+    return {
+        tuple(getattr(row, column) for column in GROUP_COLUMNS): (row.payment_count,)
+        + tuple(getattr(row, column) for column in AMOUNT_COLUMNS)
+        for row in rows
+    }
+
+
+def _expected():
+    group = group_columns()
+    rows = (
+        db.session.query(
+            *group,
+            func.count(StudentFeesPayment.id),
+            *[func.coalesce(func.sum(getattr(StudentFeesPayment, column)), 0) for column in AMOUNT_COLUMNS],
+        )
+        .group_by(*group)
+        .all()
+    )
+    return {tuple(row[: len(group)]): tuple(row[len(group):]) for row in rows}
+
+
+def _drift():
+    current, expected = _current(), _expected()
+    drifted = []
+    for key in sorted(set(current) | set(expected), key=lambda key: tuple(str(part) for part in key)):
+        have, want = current.get(key), expected.get(key)
+        if have is None or want is None or any(abs(float(a) - float(b)) > TOLERANCE for a, b in zip(have, want)):
+            drifted.append((key, have, want))
+    return drifted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the fee collection summary and student balances.")
+    parser.add_argument("--check", action="store_true", help="Only report groups that differ; do not rebuild.")
+    args = parser.parse_args()
+
+    from backend.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        drifted = _drift()
+        for key, have, want in drifted:
+            print(f"{'/'.join(str(part) for part in key)}: summary={have} payments={want}")
+        print(f"{len(drifted)} group(s) out of date.")
+        if args.check:
+            return 1 if drifted else 0
+        print(f"Rebuilt {rebuild_fee_summary()} summary group(s).")
+        print(f"Rebuilt {rebuild_student_balances()} student balance(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
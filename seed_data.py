@@ -1,14 +1,26 @@
 import argparse
+import hashlib
 import json
+import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, date
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from werkzeug.security import generate_password_hash
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
-SNAPSHOT_PATH = DATA_DIR / "seed_snapshot.json"
+SNAPSHOT_PATH = DATA_DIR / "seed_snapshot.json"  # legacy single-file format (read only)
+SNAPSHOT_DIR = DATA_DIR / "snapshot"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FORMAT = 2
 
 SEED_PAYLOAD: Dict[str, Any] = {}
 
@@ -34,19 +46,103 @@ def use_seed_payload(payload: Optional[Dict[str, Any]] = None) -> None:
     SEED_PAYLOAD = payload or {}
 
 
-def load_seed_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+# Snapshot segment -> (table name, query returning the segment's ORM records
+# from the given session). Single-row tables return one object (or None)
+# instead of a list.
+SNAPSHOT_SEGMENTS: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    "fees": ("fees_structures", lambda s: s.query(FeesStructure).order_by(FeesStructure.category).all()),
+    "documents": (
+        "admission_documents",
+        lambda s: s.query(AdmissionDocuments)
+        .order_by(AdmissionDocuments.admission_type, AdmissionDocuments.display_order)
+        .all(),
+    ),
+    "library_books": ("library_books", lambda s: s.query(LibraryBooks).order_by(LibraryBooks.category).all()),
+    "library_timings": ("library_timings", lambda s: s.query(LibraryTimings).first()),
+    "hostel": ("hostel_information", lambda s: s.query(HostelInfo).order_by(HostelInfo.facility_name).all()),
+    "scholarships": (
+        "scholarships",
+        lambda s: s.query(Scholarships).order_by(Scholarships.scholarship_name).all(),
+    ),
+    "faculty": ("faculty", lambda s: s.query(Faculty).order_by(Faculty.department, Faculty.name).all()),
+    "principal": ("principal_info", lambda s: s.query(PrincipalInfo).first()),
+    "events": ("events", lambda s: s.query(Events).order_by(Events.event_date).all()),
+    "college_timings": ("college_timings", lambda s: s.query(CollegeTimings).first()),
+}
+
+# Columns that describe the row rather than the seed data.
+SEGMENT_EXCLUDES: Dict[str, List[str]] = {"fees": ["id", "updated_at", "created_at"]}
+
+SNAPSHOT_TABLES = {table for table, _ in SNAPSHOT_SEGMENTS.values()}
+
+
+def segments_for_tables(tables: Optional[Iterable[str]]) -> List[str]:
+    """Map touched table names to the snapshot segments that must be re-exported."""
+    if tables is None:
+        return list(SNAPSHOT_SEGMENTS)
+    tables = set(tables)
+    return [key for key, (table, _) in SNAPSHOT_SEGMENTS.items() if table in tables]
+
+
+def _read_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _segment_checksum(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def load_snapshot_manifest(directory: Path = SNAPSHOT_DIR) -> Dict[str, Any]:
+    try:
+        manifest = _read_json(directory / MANIFEST_NAME)
+    except (json.JSONDecodeError, OSError):
+        return {"format": SNAPSHOT_FORMAT, "segments": {}}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("segments"), dict):
+        return {"format": SNAPSHOT_FORMAT, "segments": {}}
+    return manifest
+
+
+def load_seed_snapshot(
+    path: Path = SNAPSHOT_PATH, directory: Path = SNAPSHOT_DIR
+) -> Optional[Dict[str, Any]]:
+    """
+    Read the segmented snapshot (manifest + one file per table). Segments the
+    manifest does not have yet come from the legacy single-file
+    `seed_snapshot.json`, so an upgraded install that has only re-exported
+    some tables keeps the admin edits of the others.
+    """
+    payload: Dict[str, Any] = _load_legacy_snapshot(path)
+    if (directory / MANIFEST_NAME).exists():
+        segments = load_snapshot_manifest(directory)["segments"]
+        for key, meta in segments.items():
+            try:
+                raw = (directory / meta["file"]).read_bytes()
+            except (KeyError, OSError):
+                continue
+            if meta.get("checksum") and _segment_checksum(raw) != meta["checksum"]:
+                print(f"[seed] Ignoring snapshot segment {key}: checksum mismatch.")
+                continue
+            try:
+                payload[key] = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+    return payload or None
+
+
+def _load_legacy_snapshot(path: Path) -> Dict[str, Any]:
     if not path.exists():
-        return None
+        return {}
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            return data if isinstance(data, dict) else None
+        data = _read_json(path)
     except (json.JSONDecodeError, OSError):
-        return None
+        return {}
+    return data if isinstance(data, dict) else {}
 
 
 def _ensure_data_dir() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def _clean_record(record: Dict[str, Any], exclude: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -54,72 +150,114 @@ def _clean_record(record: Dict[str, Any], exclude: Optional[List[str]] = None) -
     return {key: value for key, value in record.items() if key not in exclude}
 
 
-def get_live_records() -> Dict[str, Any]:
-    """Return ORM objects for all chatbot-relevant tables."""
-    return {
-        "fees": FeesStructure.query.order_by(FeesStructure.category).all(),
-        "documents": AdmissionDocuments.query.order_by(
-            AdmissionDocuments.admission_type, AdmissionDocuments.display_order
-        ).all(),
-        "library_books": LibraryBooks.query.order_by(LibraryBooks.category).all(),
-        "library_timings": LibraryTimings.query.first(),
-        "hostel": HostelInfo.query.order_by(HostelInfo.facility_name).all(),
-        "scholarships": Scholarships.query.order_by(Scholarships.scholarship_name).all(),
-        "faculty": Faculty.query.order_by(Faculty.department, Faculty.name).all(),
-        "principal": PrincipalInfo.query.first(),
-        "events": Events.query.order_by(Events.event_date).all(),
-        "college_timings": CollegeTimings.query.first(),
-    }
-
-
-def build_seed_payload(records: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def get_live_records(keys: Optional[Iterable[str]] = None, session=None) -> Dict[str, Any]:
+    """
+    Return ORM objects for the requested (default: all) chatbot-relevant
+    tables, read through `session` (default: `db.session`, the primary).
+    """
+    keys = list(SNAPSHOT_SEGMENTS) if keys is None else keys
+    session = session or db.session
+    return {key: SNAPSHOT_SEGMENTS[key][1](session) for key in keys}
+
+
+def _serialize_segment(key: str, value: Any) -> Any:
+    exclude = SEGMENT_EXCLUDES.get(key, ["id"])
+    if isinstance(value, list):
+        return [_clean_record(item.to_dict(), exclude) for item in value]
+    return _clean_record(value.to_dict(), exclude) if value else None
+
+
+def build_seed_payload(
+    records: Optional[Dict[str, Any]] = None, keys: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
     """Create a serializable payload that mirrors the current database."""
-    records = records or get_live_records()
-
-    def serialize_list(items, exclude=None):
-        return [
-            _clean_record(item.to_dict(), exclude or ["id", "updated_at", "created_at"])
-            for item in items
-        ]
-
-    payload: Dict[str, Any] = {
-        "fees": serialize_list(records.get("fees", []), ["id", "updated_at", "created_at"]),
-        "documents": serialize_list(records.get("documents", []), ["id"]),
-        "library_books": serialize_list(records.get("library_books", []), ["id"]),
-        "hostel": serialize_list(records.get("hostel", []), ["id"]),
-        "scholarships": serialize_list(records.get("scholarships", []), ["id"]),
-        "faculty": serialize_list(records.get("faculty", []), ["id"]),
-        "events": serialize_list(records.get("events", []), ["id"]),
-    }
-
-    library_timings = records.get("library_timings")
-    payload["library_timings"] = (
-        _clean_record(library_timings.to_dict(), ["id"]) if library_timings else None
-    )
+    records = records or get_live_records(keys)
+    return {key: _serialize_segment(key, value) for key, value in records.items()}
 
-    principal = records.get("principal")
-    payload["principal"] = _clean_record(principal.to_dict(), ["id"]) if principal else None
 
-    college_timings = records.get("college_timings")
-    payload["college_timings"] = (
-        _clean_record(college_timings.to_dict(), ["id"]) if college_timings else None
-    )
+def _atomic_write_bytes(path: Path, raw: bytes) -> None:
+    """Write to a temp file in the same directory, then rename over `path`."""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(raw)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def _snapshot_lock():
+    """Serialize manifest read-modify-write cycles across worker processes."""
+    if fcntl is None:  # pragma: no cover - Windows development setups run one process
+        yield
+        return
+    with (SNAPSHOT_DIR / ".lock").open("a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
 
-    return payload
+
+def _encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
 
 
-def write_seed_snapshot(records: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Dump the latest dataset to JSON so future seeding reflects admin updates."""
-    payload = build_seed_payload(records)
+def write_seed_snapshot(
+    records: Optional[Dict[str, Any]] = None, tables: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Export the latest dataset so future seeding reflects admin updates.
+
+    Only the segments backed by `tables` (default: all) are rebuilt, and a
+    segment file is only rewritten when its checksum changed. The manifest is
+    replaced last, so readers never see a version pointing at a missing file.
+    The database is read under the snapshot lock, so an export that waited
+    for another one cannot overwrite it with older data.
+    """
+    keys = list(records) if records else segments_for_tables(tables)
     _ensure_data_dir()
-    with SNAPSHOT_PATH.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+
+    with _snapshot_lock():
+        payload = build_seed_payload(records, keys)
+        manifest = load_snapshot_manifest(SNAPSHOT_DIR)
+        segments = manifest.setdefault("segments", {})
+        changed = False
+        for key in keys:
+            raw = _encode_json(payload[key])
+            checksum = _segment_checksum(raw)
+            previous = segments.get(key, {})
+            filename = f"{key}.json"
+            if previous.get("checksum") == checksum and (SNAPSHOT_DIR / filename).exists():
+                continue
+            _atomic_write_bytes(SNAPSHOT_DIR / filename, raw)
+            value = payload[key]
+            segments[key] = {
+                "file": filename,
+                "table": SNAPSHOT_SEGMENTS[key][0],
+                "version": int(previous.get("version", 0)) + 1,
+                "checksum": checksum,
+                "records": len(value) if isinstance(value, list) else int(value is not None),
+                "exported_at": datetime.utcnow().isoformat(),
+            }
+            changed = True
+
+        if changed:
+            manifest["format"] = SNAPSHOT_FORMAT
+            _atomic_write_bytes(SNAPSHOT_DIR / MANIFEST_NAME, _encode_json(manifest))
     return payload
 
 
 def get_chatbot_snapshot() -> Dict[str, Any]:
-    """Expose a shared dataset for chatbot responses."""
-    return build_seed_payload()
+    """Expose a shared dataset for chatbot responses, read from a replica when configured."""
+    from backend.database import read_session
+
+    return build_seed_payload(get_live_records(session=read_session()))
 
 
 def _get_seed_records(key: str, default: Any = None) -> Any:
@@ -459,7 +597,7 @@ def main():
     parser.add_argument(
         "--export",
         action="store_true",
-        help="Only export the current database into data/seed_snapshot.json without seeding.",
+        help="Only export the current database into data/snapshot/ without seeding.",
     )
     parser.add_argument(
         "--skip-snapshot",
@@ -474,7 +612,7 @@ def main():
     with app.app_context():
         if args.export:
             payload = write_seed_snapshot()
-            print(f"Snapshot exported to {SNAPSHOT_PATH} ({len(payload.get('fees', []))} fee records).")
+            print(f"Snapshot exported to {SNAPSHOT_DIR} ({len(payload.get('fees', []))} fee records).")
             return
 
         snapshot = load_seed_snapshot()
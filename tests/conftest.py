@@ -0,0 +1,68 @@
+"""
+Shared fixtures: the app is built once against a throwaway SQLite database
+(the default single-file profile), and every test starts from empty tables.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="college-chatbot-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ["SECRET_KEY"] = "test-secret-key"
+# Check passwords inline rather than on a process pool.
+os.environ["LOGIN_HASH_WORKERS"] = "0"
+# Tests prune explicitly instead of on a background thread.
+os.environ["RETENTION_INTERVAL_MINUTES"] = "0"
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from backend.app import app as flask_app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.models import Admin  # noqa: E402
+from backend.snapshot_writer import snapshot_writer  # noqa: E402
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+
+
+@pytest.fixture(scope="session")
+def app():
+    flask_app.config["TESTING"] = True
+    # Keep admin writes from exporting the seed snapshot into data/.
+    snapshot_writer.request_export = lambda tables=None: None
+    return flask_app
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    with app.app_context():
+        yield
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+
+@pytest.fixture
+def admin(app):
+    user = Admin(username=ADMIN_USERNAME, password_hash=generate_password_hash(ADMIN_PASSWORD))
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, admin):
+    """A test client signed in as the admin."""
+    client = app.test_client()
+    response = client.post("/api/admin/login", json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return client
@@ -0,0 +1,42 @@
+from backend.database import db
+from backend.models import FeesStructure
+
+
+def test_batch_commits_every_operation(client):
+    response = client.post(
+        "/api/admin/batch",
+        json={
+            "operations": [
+                {"resource": "fees", "action": "create", "data": {"category": "open", "total_fees": 25000}},
+                {"resource": "fees", "action": "create", "data": {"category": "obc", "total_fees": 12000}},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["committed"] is True
+    assert {fee.category for fee in FeesStructure.query} == {"OPEN", "OBC"}
+
+
+def test_failed_operation_rolls_back_the_whole_batch(client):
+    fee = FeesStructure(category="SC", total_fees=1000)
+    db.session.add(fee)
+    db.session.commit()
+
+    response = client.post(
+        "/api/admin/batch",
+        json={
+            "operations": [
+                {"resource": "fees", "action": "create", "data": {"category": "open", "total_fees": 25000}},
+                {"resource": "fees", "action": "update", "id": fee.id, "data": {"total_fees": 2000}},
+                {"resource": "fees", "action": "delete", "id": fee.id + 100},
+            ]
+        },
+    )
+
+    body = response.get_json()
+    assert response.status_code == 404
+    assert body["committed"] is False
+    assert body["failed_index"] == 2
+    db.session.expire_all()
+    assert [(row.category, row.total_fees) for row in FeesStructure.query] == [("SC", 1000)]
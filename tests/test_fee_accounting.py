@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, update
+
+from backend.database import db
+from backend.fee_accounting import AMOUNT_COLUMNS, GROUP_COLUMNS, rebuild_fee_summary
+from backend.models import FeeCollectionSummary, StudentFeeBalance, StudentFeesPayment
+
+
+def _summary():
+    return {
+        tuple(getattr(row, column) for column in GROUP_COLUMNS): (row.payment_count,)
+        + tuple(round(getattr(row, column), 2) for column in AMOUNT_COLUMNS)
+        for row in FeeCollectionSummary.query.all()
+    }
+
+
+def _payment(student_id, category="Open", semester="1", paid=10000.0, **values):
+    return StudentFeesPayment(
+        student_name=f"Student {student_id}",
+        student_id=student_id,
+        admission_year="2024",
+        category=category,
+        total_fees=25000.0,
+        paid_amount=paid,
+        remaining_amount=25000.0 - paid,
+        receipt_number=f"R-{student_id}-{semester}-{paid}",
+        semester=semester,
+        payment_date=datetime(2024, 7, 1),
+        **values,
+    )
+
+
+def test_incremental_summary_matches_rebuild():
+    payments = [
+        _payment("S1"),
+        _payment("S1", paid=15000.0),
+        _payment("S2", category=" OBC "),
+        _payment("S3", category="obc", semester="2"),
+        _payment("S4", category="SC"),
+    ]
+    db.session.add_all(payments)
+    db.session.commit()
+
+    # Edits that move payments between groups, change amounts and remove a group.
+    payments[0].category = "OBC"
+    payments[1].paid_amount = 20000.0
+    payments[1].remaining_amount = 5000.0
+    payments[3].semester = "1"
+    db.session.delete(payments[4])
+    db.session.commit()
+
+    incremental = _summary()
+    assert ("sc", "2024", "1") not in incremental
+    assert incremental[("obc", "2024", "1")][0] == 3
+
+    rebuild_fee_summary()
+    assert _summary() == incremental
+
+
+def test_rows_without_category_key_are_grouped_like_the_incremental_path():
+    db.session.add_all([_payment("S1", category="General"), _payment("S2", category="General")])
+    db.session.commit()
+    # Rows written before category_key existed.
+    db.session.execute(update(StudentFeesPayment.__table__).values(category_key=None))
+    db.session.commit()
+
+    incremental = _summary()
+    rebuild_fee_summary()
+    assert _summary() == incremental == {("general", "2024", "1"): (2, 50000.0, 20000.0, 30000.0)}
+
+
+def test_delete_from_missing_group_logs_instead_of_writing_a_negative_row(caplog):
+    payment = _payment("S1")
+    db.session.add(payment)
+    db.session.commit()
+    db.session.execute(delete(FeeCollectionSummary.__table__))
+    db.session.commit()
+
+    with caplog.at_level(logging.WARNING, logger="backend.fee_accounting"):
+        db.session.delete(payment)
+        db.session.commit()
+
+    assert FeeCollectionSummary.query.count() == 0
+    assert "rebuild_fee_summary" in caplog.text
+
+
+def test_student_balance_counts_each_semester_once():
+    db.session.add_all([_payment("S1", paid=10000.0), _payment("S1", paid=5000.0), _payment("S1", semester="2")])
+    db.session.commit()
+
+    balance = StudentFeeBalance.query.filter_by(student_id="S1").one()
+    assert balance.payment_count == 3
+    assert balance.total_due == pytest.approx(50000.0)
+    assert balance.total_paid == pytest.approx(25000.0)
+    assert balance.balance == pytest.approx(25000.0)
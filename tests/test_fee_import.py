@@ -0,0 +1,94 @@
+import io
+
+import pytest
+from sqlalchemy import text
+
+from backend.database import db
+from backend.fee_accounting import rebuild_fee_summary
+from backend.fee_import import import_student_fees, read_rows
+from backend.models import FeeCollectionSummary, StudentFeeBalance, StudentFeesPayment
+
+
+def _row(index, receipt):
+    return {
+        "student_name": f"Student {index}",
+        "student_id": f"S{index}",
+        "admission_year": "2024",
+        "category": "OPEN",
+        "total_fees": "25000",
+        "paid_amount": "10000",
+        "receipt_number": receipt,
+        "semester": "1",
+        "payment_date": "2024-07-01",
+    }
+
+
+def _summary():
+    return {row.category_key: row.payment_count for row in FeeCollectionSummary.query}
+
+
+def test_ndjson_lines_are_numbered_and_bad_lines_reported():
+    stream = io.BytesIO(b'{"student_id": "S1"}\n\nnot json\n[1, 2]\n')
+
+    rows = list(read_rows(stream, "ndjson"))
+
+    assert [line for line, _ in rows] == [1, 3, 4]
+    assert rows[0][1] == {"student_id": "S1"}
+    assert all(isinstance(row, ValueError) for _, row in rows[1:])
+
+
+def test_import_skips_invalid_rows_and_keeps_the_summary_in_step():
+    rows = [(2, _row(1, "R1")), (3, {"student_id": "S2"}), (4, ValueError("Invalid JSON")), (5, _row(3, "R3"))]
+
+    report = import_student_fees(rows, batch_size=1)
+
+    assert (report["processed"], report["imported"], report["failed"], report["batches"]) == (4, 2, 2, 2)
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert sorted(row.student_id for row in StudentFeesPayment.query) == ["S1", "S3"]
+    assert StudentFeeBalance.query.count() == 2
+
+    summary = _summary()
+    assert summary == {"open": 2}
+    rebuild_fee_summary()
+    assert _summary() == summary
+
+
+def test_dry_run_writes_nothing():
+    report = import_student_fees([(2, _row(1, "R1"))], dry_run=True)
+
+    assert report["imported"] == 1
+    assert StudentFeesPayment.query.count() == 0
+
+
+@pytest.fixture
+def unique_receipts():
+    # A constraint the validator does not know about, so the database rejects the batch.
+    db.session.execute(text("CREATE UNIQUE INDEX ux_test_receipt ON student_fees_payments (receipt_number)"))
+    db.session.commit()
+    yield
+    db.session.rollback()
+    db.session.execute(text("DROP INDEX ux_test_receipt"))
+    db.session.commit()
+
+
+def test_rejected_batch_is_retried_row_by_row(unique_receipts):
+    rows = [(2, _row(1, "R1")), (3, _row(2, "R2")), (4, _row(3, "R1")), (5, {"student_id": "S4"})]
+
+    report = import_student_fees(rows, batch_size=10)
+
+    assert report["imported"] == 2
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [5, 4]
+    assert sorted(row.student_id for row in StudentFeesPayment.query) == ["S1", "S2"]
+
+    summary = _summary()
+    assert summary == {"open": 2}
+    rebuild_fee_summary()
+    assert _summary() == summary
+
+
+def test_payment_date_must_be_a_string():
+    report = import_student_fees([(2, dict(_row(1, "R1"), payment_date=20240701))])
+
+    assert report["imported"] == 0
+    assert "payment_date" in report["errors"][0]["error"]
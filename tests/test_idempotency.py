@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from backend.database import db
+from backend.idempotency import IDEMPOTENCY_TTL, RESERVATION_TIMEOUT, _fingerprint
+from backend.models import FeesStructure, IdempotencyKey
+
+FEE = {"category": "open", "tuition_fees": 20000, "development_fees": 5000}
+
+
+def _post_fee(client, key, payload=FEE):
+    return client.post("/api/admin/fees", json=payload, headers={"Idempotency-Key": key})
+
+
+def test_retry_replays_the_stored_response(client):
+    first = _post_fee(client, "fee-1")
+    second = _post_fee(client, "fee-1")
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.get_json() == first.get_json()
+    assert FeesStructure.query.count() == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(client):
+    assert _post_fee(client, "fee-1").status_code == 201
+
+    response = _post_fee(client, "fee-1", dict(FEE, category="obc"))
+
+    assert response.status_code == 422
+    assert FeesStructure.query.count() == 1
+
+
+def test_failed_request_releases_the_key(client):
+    assert _post_fee(client, "fee-1", {"tuition_fees": 1}).status_code == 400
+
+    assert _post_fee(client, "fee-1").status_code == 201
+
+
+def _reserve(app, admin, key, created_at):
+    with app.test_request_context("/api/admin/fees", method="POST", json=FEE):
+        fingerprint = _fingerprint()
+    db.session.add(
+        IdempotencyKey(
+            scope=f"POST /api/admin/fees {admin.id}",
+            key=key,
+            request_hash=fingerprint,
+            created_at=created_at,
+            expires_at=created_at + IDEMPOTENCY_TTL,
+        )
+    )
+    db.session.commit()
+
+
+def test_request_still_in_progress_gets_409(app, admin, client):
+    _reserve(app, admin, "fee-1", datetime.utcnow())
+
+    response = _post_fee(client, "fee-1")
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert FeesStructure.query.count() == 0
+
+
+def test_abandoned_reservation_is_taken_over(app, admin, client):
+    _reserve(app, admin, "fee-1", datetime.utcnow() - RESERVATION_TIMEOUT - timedelta(seconds=1))
+
+    response = _post_fee(client, "fee-1")
+
+    assert response.status_code == 201
+    assert FeesStructure.query.count() == 1
@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from backend import login_security
+from backend.app import trust_proxies
+from backend.login_security import (
+    BASE_DELAY_SECONDS,
+    FAILURE_WINDOW_SECONDS,
+    FREE_ATTEMPTS,
+    MAX_DELAY_SECONDS,
+    LoginThrottle,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(login_security.time, "monotonic", clock)
+    return clock
+
+
+def test_backoff_doubles_after_the_free_attempts_and_is_capped(clock):
+    throttle = LoginThrottle()
+    keys = throttle.keys("Admin", "10.0.0.1")
+
+    for _ in range(FREE_ATTEMPTS):
+        throttle.record_failure(keys)
+    assert throttle.retry_after(keys) == 0
+
+    delays = []
+    for _ in range(4):
+        throttle.record_failure(keys)
+        delays.append(throttle.retry_after(keys))
+    assert delays == [BASE_DELAY_SECONDS * 2**n for n in range(4)]
+
+    for _ in range(30):
+        throttle.record_failure(keys)
+    assert throttle.retry_after(keys) == MAX_DELAY_SECONDS
+
+    clock.now += MAX_DELAY_SECONDS
+    assert throttle.retry_after(keys) == 0
+
+
+def test_username_and_address_are_throttled_separately(clock):
+    throttle = LoginThrottle()
+    for _ in range(FREE_ATTEMPTS + 1):
+        throttle.record_failure(throttle.keys("admin", "10.0.0.1"))
+
+    # Same username (case-insensitive) from elsewhere, and another user from the same address.
+    assert throttle.retry_after(throttle.keys("ADMIN", "10.0.0.2")) > 0
+    assert throttle.retry_after(throttle.keys("other", "10.0.0.1")) > 0
+    assert throttle.retry_after(throttle.keys("other", "10.0.0.2")) == 0
+
+
+def test_success_resets_and_old_failures_are_forgotten(clock):
+    throttle = LoginThrottle()
+    keys = throttle.keys("admin", "10.0.0.1")
+    for _ in range(FREE_ATTEMPTS + 2):
+        throttle.record_failure(keys)
+    throttle.reset(keys)
+    throttle.record_failure(keys)
+    assert throttle.retry_after(keys) == 0
+
+    for _ in range(FREE_ATTEMPTS - 1):
+        throttle.record_failure(keys)
+    clock.now += FAILURE_WINDOW_SECONDS + 1
+    throttle.record_failure(keys)
+    assert throttle.retry_after(keys) == 0
+
+
+def test_locked_login_gets_429_with_retry_after(app, admin, clock):
+    client = app.test_client()
+    environ = {"REMOTE_ADDR": "10.9.9.9"}
+    credentials = {"username": "admin", "password": "wrong"}
+    try:
+        for _ in range(FREE_ATTEMPTS + 1):
+            assert client.post("/api/admin/login", json=credentials, environ_base=environ).status_code == 401
+
+        # Refused before the password is checked, even when it is right.
+        response = client.post(
+            "/api/admin/login", json=dict(credentials, password="admin123"), environ_base=environ
+        )
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(int(BASE_DELAY_SECONDS))
+
+        clock.now += BASE_DELAY_SECONDS
+        response = client.post(
+            "/api/admin/login", json=dict(credentials, password="admin123"), environ_base=environ
+        )
+        assert response.status_code == 200
+    finally:
+        login_security.login_throttle.reset(login_security.login_throttle.keys("admin", "10.9.9.9"))
+
+
+def test_hash_pool_is_created_on_first_use_and_again_after_a_fork(app, monkeypatch):
+    created = []
+
+    def create_executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        created.append(executor)
+        return executor
+
+    monkeypatch.setattr(login_security.PasswordVerifier, "_create_executor", create_executor)
+    monkeypatch.setenv("LOGIN_HASH_WORKERS", "1")
+    verifier = login_security.PasswordVerifier()
+    verifier.init_app(app)
+    assert created == []
+
+    password_hash = generate_password_hash("secret")
+    try:
+        assert verifier.verify(password_hash, "secret")
+        assert not verifier.verify(None, "secret")
+        assert len(created) == 1
+
+        # A forked worker must not reuse the pool its parent created.
+        pid = os.getpid()
+        monkeypatch.setattr(login_security.os, "getpid", lambda: pid + 1)
+        assert verifier.verify(password_hash, "secret")
+        assert len(created) == 2
+    finally:
+        for executor in created:
+            executor.shutdown()
+
+
+def test_trusted_proxy_lets_the_throttle_see_client_addresses(app, clock, monkeypatch):
+    monkeypatch.setenv("TRUSTED_PROXY_COUNT", "1")
+    monkeypatch.setattr(app, "wsgi_app", app.wsgi_app)
+    trust_proxies(app)
+    client = app.test_client()
+
+    def login(username, forwarded_for):
+        return client.post(
+            "/api/admin/login",
+            json={"username": username, "password": "wrong"},
+            environ_base={"REMOTE_ADDR": "127.0.0.1"},
+            headers={"X-Forwarded-For": forwarded_for},
+        ).status_code
+
+    try:
+        # Different usernames, so only the address counter builds up.
+        for attempt in range(FREE_ATTEMPTS + 1):
+            assert login(f"user{attempt}", "203.0.113.7") == 401
+        assert login("someone", "203.0.113.7") == 429
+        # Another client behind the same proxy is unaffected.
+        assert login("someone", "198.51.100.4") == 401
+    finally:
+        throttle = login_security.login_throttle
+        throttle.reset([key for addr in ("203.0.113.7", "198.51.100.4") for key in throttle.keys("someone", addr)])
+        for attempt in range(FREE_ATTEMPTS + 1):
+            throttle.reset(throttle.keys(f"user{attempt}", "203.0.113.7"))
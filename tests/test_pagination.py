@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from backend.database import db
+from backend.models import Events, StudentFeesPayment
+from backend.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+def test_cursor_round_trips_dates_and_nulls():
+    order = [(StudentFeesPayment.payment_date, True), (Events.event_date, False), (StudentFeesPayment.id, True)]
+    values = [datetime(2024, 6, 1, 9, 30, 15), date(2024, 6, 2), 42]
+
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, order) == values
+    assert decode_cursor(encode_cursor([None, None, 7]), order) == [None, None, 7]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", "e30", encode_cursor([1]), encode_cursor({"id": 1})])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, [(StudentFeesPayment.payment_date, True), (StudentFeesPayment.id, True)])
+
+
+def _insert_payments(dates):
+    rows = [
+        {
+            "student_name": f"Student {index}",
+            "student_id": f"S{index:03d}",
+            "admission_year": "2024",
+            "category": "OPEN",
+            "receipt_number": f"R{index:03d}",
+            "semester": "1",
+            "payment_date": payment_date,
+        }
+        for index, payment_date in enumerate(dates)
+    ]
+    db.session.execute(insert(StudentFeesPayment.__table__), rows)
+    db.session.commit()
+
+
+def _walk(order, limit):
+    seen, cursor = [], None
+    while True:
+        page = keyset_page(
+            StudentFeesPayment.query, order, limit=limit, cursor=cursor, serialize=lambda row: row.id
+        )
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_cover_null_sort_keys_once(descending):
+    start = datetime(2024, 1, 1)
+    # Ties, and NULLs both within a page and on the page boundaries.
+    _insert_payments([start, None, start + timedelta(days=1), None, start, None, start + timedelta(days=2)])
+    order = [(StudentFeesPayment.payment_date, descending), (StudentFeesPayment.id, descending)]
+    expected = [
+        row.id
+        for row in StudentFeesPayment.query.order_by(
+            *[column.desc() if desc else column.asc() for column, desc in order]
+        )
+    ]
+
+    for limit in (1, 2, 3):
+        assert _walk(order, limit) == expected
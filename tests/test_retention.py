@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from backend import retention as retention_module
+from backend.database import db
+from backend.delta_sync import TOMBSTONE_RETENTION
+from backend.models import IdempotencyKey, TicketEvent, Tombstone
+from backend.retention import RetentionJob
+from backend.ticket_feed import EVENT_RETENTION
+
+
+def test_run_deletes_only_expired_rows():
+    now = datetime.utcnow()
+    day = timedelta(days=1)
+    db.session.add_all(
+        [
+            Tombstone(table_name="fees_structure", row_id=1, deleted_at=now - TOMBSTONE_RETENTION - day),
+            Tombstone(table_name="fees_structure", row_id=2, deleted_at=now),
+            TicketEvent(ticket_id=1, event_type="created", payload="{}", created_at=now - EVENT_RETENTION - day),
+            TicketEvent(ticket_id=1, event_type="status", payload="{}", created_at=now),
+            IdempotencyKey(scope="s", key="old", request_hash="h", created_at=now - 2 * day, expires_at=now - day),
+            IdempotencyKey(scope="s", key="new", request_hash="h", created_at=now, expires_at=now + day),
+        ]
+    )
+    db.session.commit()
+
+    deleted = RetentionJob().run()
+
+    assert deleted == {"tombstones": 1, "ticket_events": 1, "idempotency_keys": 1}
+    assert [row.row_id for row in Tombstone.query] == [2]
+    assert [row.event_type for row in TicketEvent.query] == ["status"]
+    assert [row.key for row in IdempotencyKey.query] == ["new"]
+
+
+def test_job_starts_once_per_process_on_first_request(monkeypatch):
+    started = []
+    monkeypatch.setattr(RetentionJob, "_run", lambda self: started.append(retention_module.os.getpid()))
+    monkeypatch.setenv("RETENTION_INTERVAL_MINUTES", "5")
+    app = Flask(__name__)
+    app.add_url_rule("/", "index", lambda: "ok")
+    job = RetentionJob()
+    job.init_app(app)
+    client = app.test_client()
+
+    client.get("/")
+    client.get("/")
+    pid = retention_module.os.getpid()
+    monkeypatch.setattr(retention_module.os, "getpid", lambda: pid + 1)
+    client.get("/")
+
+    assert started == [pid, pid + 1]
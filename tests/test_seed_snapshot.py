@@ -0,0 +1,60 @@
+import fcntl
+import json
+
+import pytest
+
+import seed_data
+from backend.database import db
+from backend.models import Faculty
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(seed_data, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(seed_data, "SNAPSHOT_PATH", tmp_path / "seed_snapshot.json")
+    monkeypatch.setattr(seed_data, "SNAPSHOT_DIR", tmp_path / "snapshot")
+    return tmp_path
+
+
+def _load():
+    return seed_data.load_seed_snapshot(seed_data.SNAPSHOT_PATH, seed_data.SNAPSHOT_DIR)
+
+
+def test_first_incremental_export_keeps_the_legacy_snapshot(snapshot_dir):
+    legacy = {
+        "fees": [{"category": "OPEN", "total_fees": 25000.0}],
+        "faculty": [{"name": "Old Name", "department": "Civil", "designation": "Lecturer"}],
+    }
+    seed_data.SNAPSHOT_PATH.write_text(json.dumps(legacy), encoding="utf-8")
+    db.session.add(Faculty(name="New Name", department="Civil", designation="Lecturer"))
+    db.session.commit()
+
+    seed_data.write_seed_snapshot(tables={"faculty"})
+
+    manifest = seed_data.load_snapshot_manifest(seed_data.SNAPSHOT_DIR)
+    assert list(manifest["segments"]) == ["faculty"]
+    loaded = _load()
+    assert loaded["fees"] == legacy["fees"]
+    assert [member["name"] for member in loaded["faculty"]] == ["New Name"]
+
+
+def test_snapshot_is_read_while_holding_the_lock(snapshot_dir, monkeypatch):
+    build = seed_data.build_seed_payload
+    held = []
+
+    def build_and_check_lock(records=None, keys=None):
+        with (seed_data.SNAPSHOT_DIR / ".lock").open("a") as fh:
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                held.append(True)
+            else:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+                held.append(False)
+        return build(records, keys)
+
+    monkeypatch.setattr(seed_data, "build_seed_payload", build_and_check_lock)
+
+    seed_data.write_seed_snapshot(tables={"faculty"})
+
+    assert held == [True]
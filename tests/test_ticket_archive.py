@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from backend.database import db
+from backend.models import ArchivedHelpTickets, HelpTickets, Tombstone
+from backend.ticket_archive import archive_resolved_tickets
+
+LONG_AGO = datetime.utcnow() - timedelta(days=120)
+
+
+def _ticket(status="Resolved", resolved_at=LONG_AGO, **values):
+    ticket = HelpTickets(
+        student_name="Student",
+        contact="9999999999",
+        topic="Fees",
+        query_text="When is the fee deadline?",
+        status=status,
+        resolved_at=resolved_at,
+        **values,
+    )
+    db.session.add(ticket)
+    db.session.commit()
+    return ticket
+
+
+def test_only_long_resolved_tickets_are_archived():
+    archived_id = _ticket().id
+    recent_id = _ticket(resolved_at=datetime.utcnow() - timedelta(days=1)).id
+    open_id = _ticket(status="Open", resolved_at=None).id
+
+    report = archive_resolved_tickets(90)
+
+    assert report["archived"] == 1
+    assert sorted(ticket.id for ticket in HelpTickets.query) == [recent_id, open_id]
+    archived = ArchivedHelpTickets.query.one()
+    assert (archived.original_id, archived.query_text) == (archived_id, "When is the fee deadline?")
+    assert Tombstone.query.filter_by(table_name="help_tickets", row_id=archived_id).count() == 1
+
+
+def test_live_id_handed_out_again_is_archived_under_a_new_archive_id(client):
+    first = _ticket().id
+    archive_resolved_tickets(90)
+    # SQLite gives the next ticket the id of the archived one again.
+    second = _ticket().id
+    assert second == first
+
+    archive_resolved_tickets(90)
+
+    archived = ArchivedHelpTickets.query.order_by(ArchivedHelpTickets.id).all()
+    assert [row.original_id for row in archived] == [first, first]
+    assert archived[0].id != archived[1].id
+
+    response = client.get(f"/api/admin/tickets/archive?original_id={first}")
+    assert response.status_code == 200
+    assert {item["id"] for item in response.get_json()["items"]} == {row.id for row in archived}
+
+
+def test_intake_reference_is_kept():
+    _ticket(intake_ref="a" * 32)
+
+    archive_resolved_tickets(90)
+
+    assert ArchivedHelpTickets.query.one().intake_ref == "a" * 32
@@ -0,0 +1,84 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from backend.database import db
+from backend.models import HelpTickets
+from backend.ticket_queue import CLAIM_SECONDS, TicketQueue
+
+
+@pytest.fixture
+def queue(app, tmp_path, monkeypatch):
+    """A journal left behind by a crashed process; nothing drains it in the background."""
+    monkeypatch.setenv("TICKET_QUEUE_PATH", str(tmp_path / "queue.db"))
+    queue = TicketQueue()
+    monkeypatch.setattr(queue, "_wake", lambda: None)
+    queue.init_app(app)
+    return queue
+
+
+def _journal(queue, intake_ref, claimed_until=None, name="Student"):
+    payload = {
+        "student_name": name,
+        "contact": "9999999999",
+        "topic": "Fees",
+        "query_text": "When is the fee deadline?",
+        "status": "Open",
+        "created_at": datetime(2024, 7, 1, 10, 0).isoformat(),
+    }
+    conn = queue._connect()
+    try:
+        conn.execute(
+            "INSERT INTO queued_tickets (intake_ref, payload, enqueued_at, claimed_until) VALUES (?, ?, ?, ?)",
+            (intake_ref, json.dumps(payload), time.time(), claimed_until),
+        )
+    finally:
+        conn.close()
+
+
+def test_drain_writes_leftover_and_expired_claims(queue):
+    _journal(queue, "a" * 32)
+    # Claimed by a drainer that died before writing it.
+    _journal(queue, "b" * 32, claimed_until=time.time() - 1)
+
+    assert queue.drain() == 2
+
+    assert sorted(ticket.intake_ref for ticket in HelpTickets.query) == ["a" * 32, "b" * 32]
+    assert queue.status()["depth"] == 0
+
+
+def test_drain_leaves_rows_claimed_by_a_live_drainer(queue):
+    _journal(queue, "a" * 32, claimed_until=time.time() + CLAIM_SECONDS)
+
+    assert queue.drain() == 0
+    assert HelpTickets.query.count() == 0
+    assert queue.status()["depth"] == 1
+
+
+def test_replayed_batch_is_not_inserted_twice(queue):
+    # Crash after the database commit but before the journal rows were deleted.
+    db.session.add(
+        HelpTickets(student_name="Student", contact="9999999999", query_text="Hello", intake_ref="a" * 32)
+    )
+    db.session.commit()
+    _journal(queue, "a" * 32)
+    _journal(queue, "b" * 32)
+
+    queue.drain()
+
+    assert HelpTickets.query.count() == 2
+    assert queue.status()["depth"] == 0
+
+
+def test_rejected_row_is_retried_later_without_blocking_the_rest(queue):
+    _journal(queue, "a" * 32)
+    _journal(queue, "b" * 32, name=None)
+
+    assert queue.drain() == 1
+
+    status = queue.status()
+    assert status["depth"] == 1
+    assert status["retrying"] == 1
+    assert [ticket.intake_ref for ticket in HelpTickets.query] == ["a" * 32]